@@ -0,0 +1,84 @@
+"""
+Benchmark of the native NumPy indicator kernels against pandas_ta.
+
+Usage:
+    python -m integration.benchmarks.indicators --rows 10000000 --length 20
+"""
+
+import argparse
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from inkosi.backtest import indicators
+
+
+def timeit(function: Callable, repeat: int) -> float:
+    """
+    Best wall-clock time, in seconds, of `repeat` calls of a function.
+    """
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--length", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    close = 100 + np.cumsum(
+        np.random.default_rng(0).normal(scale=0.01, size=arguments.rows)
+    )
+    data_frame = pd.DataFrame({"Close": close})
+
+    try:
+        import pandas_ta  # noqa: F401
+    except ImportError:
+        print("pandas_ta is not installed, only the native kernels are timed")
+        references = {}
+    else:
+        references = {
+            "sma": lambda: data_frame.ta.sma(
+                close=data_frame["Close"], length=arguments.length
+            ),
+            "wma": lambda: data_frame.ta.wma(
+                close=data_frame["Close"], length=arguments.length
+            ),
+            "ema": lambda: data_frame.ta.ema(
+                close=data_frame["Close"], length=arguments.length
+            ),
+        }
+
+    print(f"{'kernel':<8}{'numpy [s]':>12}{'pandas_ta [s]':>16}{'speedup':>10}")
+    for name in ("sma", "wma", "ema"):
+        kernel = getattr(indicators, name)
+        native = timeit(lambda: kernel(close, arguments.length), arguments.repeat)
+
+        if name in references:
+            reference = timeit(references[name], arguments.repeat)
+            np.testing.assert_allclose(
+                kernel(close, arguments.length),
+                references[name]().to_numpy(),
+                rtol=1e-8,
+                equal_nan=True,
+            )
+            print(
+                f"{name:<8}{native:>12.3f}{reference:>16.3f}"
+                f"{reference / native:>9.1f}x"
+            )
+        else:
+            print(f"{name:<8}{native:>12.3f}{'-':>16}{'-':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Benchmark suite of the backtest operations over synthetic ticks.
+
+Times `checker`, `backtest`, `filter_dataset`, `technical_column` and
+`Asset.sampling` at several dataset sizes, writes the timings as JSON and, given
+a baseline written by a previous run, flags the regressions.
+
+Usage:
+    python -m integration.benchmarks.suite --sizes 1000000 10000000 \
+        --output benchmarks.json --baseline baseline.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from inkosi.backtest.operation.asset import Asset
+from inkosi.backtest.operation.backtest import (
+    backtest,
+    checker,
+    filter_dataset,
+    technical_column,
+)
+from inkosi.backtest.operation.cache import get_indicator_cache
+from inkosi.backtest.operation.models import (
+    TICKS_ASK_INDEX,
+    TICKS_BID_INDEX,
+    TICKS_DATETIME_INDEX,
+    BacktestEngine,
+    BacktestRequest,
+    SourceType,
+)
+from inkosi.backtest.operation.schemas import (
+    AvailableRawColumns,
+    AvailableTechincalIndicators,
+    Elements,
+    Filter,
+    Relation,
+    SamplingMethods,
+)
+from inkosi.backtest.operation.sources import Dataset
+from inkosi.database.mongodb.schemas import Position
+from integration.benchmarks.indicators import timeit
+from integration.benchmarks.synthetic import write_synthetic_store
+
+TAKE_PROFIT: float = 0.5
+STOP_LOSS: float = 0.5
+STEPS_FORWARD: int = 100
+
+
+def _filters() -> list[Filter]:
+    return [
+        Filter(
+            first_element={Elements.ELEMENT: AvailableRawColumns.CLOSE_PRICE},
+            second_element={
+                Elements.ELEMENT: AvailableTechincalIndicators.SMA,
+                Elements.PERIOD: 20,
+            },
+            relation=Relation.GREATER,
+        ),
+        Filter(
+            first_element={
+                Elements.ELEMENT: AvailableTechincalIndicators.EMA,
+                Elements.PERIOD: 20,
+            },
+            second_element={
+                Elements.ELEMENT: AvailableTechincalIndicators.SMA,
+                Elements.PERIOD: 50,
+            },
+            relation=Relation.GREATER,
+        ),
+    ]
+
+
+def benchmarks(
+    dataset: Dataset,
+    trades: int,
+) -> dict[str, Callable[[], object]]:
+    """
+    Build the benchmarked calls over a dataset of ticks.
+
+    Parameters:
+        dataset (Dataset): The dataset of the ticks.
+        trades (int): The number of trades backtested.
+
+    Returns:
+        (dict[str, Callable[[], object]]): The calls, by benchmark name.
+    """
+
+    bid = dataset.get_column(TICKS_BID_INDEX)
+    ask = dataset.get_column(TICKS_ASK_INDEX)
+    rows = bid.shape[0]
+
+    starting_indexes = np.linspace(0, rows * 0.9, trades, dtype=np.int64)
+    direction = [Position.BUY, Position.SELL] * (trades // 2) + [Position.BUY] * (
+        trades % 2
+    )
+
+    def run_backtest(engine: BacktestEngine) -> None:
+        backtest(
+            BacktestRequest(
+                starting_indexes=starting_indexes.tolist(),
+                direction=direction,
+                take_profits=[TAKE_PROFIT] * trades,
+                stop_losses=[STOP_LOSS] * trades,
+                dataset=dataset,
+                engine=engine,
+                cache=False,
+            )
+        )
+
+    stacked = np.column_stack([np.zeros(rows), bid, ask])
+
+    def run_checker() -> None:
+        for index, position in zip(starting_indexes, direction):
+            entry = index + 1
+            checker(
+                stacked,
+                position,
+                entry,
+                stacked[
+                    entry,
+                    TICKS_BID_INDEX if position == Position.BUY else TICKS_ASK_INDEX,
+                ],
+                TAKE_PROFIT,
+                STOP_LOSS,
+            )
+
+    data_frame = pd.DataFrame(
+        {
+            AvailableRawColumns.CLOSE_PRICE: bid,
+            AvailableRawColumns.OPEN_PRICE: ask,
+        },
+        copy=False,
+    )
+
+    # The indicators are memoized, the cache is cleared so that they are computed
+    def run_technical_column() -> None:
+        get_indicator_cache().clear()
+        technical_column(
+            data_frame,
+            AvailableTechincalIndicators.SMA,
+            {Elements.PERIOD: 20},
+        )
+
+    def run_filter_dataset() -> None:
+        get_indicator_cache().clear()
+        filter_dataset(data_frame, filters=_filters())
+
+    asset = Asset(
+        "SYNTHETIC",
+        result={
+            AvailableRawColumns.DATES: dataset.get_column(TICKS_DATETIME_INDEX),
+            AvailableRawColumns.CLOSE_PRICE: bid,
+            AvailableRawColumns.OPEN_PRICE: ask,
+        },
+    )
+
+    def run_sampling() -> None:
+        asset.sampling(
+            SamplingMethods.NORMAL_DISTRIBUTION,
+            steps_forward=STEPS_FORWARD,
+            samples=max(rows // STEPS_FORWARD, 1),
+            seed=0,
+            quantiles=[0.05, 0.5, 0.95],
+        )
+
+    return {
+        "checker": run_checker,
+        "backtest[vectorized]": lambda: run_backtest(BacktestEngine.VECTORIZED),
+        "backtest[indexed]": lambda: run_backtest(BacktestEngine.INDEXED),
+        "technical_column": run_technical_column,
+        "filter_dataset": run_filter_dataset,
+        "Asset.sampling": run_sampling,
+    }
+
+
+def run(
+    sizes: list[int],
+    trades: int,
+    repeat: int,
+    seed: int,
+    directory: Path,
+) -> dict:
+    """
+    Run the benchmarks at every size.
+
+    Parameters:
+        sizes (list[int]): The numbers of ticks.
+        trades (int): The number of trades backtested.
+        repeat (int): The number of runs of each benchmark, the best one is kept.
+        seed (int): The seed of the synthetic ticks.
+        directory (Path): The directory of the tick stores.
+
+    Returns:
+        (dict): The metadata of the run and the best time of each benchmark, in
+            seconds, by benchmark name and size.
+    """
+
+    results: dict[str, dict[str, float]] = {}
+
+    for rows in sizes:
+        store = write_synthetic_store(rows, directory.joinpath(str(rows)), seed=seed)
+        dataset = Dataset(store, source_type=SourceType.MEMMAP)
+
+        for name, function in benchmarks(dataset, trades).items():
+            results.setdefault(name, {})[str(rows)] = timeit(function, repeat)
+            print(f"{name:<24}{rows:>14,}{results[name][str(rows)]:>12.3f} s")
+
+    return {
+        "metadata": {
+            "created_at": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "trades": trades,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """
+    Compare the timings of a run with the ones of a baseline.
+
+    Parameters:
+        current (dict): The output of the run.
+        baseline (dict): The output of the baseline run.
+        tolerance (float): The relative slowdown tolerated, e.g. 0.2 for 20%.
+
+    Returns:
+        (list[dict]): The benchmarks run by both, with their timings, their ratio
+            and whether they have regressed.
+    """
+
+    comparison = []
+    for name, timings in current["results"].items():
+        for rows, seconds in timings.items():
+            reference = baseline["results"].get(name, {}).get(rows)
+            if reference is None:
+                continue
+
+            ratio = seconds / reference if reference > 0 else float("inf")
+            comparison.append(
+                {
+                    "name": name,
+                    "rows": int(rows),
+                    "baseline": reference,
+                    "current": seconds,
+                    "ratio": ratio,
+                    "regression": ratio > 1 + tolerance,
+                }
+            )
+
+    return comparison
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--trades", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=Path("benchmarks.json"))
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument(
+        "--directory",
+        type=Path,
+        default=None,
+        help="Directory of the synthetic tick stores, temporary by default",
+    )
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary:
+        output = run(
+            sizes=arguments.sizes,
+            trades=arguments.trades,
+            repeat=arguments.repeat,
+            seed=arguments.seed,
+            directory=arguments.directory or Path(temporary),
+        )
+
+    arguments.output.write_text(json.dumps(output, indent=2))
+    print(f"Results written to {arguments.output}")
+
+    if arguments.baseline is None:
+        return
+
+    comparison = compare(
+        output,
+        json.loads(arguments.baseline.read_text()),
+        arguments.tolerance,
+    )
+
+    print(f"{'benchmark':<24}{'rows':>14}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for entry in comparison:
+        print(
+            f"{entry['name']:<24}{entry['rows']:>14,}{entry['baseline']:>11.3f}s"
+            f"{entry['current']:>11.3f}s{entry['ratio']:>7.2f}x"
+            + ("  REGRESSION" if entry["regression"] else "")
+        )
+
+    regressions = [entry for entry in comparison if entry["regression"]]
+    if regressions:
+        print(
+            f"{len(regressions)} benchmarks regressed by more than"
+            f" {arguments.tolerance:.0%}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
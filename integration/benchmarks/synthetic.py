@@ -0,0 +1,110 @@
+"""
+Deterministic synthetic tick data: a random walk of the bid with a random spread
+and random gaps between the ticks.
+
+Usage:
+    python -m integration.benchmarks.synthetic --rows 100000000 --directory ticks
+"""
+
+import argparse
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.models import (
+    TICKS_ASK_INDEX,
+    TICKS_BID_INDEX,
+    TICKS_DATETIME_INDEX,
+)
+from inkosi.backtest.operation.store import write_tick_store
+
+# The ticks are generated by blocks of a fixed size, each drawing from its own
+# stream, so that they only depend on the seed and on the number of rows
+BLOCK_SIZE: int = 1_000_000
+
+START: pd.Timestamp = pd.Timestamp("2020-01-01", tz="UTC")
+INITIAL_PRICE: float = 100.0
+VOLATILITY: float = 0.01
+MIN_SPREAD: float = 0.01
+MEAN_EXTRA_SPREAD: float = 0.005
+MAX_GAP_MS: int = 1000
+
+
+def synthetic_ticks(rows: int, seed: int = 0) -> Iterator[tuple[NDArray, ...]]:
+    """
+    Generate synthetic ticks by blocks.
+
+    Parameters:
+        rows (int): The number of ticks.
+        seed (int, default 0): The seed of the ticks.
+
+    Returns:
+        (Iterator[tuple[NDArray, ...]]): The datetime (int64 nanoseconds since the
+            epoch), bid and ask columns of each block.
+    """
+
+    n_blocks = -(-rows // BLOCK_SIZE)
+    time, price = START.value, INITIAL_PRICE
+
+    for block, sequence in enumerate(np.random.SeedSequence(seed).spawn(n_blocks)):
+        generator = np.random.default_rng(sequence)
+        size = min(BLOCK_SIZE, rows - block * BLOCK_SIZE)
+
+        times = time + np.cumsum(
+            generator.integers(1, MAX_GAP_MS, size=size, dtype=np.int64) * 1_000_000
+        )
+        bid = price + np.cumsum(generator.normal(scale=VOLATILITY, size=size))
+        ask = bid + MIN_SPREAD + generator.exponential(MEAN_EXTRA_SPREAD, size=size)
+
+        time, price = int(times[-1]), float(bid[-1])
+
+        yield times, bid, ask
+
+
+def write_synthetic_store(rows: int, directory: str | Path, seed: int = 0) -> Path:
+    """
+    Write synthetic ticks as a tick store, block by block, so that they are never
+    entirely held in memory.
+
+    Parameters:
+        rows (int): The number of ticks.
+        directory (str | Path): The directory of the store.
+        seed (int, default 0): The seed of the ticks.
+
+    Returns:
+        (Path): The directory of the store.
+    """
+
+    def chunks() -> Iterator[pd.DataFrame]:
+        for times, bid, ask in synthetic_ticks(rows, seed):
+            # The int64 timestamps cannot be stacked with the prices without losing
+            # precision, hence the typed columns of a DataFrame
+            columns = {
+                TICKS_DATETIME_INDEX: times,
+                TICKS_BID_INDEX: bid,
+                TICKS_ASK_INDEX: ask,
+            }
+
+            yield pd.DataFrame(
+                {index: columns[index] for index in sorted(columns)},
+                copy=False,
+            )
+
+    return write_tick_store(chunks(), directory)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--directory", type=Path, required=True)
+    arguments = parser.parse_args()
+
+    write_synthetic_store(arguments.rows, arguments.directory, seed=arguments.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from inkosi.database.mongodb.schemas import Position
+from integration.benchmarks.synthetic import write_synthetic_store
+
+ROWS: int = 20_000
+TRADES: int = 300
+
+
+@pytest.fixture(scope="session")
+def store(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return write_synthetic_store(ROWS, tmp_path_factory.mktemp("ticks"), seed=7)
+
+
+@pytest.fixture(scope="session")
+def trades() -> tuple[list[int], list[Position]]:
+    generator = np.random.default_rng(7)
+    starting_indexes = np.sort(generator.choice(ROWS - 1, size=TRADES, replace=False))
+    direction = [
+        Position.BUY if buy else Position.SELL for buy in generator.random(TRADES) < 0.5
+    ]
+
+    return starting_indexes.tolist(), direction
@@ -0,0 +1,126 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+pytest.importorskip("streamlit")
+
+from inkosi.backtest.app import data  # noqa: E402
+from inkosi.backtest.app.data import QuotesCache, QuotesUnavailable  # noqa: E402
+
+COLUMN_BYTES: int = 100 * 8
+
+
+def _quotes(value: float = 1.0) -> dict[str, np.ndarray]:
+    return {"Open": np.full(100, value), "Close": np.full(100, value)}
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(data.time, "monotonic", clock)
+
+    return clock
+
+
+def test_hit_returns_read_only_shared_columns() -> None:
+    cache = QuotesCache(max_bytes=1 << 20, max_entries=4, ttl=60.0)
+    quotes = _quotes()
+
+    stored = cache.put("first", quotes)
+    cached = cache.get("first")
+
+    assert cache.get("second") is None
+    assert cached is not stored and cached.keys() == quotes.keys()
+    for column, values in cached.items():
+        assert not values.flags.writeable
+        assert np.shares_memory(values, quotes[column])
+    assert len(cache) == 1 and cache.nbytes == 2 * COLUMN_BYTES
+
+
+def test_entries_expire_after_the_ttl(clock: Clock) -> None:
+    cache = QuotesCache(max_bytes=1 << 20, max_entries=4, ttl=60.0)
+    cache.put("first", _quotes())
+
+    clock.now += 59.0
+    assert cache.get("first") is not None
+
+    # The lookups do not extend the TTL
+    clock.now += 2.0
+    assert cache.get("first") is None
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_least_recently_used_entries_are_evicted_by_bytes() -> None:
+    cache = QuotesCache(max_bytes=5 * COLUMN_BYTES, max_entries=10, ttl=60.0)
+    cache.put("first", _quotes())
+    cache.put("second", _quotes())
+
+    assert cache.get("first") is not None
+    cache.put("third", _quotes())
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None and cache.get("third") is not None
+    assert cache.nbytes == 4 * COLUMN_BYTES <= cache.max_bytes
+
+
+def test_least_recently_used_entries_are_evicted_by_number() -> None:
+    cache = QuotesCache(max_bytes=1 << 20, max_entries=2, ttl=60.0)
+    cache.put("first", _quotes())
+    cache.put("second", _quotes())
+    cache.get("first")
+    cache.put("third", _quotes())
+
+    assert len(cache) == 2
+    assert cache.get("second") is None and cache.get("first") is not None
+
+
+def test_replaced_and_oversize_entries() -> None:
+    cache = QuotesCache(max_bytes=3 * COLUMN_BYTES, max_entries=2, ttl=60.0)
+    cache.put("first", _quotes(1.0))
+    cache.put("first", _quotes(2.0))
+
+    assert len(cache) == 1 and cache.nbytes == 2 * COLUMN_BYTES
+    np.testing.assert_array_equal(cache.get("first")["Close"], 2.0)
+
+    oversize = {"Close": np.ones(1000)}
+    np.testing.assert_array_equal(cache.put("second", oversize)["Close"], 1.0)
+    assert cache.get("second") is None and cache.get("first") is not None
+
+
+def test_load_quotes_downloads_once_and_never_caches_failures(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache = QuotesCache(max_bytes=1 << 20, max_entries=4, ttl=60.0)
+    downloads: list[str] = []
+
+    class Quote:
+        def __init__(self, time_frame: str) -> None:
+            pass
+
+        def download_quote(self, ticker: str, start: date, end: date) -> dict | None:
+            downloads.append(ticker)
+            return None if ticker == "UNKNOWN" else _quotes()
+
+    monkeypatch.setattr(data, "get_quotes_cache", lambda: cache)
+    monkeypatch.setattr(data, "Quote", Quote)
+
+    arguments = ("1d", date(2023, 1, 1), date(2023, 2, 1))
+    first = data.load_quotes("TEST", *arguments)
+    second = data.load_quotes("TEST", *arguments)
+
+    assert downloads == ["TEST"]
+    np.testing.assert_array_equal(second["Close"], first["Close"])
+
+    for _ in range(2):
+        with pytest.raises(QuotesUnavailable):
+            data.load_quotes("UNKNOWN", *arguments)
+    assert downloads == ["TEST", "UNKNOWN", "UNKNOWN"] and len(cache) == 1
@@ -0,0 +1,150 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from inkosi.backtest.operation.backtest import backtest
+from inkosi.backtest.operation.incremental import incremental_backtest
+from inkosi.backtest.operation.models import (
+    BacktestEngine,
+    BacktestRequest,
+    BacktestResult,
+    SourceType,
+    TradeResult,
+)
+from inkosi.backtest.operation.sources import Dataset
+from inkosi.backtest.operation.store import TickStore
+from inkosi.backtest.operation.sweep import sweep
+from inkosi.database.mongodb.schemas import Position
+
+TAKE_PROFIT: float = 0.3
+STOP_LOSS: float = 0.2
+
+FIELDS: list[str] = [
+    "direction",
+    "entry_point",
+    "entry_point_index",
+    "take_profit",
+    "stop_loss",
+    "price_close",
+    "price_close_index",
+    "status",
+    "result",
+]
+
+
+def _request(
+    dataset: Dataset,
+    trades: tuple[list[int], list[Position]],
+    take_profit: float = TAKE_PROFIT,
+    stop_loss: float = STOP_LOSS,
+    engine: BacktestEngine = BacktestEngine.VECTORIZED,
+) -> BacktestRequest:
+    starting_indexes, direction = trades
+
+    return BacktestRequest(
+        starting_indexes=starting_indexes,
+        direction=direction,
+        take_profits=[take_profit] * len(starting_indexes),
+        stop_losses=[stop_loss] * len(starting_indexes),
+        dataset=dataset,
+        engine=engine,
+        cache=False,
+    )
+
+
+def _assert_same_trades(result: BacktestResult, expected: BacktestResult) -> None:
+    assert len(result) == len(expected)
+    for field in FIELDS:
+        np.testing.assert_array_equal(
+            getattr(result, field),
+            getattr(expected, field),
+            err_msg=field,
+        )
+
+
+@pytest.fixture(scope="module")
+def dataset(store: Path) -> Dataset:
+    return Dataset(store, source_type=SourceType.MEMMAP)
+
+
+@pytest.fixture(scope="module")
+def expected(
+    dataset: Dataset,
+    trades: tuple[list[int], list[Position]],
+) -> BacktestResult:
+    return backtest(_request(dataset, trades))
+
+
+def test_indexed_engine_matches_vectorized(
+    dataset: Dataset,
+    trades: tuple[list[int], list[Position]],
+    expected: BacktestResult,
+) -> None:
+    result = backtest(_request(dataset, trades, engine=BacktestEngine.INDEXED))
+
+    _assert_same_trades(result, expected)
+
+
+def test_iterative_engine_matches_vectorized(
+    dataset: Dataset,
+    trades: tuple[list[int], list[Position]],
+    expected: BacktestResult,
+) -> None:
+    result = backtest(_request(dataset, trades, engine=BacktestEngine.ITERATIVE))
+
+    # The iterative engine skips the trades for which a barrier is never hit
+    assert 0 < len(result) < len(expected)
+    kept = np.isin(expected.entry_point_index, result.entry_point_index)
+    _assert_same_trades(result, expected.select(kept))
+
+
+@pytest.mark.parametrize("split", [0.25, 0.5, 0.9])
+def test_incremental_matches_full_backtest(
+    store: Path,
+    dataset: Dataset,
+    trades: tuple[list[int], list[Position]],
+    expected: BacktestResult,
+    split: float,
+) -> None:
+    starting_indexes, direction = trades
+    rows = int(len(TickStore(store)) * split)
+    end = dataset.time_index().timestamps([rows - 1])[0]
+
+    # The first run only sees the first rows and the trades starting in them
+    first = sum(index + 1 < rows for index in starting_indexes)
+    state = incremental_backtest(
+        _request(
+            Dataset(store, source_type=SourceType.MEMMAP, end=end),
+            (starting_indexes[:first], direction[:first]),
+        )
+    )
+    assert state is not None and state.last_index == rows - 1
+
+    state = incremental_backtest(_request(dataset, trades), state)
+
+    _assert_same_trades(state.to_result(), expected)
+
+
+def test_sweep_cells_match_backtest(
+    dataset: Dataset,
+    trades: tuple[list[int], list[Position]],
+) -> None:
+    take_profits, stop_losses = [0.1, 0.3, 0.5], [0.1, 0.2, 0.4, 0.8]
+    starting_indexes, direction = trades
+
+    result = sweep(dataset, starting_indexes, direction, take_profits, stop_losses)
+
+    for row, take_profit in enumerate(take_profits):
+        for column, stop_loss in enumerate(stop_losses):
+            cell = backtest(_request(dataset, trades, take_profit, stop_loss))
+            counts = cell.count_results()
+            holding_periods = cell.holding_periods()
+
+            assert result.profits[row, column] == counts[TradeResult.PROFIT]
+            assert result.losses[row, column] == counts[TradeResult.LOSS]
+            assert result.pending[row, column] == counts[TradeResult.PENDING]
+            np.testing.assert_allclose(
+                result.holding_time[row, column],
+                holding_periods[holding_periods >= 0].mean(),
+            )
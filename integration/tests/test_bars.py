@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inkosi.backtest.operation.bars import resample_ticks
+from inkosi.backtest.operation.schemas import AvailableRawColumns, TimeFrames
+
+# Opening time of the bar of each time frame, as computed by pandas
+REFERENCE_KEYS: dict[TimeFrames, str] = {
+    TimeFrames.MINUTES_1: "1min",
+    TimeFrames.MINUTES_2: "2min",
+    TimeFrames.MINUTES_5: "5min",
+    TimeFrames.MINUTES_15: "15min",
+    TimeFrames.MINUTES_30: "30min",
+    TimeFrames.MINUTES_60: "60min",
+    TimeFrames.MINUTES_90: "90min",
+    TimeFrames.HOUR_1: "1h",
+    TimeFrames.DAY_1: "1D",
+    TimeFrames.DAY_5: "5D",
+    TimeFrames.WEEK_1: "W-SUN",
+    TimeFrames.MONTH_1: "M",
+    TimeFrames.MONTH_3: "Q",
+}
+
+
+def _ticks(rows: int, max_gap: str, seed: int) -> tuple[np.ndarray, ...]:
+    generator = np.random.default_rng(seed)
+    gaps = generator.integers(1, pd.Timedelta(max_gap).value, size=rows)
+    times = pd.Timestamp("2023-01-01 13:27:11").value + np.cumsum(gaps)
+    bid = 100.0 + np.cumsum(generator.normal(size=rows))
+
+    return times, bid, bid + generator.exponential(0.01, size=rows)
+
+
+# Ticks a few seconds apart over a few hours, and a few hours apart over a year
+TICKS: dict[str, tuple[np.ndarray, ...]] = {
+    "dense": _ticks(5000, "5s", seed=1),
+    "sparse": _ticks(5000, "3h", seed=2),
+}
+
+
+def _reference_keys(times: np.ndarray, time_frame: TimeFrames) -> pd.Series:
+    dates = pd.Series(pd.to_datetime(times))
+    rule = REFERENCE_KEYS[time_frame]
+    if time_frame in (TimeFrames.WEEK_1, TimeFrames.MONTH_1, TimeFrames.MONTH_3):
+        return dates.dt.to_period(rule).dt.start_time
+
+    return dates.dt.floor(rule)
+
+
+@pytest.mark.parametrize("ticks", list(TICKS))
+@pytest.mark.parametrize("time_frame", TimeFrames.list())
+def test_bars_match_pandas(ticks: str, time_frame: TimeFrames) -> None:
+    times, bid, ask = TICKS[ticks]
+    bars = resample_ticks(times, bid, ask, time_frame)
+
+    frame = pd.DataFrame({"key": _reference_keys(times, time_frame), "bid": bid})
+    frame["ask"] = ask
+    reference = frame.groupby("key").agg(
+        open=("bid", "first"),
+        high=("bid", "max"),
+        low=("bid", "min"),
+        close=("bid", "last"),
+        close_ask=("ask", "last"),
+        ticks=("bid", "size"),
+    )
+
+    assert len(bars) == len(reference)
+    np.testing.assert_array_equal(bars.dates, reference.index.to_numpy())
+    for column in ["open", "high", "low", "close", "close_ask"]:
+        np.testing.assert_array_equal(getattr(bars, column), reference[column])
+
+    np.testing.assert_array_equal(bars.ticks(), reference["ticks"])
+    assert bars.offsets[0] == 0 and bars.offsets[-1] == times.shape[0]
+
+
+@pytest.mark.parametrize("time_frame", TimeFrames.list())
+def test_offsets_map_the_bars_to_their_ticks(time_frame: TimeFrames) -> None:
+    times, bid, ask = TICKS["sparse"]
+    bars = resample_ticks(times, bid, ask, time_frame)
+    keys = _reference_keys(times, time_frame).to_numpy()
+    assert len(bars) > 1
+
+    positions = np.arange(len(bars))
+
+    for position in positions:
+        start, stop = bars.offsets[position], bars.offsets[position + 1]
+        assert np.all(keys[start:stop] == bars.dates[position])
+
+    np.testing.assert_array_equal(bars.first_ticks(positions), bars.offsets[:-1])
+    # The trades of a bar enter on the first tick following its close
+    starting_indexes = bars.starting_indexes(positions)
+    np.testing.assert_array_equal(bid[starting_indexes], bars.close)
+    np.testing.assert_array_equal(starting_indexes[:-1] + 1, bars.offsets[1:-1])
+
+
+def test_data_frame_has_the_columns_of_an_asset() -> None:
+    bars = resample_ticks(*TICKS["dense"], TimeFrames.MINUTES_5)
+    data_frame = bars.data_frame()
+
+    assert list(data_frame.columns) == [
+        AvailableRawColumns.DATES,
+        AvailableRawColumns.OPEN_PRICE,
+        AvailableRawColumns.HIGH_PRICE,
+        AvailableRawColumns.LOW_PRICE,
+        AvailableRawColumns.CLOSE_PRICE,
+        AvailableRawColumns.RETURNS,
+    ]
+    np.testing.assert_array_equal(
+        data_frame[AvailableRawColumns.RETURNS],
+        bars.close - bars.open,
+    )
+
+
+def test_no_ticks() -> None:
+    empty = np.empty(0)
+    bars = resample_ticks(empty, empty, empty, TimeFrames.DAY_1)
+
+    assert len(bars) == 0 and bars.offsets.tolist() == [0]
+    assert bars.data_frame().empty
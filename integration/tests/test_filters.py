@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inkosi.backtest.operation.backtest import filter_dataset
+from inkosi.backtest.operation.expressions import compile_filters
+from inkosi.backtest.operation.schemas import (
+    AvailableRawColumns,
+    AvailableTechincalIndicators,
+    Elements,
+    Filter,
+    FilterGroup,
+    LogicalOperator,
+    Relation,
+)
+
+
+def _raw(column: AvailableRawColumns) -> dict:
+    return {Elements.ELEMENT: column}
+
+
+def _sma(length: int) -> dict:
+    return {Elements.ELEMENT: AvailableTechincalIndicators.SMA, Elements.PERIOD: length}
+
+
+def _filter(first: dict, relation: Relation, second: dict) -> Filter:
+    return Filter(first_element=first, second_element=second, relation=relation)
+
+
+CLOSE_ABOVE_SMA: Filter = _filter(
+    _raw(AvailableRawColumns.CLOSE_PRICE),
+    Relation.GREATER,
+    _sma(5),
+)
+CLOSE_BELOW_SLOW_SMA: Filter = _filter(
+    _raw(AvailableRawColumns.CLOSE_PRICE),
+    Relation.LESS_THAN,
+    _sma(20),
+)
+RISING: Filter = _filter(
+    _raw(AvailableRawColumns.OPEN_PRICE),
+    Relation.LESS,
+    _raw(AvailableRawColumns.CLOSE_PRICE),
+)
+FAST_AT_LEAST_SLOW: Filter = _filter(_sma(5), Relation.GREATER_THAN, _sma(20))
+
+CASES: list[tuple[list[Filter] | FilterGroup, str]] = [
+    ([CLOSE_ABOVE_SMA], "Close > sma5"),
+    ([CLOSE_ABOVE_SMA, RISING], "Close > sma5 and Open < Close"),
+    (
+        FilterGroup(LogicalOperator.OR, [CLOSE_ABOVE_SMA, CLOSE_BELOW_SLOW_SMA]),
+        "Close > sma5 or Close <= sma20",
+    ),
+    (
+        FilterGroup(LogicalOperator.NOT, [CLOSE_ABOVE_SMA, RISING]),
+        "not (Close > sma5 and Open < Close)",
+    ),
+    (
+        FilterGroup(
+            LogicalOperator.AND,
+            [
+                FAST_AT_LEAST_SLOW,
+                FilterGroup(LogicalOperator.OR, [RISING, CLOSE_BELOW_SLOW_SMA]),
+                FilterGroup(LogicalOperator.NOT, [CLOSE_ABOVE_SMA]),
+            ],
+        ),
+        "sma5 >= sma20 and (Open < Close or Close <= sma20) and not (Close > sma5)",
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def data_frame() -> pd.DataFrame:
+    generator = np.random.default_rng(3)
+    close = 100 + np.cumsum(generator.normal(size=500))
+
+    return pd.DataFrame(
+        {
+            AvailableRawColumns.OPEN_PRICE: close + generator.normal(size=500),
+            AvailableRawColumns.CLOSE_PRICE: close,
+        }
+    )
+
+
+@pytest.mark.parametrize(("filters", "query"), CASES)
+def test_filters_match_pandas_query(
+    data_frame: pd.DataFrame,
+    filters: list[Filter] | FilterGroup,
+    query: str,
+) -> None:
+    reference = data_frame.assign(
+        sma5=data_frame["Close"].rolling(5).mean(),
+        sma20=data_frame["Close"].rolling(20).mean(),
+    )
+    expected = reference.query(query).index.to_numpy()
+
+    assert expected.size > 0
+    np.testing.assert_array_equal(filter_dataset(data_frame, filters), expected)
+
+
+def test_shared_columns_are_compiled_once() -> None:
+    plan = compile_filters([CLOSE_ABOVE_SMA, CLOSE_BELOW_SLOW_SMA, FAST_AT_LEAST_SLOW])
+
+    assert [column[Elements.ELEMENT] for column in plan.columns] == [
+        AvailableRawColumns.CLOSE_PRICE,
+        AvailableTechincalIndicators.SMA,
+        AvailableTechincalIndicators.SMA,
+    ]
+    assert [column.get(Elements.PERIOD) for column in plan.columns[1:]] == [5, 20]
+
+
+def test_unknown_relation_selects_nothing(data_frame: pd.DataFrame) -> None:
+    unknown = _filter(
+        _raw(AvailableRawColumns.OPEN_PRICE),
+        "!=",
+        _raw(AvailableRawColumns.CLOSE_PRICE),
+    )
+
+    assert compile_filters([RISING, unknown]).root is None
+    assert filter_dataset(data_frame, [RISING, unknown]).size == 0
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inkosi.backtest.operation import backtest as backtest_module
+from inkosi.backtest.operation.backtest import technical_column
+from inkosi.backtest.operation.cache import IndicatorCache
+from inkosi.backtest.operation.schemas import AvailableTechincalIndicators, Elements
+
+COLUMN_BYTES: int = 100 * 8
+
+
+def _column(value: float) -> np.ndarray:
+    return np.full(100, value)
+
+
+def test_hits_and_misses_are_counted() -> None:
+    cache = IndicatorCache(max_bytes=10 * COLUMN_BYTES)
+    calls: list[int] = []
+
+    def compute() -> np.ndarray:
+        calls.append(1)
+        return _column(1.0)
+
+    first = cache.get_or_compute("sma", compute)
+    second = cache.get_or_compute("sma", compute)
+
+    assert len(calls) == 1
+    assert second is first
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "entries": 1,
+        "bytes": COLUMN_BYTES,
+    }
+
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
+
+
+def test_least_recently_used_columns_are_evicted_by_bytes() -> None:
+    cache = IndicatorCache(max_bytes=3 * COLUMN_BYTES)
+    for key in "abc":
+        cache.put(key, _column(0.0))
+
+    # "a" becomes the most recently used, so "b" is evicted first
+    assert cache.get("a") is not None
+    cache.put("d", _column(0.0))
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in "acd")
+    assert len(cache) == 3 and cache.nbytes == 3 * COLUMN_BYTES
+
+    # A larger column evicts as many columns as needed
+    cache.put("e", np.zeros(200))
+
+    assert len(cache) == 2 and cache.nbytes == 3 * COLUMN_BYTES
+    assert cache.get("e") is not None and cache.get("d") is not None
+
+
+def test_replacing_a_key_does_not_count_twice() -> None:
+    cache = IndicatorCache(max_bytes=3 * COLUMN_BYTES)
+    cache.put("a", _column(0.0))
+    cache.put("a", _column(1.0))
+
+    assert len(cache) == 1 and cache.nbytes == COLUMN_BYTES
+    np.testing.assert_array_equal(cache.get("a"), _column(1.0))
+
+
+def test_columns_larger_than_the_cache_are_not_stored() -> None:
+    cache = IndicatorCache(max_bytes=COLUMN_BYTES)
+    cache.put("a", _column(0.0))
+
+    value = cache.put("b", np.zeros(101))
+
+    assert value.shape == (101,)
+    assert cache.get("b") is None and cache.get("a") is not None
+
+
+def test_cached_columns_are_read_only_views() -> None:
+    cache = IndicatorCache(max_bytes=COLUMN_BYTES)
+    column = _column(0.0)
+
+    value = cache.put("a", column)
+
+    assert column.flags.writeable
+    assert not value.flags.writeable
+    with pytest.raises(ValueError):
+        value[0] = 1.0
+
+
+def test_technical_column_is_memoized(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = IndicatorCache(max_bytes=1 << 20)
+    monkeypatch.setattr(backtest_module, "get_indicator_cache", lambda: cache)
+
+    data_frame = pd.DataFrame({Elements.CLOSE_PRICE: np.arange(50, dtype=float)})
+    sma = {Elements.PERIOD: 5}
+
+    first = technical_column(data_frame, AvailableTechincalIndicators.SMA, sma)
+    second = technical_column(data_frame, AvailableTechincalIndicators.SMA, sma)
+    other = technical_column(
+        data_frame,
+        AvailableTechincalIndicators.SMA,
+        {Elements.PERIOD: 10},
+    )
+
+    assert second is first and other is not first
+    assert cache.hits == 1 and cache.misses == 2
+    np.testing.assert_allclose(first[4:], np.arange(2, 48))
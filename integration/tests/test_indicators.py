@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inkosi.backtest import indicators
+
+LENGTHS: list[int] = [1, 5, 20]
+
+
+def _close(rows: int = 2000, gaps: bool = False) -> np.ndarray:
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(size=rows))
+    if gaps:
+        close[[50, 51, 400, 1200]] = np.nan
+        close[800:830] = np.nan
+
+    return close
+
+
+def _reference_ema(close: pd.Series, length: int) -> pd.Series:
+    # pandas_ta EMA: seeded with the SMA of the first `length` records
+    if len(close) < length:
+        return close * np.nan
+
+    seeded = close.copy()
+    seeded.iloc[: length - 1] = np.nan
+    seeded.iloc[length - 1] = close.iloc[:length].mean()
+
+    return seeded.ewm(span=length, adjust=False).mean()
+
+
+def _reference_ema_by_run(close: pd.Series, length: int) -> pd.Series:
+    valid = close.notna()
+    runs = (valid != valid.shift()).cumsum()
+
+    return (
+        close[valid]
+        .groupby(runs[valid], group_keys=False)
+        .apply(lambda run: _reference_ema(run, length))
+        .reindex(close.index)
+    )
+
+
+@pytest.mark.parametrize("gaps", [False, True])
+@pytest.mark.parametrize("length", LENGTHS)
+def test_sma_matches_pandas(length: int, gaps: bool) -> None:
+    close = _close(gaps=gaps)
+
+    np.testing.assert_allclose(
+        indicators.sma(close, length),
+        pd.Series(close).rolling(length).mean().to_numpy(),
+        rtol=1e-9,
+        equal_nan=True,
+    )
+
+
+@pytest.mark.parametrize("gaps", [False, True])
+@pytest.mark.parametrize("length", LENGTHS)
+def test_wma_matches_pandas(length: int, gaps: bool) -> None:
+    close = _close(gaps=gaps)
+    weights = np.arange(1, length + 1, dtype=np.float64)
+
+    np.testing.assert_allclose(
+        indicators.wma(close, length),
+        pd.Series(close)
+        .rolling(length)
+        .apply(lambda window: window @ weights / weights.sum(), raw=True)
+        .to_numpy(),
+        rtol=1e-9,
+        equal_nan=True,
+    )
+
+
+@pytest.mark.parametrize("gaps", [False, True])
+@pytest.mark.parametrize("length", LENGTHS)
+def test_ema_matches_pandas(length: int, gaps: bool) -> None:
+    close = _close(gaps=gaps)
+
+    np.testing.assert_allclose(
+        indicators.ema(close, length),
+        _reference_ema_by_run(pd.Series(close), length).to_numpy(),
+        rtol=1e-9,
+        equal_nan=True,
+    )
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_gaps_stay_local(length: int) -> None:
+    close = _close()
+    close[1000] = np.nan
+
+    for kernel in (indicators.sma, indicators.wma, indicators.ema):
+        missing = np.flatnonzero(np.isnan(kernel(close, length)[length - 1 :]))
+
+        np.testing.assert_array_equal(
+            missing + length - 1,
+            np.arange(1000, 1000 + length),
+        )
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_matches_pandas_ta(length: int) -> None:
+    pytest.importorskip("pandas_ta")
+
+    data_frame = pd.DataFrame({"Close": _close(gaps=True)})
+    for name in ("sma", "wma"):
+        np.testing.assert_allclose(
+            getattr(indicators, name)(data_frame["Close"].to_numpy(), length),
+            getattr(data_frame.ta, name)(close=data_frame["Close"], length=length),
+            rtol=1e-9,
+            equal_nan=True,
+        )
+
+    data_frame = pd.DataFrame({"Close": _close()})
+    np.testing.assert_allclose(
+        indicators.ema(data_frame["Close"].to_numpy(), length),
+        data_frame.ta.ema(close=data_frame["Close"], length=length),
+        rtol=1e-9,
+        equal_nan=True,
+    )
@@ -0,0 +1,244 @@
+import asyncio
+import os
+import signal
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import active_children
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+
+from inkosi.app.api.v1.endpoints.investor import backtest as endpoint
+from inkosi.backtest.operation import backtest as backtest_module
+from inkosi.backtest.operation import jobs as jobs_module
+from inkosi.backtest.operation.jobs import BacktestJobs, BacktestSpec, JobStatus
+from inkosi.backtest.operation.models import SourceType
+from inkosi.backtest.operation.schemas import (
+    AvailableRawColumns,
+    AvailableTechincalIndicators,
+    Elements,
+    Filter,
+    Relation,
+)
+
+FILTER: Filter = Filter(
+    first_element={Elements.ELEMENT: AvailableRawColumns.CLOSE_PRICE},
+    second_element={
+        Elements.ELEMENT: AvailableTechincalIndicators.SMA,
+        Elements.PERIOD: 50,
+    },
+    relation=Relation.GREATER,
+)
+
+
+class IdlePool:
+    """
+    Worker pool never running the jobs submitted to it.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        pass
+
+    def submit(self, *args) -> Future:
+        return Future()
+
+    def shutdown(self, **kwargs) -> None:
+        pass
+
+
+class BrokenPool(IdlePool):
+    """
+    Worker pool whose workers have died.
+    """
+
+    def submit(self, *args) -> Future:
+        raise BrokenProcessPool("A child process terminated abruptly")
+
+
+@pytest.fixture
+def spec(store: Path) -> dict:
+    return {
+        "take_profit": 0.3,
+        "stop_loss": 0.2,
+        "direction": "buy",
+        "filters": [
+            {
+                "first_element": {"ELEMENT": "Close"},
+                "second_element": {"ELEMENT": "SMA", "PERIOD": 50},
+                "relation": ">",
+            }
+        ],
+        "source": store.name,
+        "source_type": SourceType.MEMMAP,
+    }
+
+
+@pytest.fixture
+def jobs(store: Path, monkeypatch: pytest.MonkeyPatch) -> BacktestJobs:
+    monkeypatch.setattr(
+        jobs_module,
+        "get_backtesting_settings",
+        lambda: SimpleNamespace(DatasetTables=["ticks"], DataDirectory=store.parent),
+    )
+    # Inherited by the worker processes, which are forked on the first submission
+    monkeypatch.setattr(backtest_module, "get_result_cache", lambda: None)
+
+    jobs = BacktestJobs(workers=1, max_queued=2, retention=10)
+    monkeypatch.setattr(endpoint, "get_backtest_jobs", lambda: jobs)
+
+    yield jobs
+
+    jobs.shutdown()
+
+
+@pytest.fixture
+async def client(jobs: BacktestJobs) -> httpx.AsyncClient:
+    app = FastAPI()
+    app.include_router(endpoint.router)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+    ) as client:
+        yield client
+
+
+async def _wait(client: httpx.AsyncClient, job_id: str, timeout: float = 60.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        content = (await client.get(f"/backtest/{job_id}")).json()
+        if content["status"] in (JobStatus.COMPLETED, JobStatus.FAILED):
+            return content
+        await asyncio.sleep(0.05)
+
+    raise TimeoutError(f"The backtest job {job_id} has not finished")
+
+
+async def test_submit_poll_and_paginate(
+    client: httpx.AsyncClient, store: Path, spec: dict
+) -> None:
+    expected = jobs_module.run_backtest_job(
+        BacktestSpec(
+            take_profit=0.3,
+            stop_loss=0.2,
+            filters=[FILTER],
+            source=str(store),
+            source_type=SourceType.MEMMAP,
+        )
+    )
+
+    response = await client.post("/backtest", json=spec)
+    assert response.status_code == 202
+    assert response.json()["status"] == JobStatus.QUEUED
+
+    content = await _wait(client, response.json()["job_id"])
+    assert content["status"] == JobStatus.COMPLETED and content["error"] is None
+    assert content["trades"] == len(expected) > 150
+
+    pages = [
+        (
+            await client.get(
+                f"/backtest/{content['job_id']}/results",
+                params={"page": page, "page_size": 100},
+            )
+        ).json()
+        for page in (1, 2)
+    ]
+    assert [len(page["trades"]) for page in pages] == [100, 100]
+    assert pages[0]["total"] == len(expected)
+
+    trades = pages[0]["trades"] + pages[1]["trades"]
+    np.testing.assert_array_equal(
+        [trade["price_close_index"] for trade in trades],
+        expected.price_close_index[:200],
+    )
+    np.testing.assert_array_equal(
+        [trade["entry_point"] for trade in trades],
+        expected.entry_point[:200],
+    )
+
+
+async def test_unknown_jobs(client: httpx.AsyncClient) -> None:
+    assert (await client.get("/backtest/unknown")).status_code == 404
+    assert (await client.get("/backtest/unknown/results")).status_code == 404
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"source": "trades", "source_type": SourceType.SQL},
+        {"source": "../outside", "source_type": SourceType.MEMMAP},
+        {"source": "/etc/passwd", "source_type": SourceType.CSV},
+        {"source": None},
+    ],
+)
+async def test_unavailable_datasets_are_rejected(
+    client: httpx.AsyncClient,
+    jobs: BacktestJobs,
+    spec: dict,
+    changes: dict,
+) -> None:
+    response = await client.post("/backtest", json={**spec, **changes})
+
+    assert response.status_code == 422 and response.json()["detail"]
+    assert jobs._executor is None
+
+
+async def test_full_queue(
+    client: httpx.AsyncClient,
+    spec: dict,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(jobs_module, "ProcessPoolExecutor", IdlePool)
+
+    submitted = [await client.post("/backtest", json=spec) for _ in range(3)]
+
+    assert [response.status_code for response in submitted] == [202, 202, 429]
+    job_id = submitted[0].json()["job_id"]
+    status = (await client.get(f"/backtest/{job_id}")).json()["status"]
+    assert status == JobStatus.QUEUED
+    assert (await client.get(f"/backtest/{job_id}/results")).status_code == 409
+
+
+async def test_broken_pool_is_replaced(
+    client: httpx.AsyncClient,
+    jobs: BacktestJobs,
+    spec: dict,
+) -> None:
+    first = (await client.post("/backtest", json=spec)).json()
+    assert (await _wait(client, first["job_id"]))["status"] == JobStatus.COMPLETED
+
+    for process in active_children():
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+
+    # Depending on when the pool notices the death of its worker, the next job is
+    # either failed with the pool or handed over to a new one, but never lost
+    second = await client.post("/backtest", json=spec)
+    assert second.status_code == 202
+    assert (await _wait(client, second.json()["job_id"]))["status"] in (
+        JobStatus.COMPLETED,
+        JobStatus.FAILED,
+    )
+
+    third = await client.post("/backtest", json=spec)
+    assert third.status_code == 202
+    status = (await _wait(client, third.json()["job_id"]))["status"]
+    assert status == JobStatus.COMPLETED
+
+
+async def test_unavailable_workers(
+    client: httpx.AsyncClient,
+    spec: dict,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(jobs_module, "ProcessPoolExecutor", BrokenPool)
+
+    response = await client.post("/backtest", json=spec)
+
+    assert response.status_code == 503 and "retry later" in response.json()["detail"]
@@ -0,0 +1,135 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inkosi.backtest.operation.backtest import backtest
+from inkosi.backtest.operation.models import (
+    BacktestEngine,
+    BacktestRequest,
+    SourceType,
+    TradeResult,
+    TradeStatus,
+)
+from inkosi.backtest.operation.montecarlo import PathsBacktestResult, paths_backtest
+from inkosi.backtest.operation.scenarios import simulate
+from inkosi.backtest.operation.schemas import SamplingMethods
+from inkosi.backtest.operation.sources import Dataset
+from inkosi.backtest.operation.store import write_tick_store
+from inkosi.database.mongodb.schemas import Position
+
+STEPS: int = 500
+SPREAD: float = 0.02
+STARTING_INDEXES: list[int] = [0, 40, 90, 200, 350, 480]
+DIRECTION: list[Position] = [
+    Position.BUY,
+    Position.SELL,
+    Position.BUY,
+    Position.SELL,
+    Position.BUY,
+    Position.SELL,
+]
+TAKE_PROFITS: list[float] = [0.5, 0.4, 1.0, 0.3, 100.0, 0.5]
+STOP_LOSSES: list[float] = [0.5, 0.6, 0.2, 0.3, 100.0, 0.5]
+
+
+@pytest.fixture(scope="module")
+def paths() -> np.ndarray:
+    return simulate(
+        np.linspace(95.0, 100.0, 50),
+        SamplingMethods.NORMAL_DISTRIBUTION,
+        steps_forward=STEPS,
+        samples=8,
+        scale=1.0,
+        seed=3,
+    ).paths
+
+
+@pytest.fixture(scope="module")
+def result(paths: np.ndarray) -> PathsBacktestResult:
+    return paths_backtest(
+        paths,
+        STARTING_INDEXES,
+        DIRECTION,
+        TAKE_PROFITS,
+        STOP_LOSSES,
+        spread=SPREAD,
+    )
+
+
+@pytest.mark.parametrize("engine", [BacktestEngine.VECTORIZED, BacktestEngine.INDEXED])
+def test_each_path_matches_backtest(
+    paths: np.ndarray,
+    result: PathsBacktestResult,
+    engine: BacktestEngine,
+    tmp_path: Path,
+) -> None:
+    for item in [0, len(result) - 1]:
+        store = write_tick_store(
+            np.column_stack(
+                [
+                    pd.date_range("2023-01-01", periods=STEPS, freq="s").asi8,
+                    paths[item],
+                    paths[item] + SPREAD,
+                ]
+            ),
+            tmp_path.joinpath(str(item)),
+        )
+        expected = backtest(
+            BacktestRequest(
+                starting_indexes=STARTING_INDEXES,
+                direction=DIRECTION,
+                take_profits=TAKE_PROFITS,
+                stop_losses=STOP_LOSSES,
+                dataset=Dataset(store, source_type=SourceType.MEMMAP),
+                engine=engine,
+                cache=False,
+            )
+        )
+
+        path = result.path(item)
+        for field in [
+            "direction",
+            "entry_point",
+            "entry_point_index",
+            "price_close",
+            "price_close_index",
+            "status",
+            "result",
+        ]:
+            np.testing.assert_array_equal(
+                getattr(path, field),
+                getattr(expected, field),
+                err_msg=field,
+            )
+
+
+def test_unresolved_trades_are_pending(result: PathsBacktestResult) -> None:
+    # The barriers of the fifth trade are out of reach on every path
+    assert np.all(result.price_close_index[:, 4] == -1)
+    assert np.all(np.isnan(result.price_close[:, 4]))
+    assert np.all(result.status[:, 4] == TradeStatus.list().index(TradeStatus.PENDING))
+    assert np.all(result.result[:, 4] == TradeResult.list().index(TradeResult.PENDING))
+    assert np.all(result.holding_periods()[:, 4] == -1)
+
+    profits = (result.result == TradeResult.list().index(TradeResult.PROFIT)).sum(1)
+    closed = (result.status == TradeStatus.list().index(TradeStatus.CLOSED)).sum(1)
+    np.testing.assert_allclose(result.win_rates(), profits / result.result.shape[1])
+    np.testing.assert_allclose(
+        result.win_rates(include_pending=False), profits / closed
+    )
+
+
+def test_trades_beyond_the_paths_are_discarded(paths: np.ndarray) -> None:
+    result = paths_backtest(
+        paths,
+        [10, STEPS - 1, 20],
+        [Position.BUY, Position.BUY, Position.SELL],
+        [0.5, 0.5, 0.5],
+        [0.5, 0.5, 0.5],
+    )
+
+    # As by `backtest`, the trades from the first one beyond the paths are discarded
+    np.testing.assert_array_equal(result.entry_point_index, [11])
+    assert result.result.shape == (len(paths), 1)
@@ -0,0 +1,157 @@
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inkosi.backtest.operation import quote as quote_module
+from inkosi.backtest.operation.cache import QuoteCache
+from inkosi.backtest.operation.providers import (
+    QUOTE_COLUMNS,
+    LocalFileProvider,
+    QuoteProvider,
+)
+from inkosi.backtest.operation.quote import Quote
+from inkosi.log.log import Logger
+
+START: date = date(2023, 1, 2)
+END: date = date(2023, 2, 1)
+
+
+def _quotes(start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    dates = pd.date_range(start, end, freq="D", inclusive="left")
+    close = 100.0 + np.arange(dates.shape[0], dtype=np.float64)
+
+    return pd.DataFrame(
+        {"Open": close - 0.5, "High": close + 1.0, "Low": close - 1.0, "Close": close},
+        index=dates,
+    )
+
+
+class StubProvider(QuoteProvider):
+    def __init__(self, empty: bool = False) -> None:
+        self.empty = empty
+        self.calls: list[tuple[pd.Timestamp, pd.Timestamp]] = []
+
+    def history(
+        self,
+        ticker: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        interval: str,
+    ) -> pd.DataFrame:
+        self.calls.append((start, end))
+        if self.empty:
+            return pd.DataFrame(columns=QUOTE_COLUMNS, index=pd.DatetimeIndex([]))
+
+        return _quotes(start, end)
+
+
+def _quote(provider: QuoteProvider) -> Quote:
+    quote = Quote(offline=False, provider=provider)
+    # The logs of the tests are not registered to the database
+    quote.logger = Logger("Quote", package_name="backtest.operation", database=False)
+
+    return quote
+
+
+@pytest.fixture
+def cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> QuoteCache:
+    cache = QuoteCache(tmp_path)
+    monkeypatch.setattr(quote_module, "get_quote_cache", lambda: cache)
+
+    return cache
+
+
+def test_downloads_are_cached(cache: QuoteCache) -> None:
+    provider = StubProvider()
+    quote = _quote(provider)
+
+    first = quote.download_quote("TEST", START, END)
+    second = quote.download_quote("TEST", START, END)
+
+    assert len(provider.calls) == 1
+    assert cache.coverage("TEST", "1d") == [(pd.Timestamp(START), pd.Timestamp(END))]
+    np.testing.assert_array_equal(second["Close"], first["Close"])
+    np.testing.assert_array_equal(first["Returns"], first["Close"] - first["Open"])
+
+
+def test_empty_downloads_are_not_cached(cache: QuoteCache) -> None:
+    provider = StubProvider(empty=True)
+    quote = _quote(provider)
+
+    assert quote.download_quote("UNKNOWN", START, END) is None
+    assert cache.coverage("UNKNOWN", "1d") == []
+
+    # The range is still missing, so it is requested again
+    assert quote.download_quote("UNKNOWN", START, END) is None
+    assert len(provider.calls) == 2
+
+    provider.empty = False
+    assert len(quote.download_quote("UNKNOWN", START, END)["Close"]) == 30
+    assert len(provider.calls) == 3
+
+
+def test_empty_quotes_are_not_written(cache: QuoteCache) -> None:
+    cache.write(
+        "TEST",
+        "1d",
+        pd.DataFrame(columns=QUOTE_COLUMNS, index=pd.DatetimeIndex([])),
+        pd.Timestamp(START),
+        pd.Timestamp(END),
+    )
+
+    assert cache.coverage("TEST", "1d") == []
+    assert not list(cache.directory.iterdir())
+
+
+@pytest.fixture
+def files(tmp_path: Path) -> Path:
+    _quotes(pd.Timestamp("2023-01-01"), pd.Timestamp("2023-01-21")).to_csv(
+        tmp_path.joinpath("AAPL_1d.csv")
+    )
+    # Weekly quotes, tz-aware, only partly overlapping the daily ones
+    weekly = _quotes(pd.Timestamp("2023-01-08"), pd.Timestamp("2023-03-01"))
+    weekly = weekly[weekly.index.dayofweek == 6]
+    weekly.index = weekly.index.tz_localize("UTC")
+    weekly.to_parquet(tmp_path.joinpath("BRK%2FB_1d.parquet"))
+    # Quotes outside of the requested range
+    _quotes(pd.Timestamp("2022-01-01"), pd.Timestamp("2022-02-01")).to_csv(
+        tmp_path.joinpath("OLD_1d.csv")
+    )
+
+    return tmp_path
+
+
+def test_download_quotes_splits_successes_and_failures(files: Path) -> None:
+    quote = _quote(LocalFileProvider(files))
+    tickers = ["AAPL", "MISSING", "BRK/B", "OLD"]
+
+    batch = quote.download_quotes(tickers, START, END, workers=2)
+
+    assert batch.tickers == ["AAPL", "BRK/B"]
+    assert batch.failed == ["MISSING", "OLD"]
+
+    expected = {
+        ticker: quote.download_quote(ticker, START, END) for ticker in batch.tickers
+    }
+    dates = np.union1d(expected["AAPL"]["Dates"], expected["BRK/B"]["Dates"])
+    np.testing.assert_array_equal(batch.dates, dates)
+    assert len(batch) == 21 and batch.close.shape == (2, 21)
+
+    for ticker, quotes in expected.items():
+        prices = batch.ticker(ticker)
+        positions = np.searchsorted(dates, quotes["Dates"])
+        for column in QUOTE_COLUMNS:
+            np.testing.assert_array_equal(prices[column][positions], quotes[column])
+            assert np.isnan(np.delete(prices[column], positions)).all()
+
+
+def test_download_quotes_when_every_ticker_fails(files: Path) -> None:
+    batch = _quote(LocalFileProvider(files)).download_quotes(
+        ["MISSING", "OLD"], START, END
+    )
+
+    assert batch.tickers == [] and batch.failed == ["MISSING", "OLD"]
+    assert len(batch) == 0 and batch.close.shape == (0, 0)
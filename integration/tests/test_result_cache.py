@@ -0,0 +1,166 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from inkosi.backtest.operation import backtest as backtest_module
+from inkosi.backtest.operation.backtest import backtest
+from inkosi.backtest.operation.cache import ResultCache
+from inkosi.backtest.operation.models import (
+    BacktestEngine,
+    BacktestRequest,
+    BacktestResult,
+    SourceType,
+)
+from inkosi.backtest.operation.sources import Dataset
+from inkosi.database.mongodb.schemas import Position
+
+FIELDS: list[str] = [
+    "direction",
+    "entry_point",
+    "entry_point_index",
+    "take_profit",
+    "stop_loss",
+    "price_close",
+    "price_close_index",
+    "status",
+    "result",
+]
+
+
+def _request(dataset: object = None, **changes) -> BacktestRequest:
+    request = BacktestRequest(
+        starting_indexes=[10, 20, 30],
+        direction=[Position.BUY, Position.SELL, Position.BUY],
+        take_profits=[0.3, 0.3, 0.3],
+        stop_losses=[0.2, 0.2, 0.2],
+        dataset=dataset,
+    )
+
+    return replace(request, **changes)
+
+
+def _result(trades: int = 3) -> BacktestResult:
+    return BacktestResult(
+        direction=np.zeros(trades, dtype=np.int8),
+        entry_point=np.linspace(1.0, 2.0, trades),
+        entry_point_index=np.arange(trades, dtype=np.int64),
+        take_profit=np.full(trades, 0.3),
+        stop_loss=np.full(trades, 0.2),
+        price_close=np.linspace(1.3, 2.3, trades),
+        price_close_index=np.arange(trades, dtype=np.int64) + 5,
+        status=np.zeros(trades, dtype=np.int8),
+        result=np.zeros(trades, dtype=np.int8),
+    )
+
+
+def _assert_same_trades(result: BacktestResult, expected: BacktestResult) -> None:
+    for field in FIELDS:
+        np.testing.assert_array_equal(
+            getattr(result, field),
+            getattr(expected, field),
+            err_msg=field,
+        )
+
+
+def test_hit_and_miss(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path, max_bytes=1 << 20)
+    key = cache.key(_request(), "data")
+
+    assert cache.get(key) is None
+    cache.put(key, _result())
+    _assert_same_trades(cache.get(key), _result())
+
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert len(cache) == 1 and not list(tmp_path.glob("*.part"))
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"starting_indexes": [10, 20, 31]},
+        {"direction": [Position.BUY, Position.BUY, Position.BUY]},
+        {"take_profits": [0.3, 0.3, 0.31]},
+        {"stop_losses": [0.2, 0.25, 0.2]},
+        {"engine": BacktestEngine.INDEXED},
+    ],
+)
+def test_key_depends_on_the_request(changes: dict) -> None:
+    key = ResultCache.key(_request(), "data")
+
+    assert ResultCache.key(_request(), "data") == key
+    assert ResultCache.key(_request(**changes), "data") != key
+
+
+def test_key_depends_on_the_data_fingerprint() -> None:
+    assert ResultCache.key(_request(), "data") != ResultCache.key(_request(), "other")
+
+
+def test_cache_is_not_shared_by_parameters(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path, max_bytes=1 << 20)
+    cache.put(cache.key(_request(), "data"), _result())
+
+    assert cache.get(cache.key(_request(take_profits=[0.4] * 3), "data")) is None
+    assert cache.get(cache.key(_request(), "other")) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path, max_bytes=1 << 20)
+    cache.put("first", _result())
+    entry = cache.nbytes
+
+    cache = ResultCache(tmp_path, max_bytes=int(2.5 * entry))
+    cache.put("second", _result())
+    for age, key in enumerate(["second", "first"]):
+        os.utime(tmp_path.joinpath(f"{key}.npz"), (1000 + age, 1000 + age))
+
+    # The lookup of "second" makes it the most recently used entry
+    assert cache.get("second") is not None
+    cache.put("third", _result())
+
+    assert cache.get("first") is None
+    assert cache.get("second") is not None and cache.get("third") is not None
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_corrupt_entries_are_misses(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path, max_bytes=1 << 20)
+    tmp_path.joinpath("corrupt.npz").write_bytes(b"not an archive")
+
+    assert cache.get("corrupt") is None and cache.misses == 1
+
+
+def test_concurrent_puts_of_the_same_key(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path, max_bytes=1 << 30)
+    results = [_result(trades) for trades in range(1000, 1016)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda result: cache.put("same", result), results))
+
+    cached = cache.get("same")
+    assert cached is not None
+    assert any(len(cached) == len(result) for result in results)
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_backtest_is_served_from_the_cache(
+    store: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache = ResultCache(tmp_path, max_bytes=1 << 20)
+    monkeypatch.setattr(backtest_module, "get_result_cache", lambda: cache)
+    dataset = Dataset(store, source_type=SourceType.MEMMAP)
+
+    computed = backtest(_request(dataset))
+    cached = backtest(_request(dataset))
+
+    assert cache.misses == 1 and cache.hits == 1
+    _assert_same_trades(cached, computed)
+    assert cached.time_opening is not None
+
+    backtest(_request(dataset, cache=False))
+    assert cache.misses == 1 and cache.hits == 1
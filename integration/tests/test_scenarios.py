@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from inkosi.backtest.operation import scenarios
+from inkosi.backtest.operation.asset import Asset
+from inkosi.backtest.operation.scenarios import MAX_PATHS, simulate
+from inkosi.backtest.operation.schemas import AvailableRawColumns, SamplingMethods
+
+HISTORY: np.ndarray = np.linspace(90.0, 100.0, 20)
+QUANTILES: list[float] = [0.0, 0.05, 0.25, 0.5, 0.75, 0.95, 1.0]
+STEPS: int = 30
+BINS: int = 1024
+
+
+def _exact(
+    sampling_method: SamplingMethods,
+    samples: int,
+    chunk_size: int,
+) -> tuple[scenarios.ScenarioResult, scenarios.ScenarioResult]:
+    arguments = dict(
+        history=HISTORY,
+        sampling_method=sampling_method,
+        steps_forward=STEPS,
+        samples=samples,
+        scale=1.0,
+        seed=42,
+        chunk_size=chunk_size,
+    )
+
+    return (
+        simulate(**arguments),
+        simulate(**arguments, quantiles=QUANTILES, bins=BINS),
+    )
+
+
+def _assert_bands_match(paths: np.ndarray, bands: np.ndarray) -> None:
+    # The bands are accurate to a bin of a histogram spanning at most twice the
+    # range of the paths
+    exact = np.quantile(paths, QUANTILES, axis=0)
+    tolerance = 2 * 2 * np.ptp(paths, axis=0) / BINS + 1e-9
+
+    assert np.all(np.abs(bands - exact) <= tolerance)
+
+
+@pytest.mark.parametrize("sampling_method", SamplingMethods.list())
+def test_bands_match_numpy_quantiles(sampling_method: SamplingMethods) -> None:
+    paths, reduced = _exact(sampling_method, samples=4000, chunk_size=1000)
+
+    assert paths.paths.shape == (4000, STEPS) and reduced.paths is None
+    assert reduced.bands.shape == (len(QUANTILES), STEPS)
+    np.testing.assert_allclose(reduced.mean, paths.mean)
+    np.testing.assert_array_equal(paths.paths[:, 0], HISTORY[-1])
+    _assert_bands_match(paths.paths, reduced.bands)
+
+
+def test_out_of_range_paths_are_rebinned(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[int] = []
+    reduce_chunk = scenarios._reduce_chunk
+
+    def counting(*arguments):
+        calls.append(1)
+        return reduce_chunk(*arguments)
+
+    monkeypatch.setattr(scenarios, "_reduce_chunk", counting)
+
+    # The first chunk of 5 paths cannot cover the tails of 5000 Laplace paths
+    paths, reduced = _exact(
+        SamplingMethods.LAPLACE_DISTRIBUTION,
+        samples=5000,
+        chunk_size=5,
+    )
+
+    assert len(calls) == 2 * 1000
+    _assert_bands_match(paths.paths, reduced.bands)
+    np.testing.assert_allclose(reduced.bands[0, 1:], paths.paths.min(axis=0)[1:])
+    np.testing.assert_allclose(
+        reduced.bands[-1, 1:],
+        paths.paths.max(axis=0)[1:],
+        rtol=1e-6,
+    )
+
+
+def test_paths_only_depend_on_the_seed() -> None:
+    arguments = dict(
+        history=HISTORY,
+        sampling_method=SamplingMethods.NORMAL_DISTRIBUTION,
+        steps_forward=STEPS,
+        samples=300,
+        scale=1.0,
+        chunk_size=100,
+    )
+
+    first = simulate(**arguments, seed=1)
+
+    np.testing.assert_array_equal(simulate(**arguments, seed=1).paths, first.paths)
+    np.testing.assert_array_equal(
+        simulate(**arguments, seed=1, workers=2).paths,
+        first.paths,
+    )
+    assert not np.array_equal(simulate(**arguments, seed=2).paths, first.paths)
+
+
+def test_unknown_sampling_method() -> None:
+    assert simulate(HISTORY, "Cauchy Sampling", STEPS, 10, 1.0) is None
+
+
+def test_asset_caps_the_paths_without_quantiles() -> None:
+    asset = Asset(
+        "TEST",
+        result={
+            AvailableRawColumns.CLOSE_PRICE: HISTORY,
+            AvailableRawColumns.OPEN_PRICE: HISTORY,
+        },
+    )
+
+    assert (
+        asset.sampling(
+            SamplingMethods.NORMAL_DISTRIBUTION,
+            steps_forward=10,
+            samples=MAX_PATHS + 1,
+        )
+        is None
+    )
+
+    result = asset.sampling(
+        SamplingMethods.NORMAL_DISTRIBUTION,
+        steps_forward=10,
+        samples=MAX_PATHS + 1,
+        quantiles=[0.5],
+        seed=0,
+    )
+    assert result.paths is None and result.bands.shape == (1, 10)
@@ -0,0 +1,173 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inkosi.backtest.operation.models import SourceType
+from inkosi.backtest.operation.sources import Dataset
+
+ROWS: int = 200
+START: str = "2023-01-01 00:00:50"
+END: str = "2023-01-01 00:01:39"
+
+
+@pytest.fixture(scope="module")
+def ticks() -> pd.DataFrame:
+    generator = np.random.default_rng(5)
+    bid = 1.1 + np.cumsum(generator.normal(scale=1e-4, size=ROWS))
+
+    return pd.DataFrame(
+        {
+            "Datetime": pd.date_range("2023-01-01", periods=ROWS, freq="s"),
+            "Bid": bid,
+            "Ask": bid + 2e-5,
+            "Volume": generator.integers(1, 100, size=ROWS),
+        }
+    )
+
+
+@pytest.fixture(scope="module")
+def files(ticks: pd.DataFrame, tmp_path_factory: pytest.TempPathFactory) -> dict:
+    directory = tmp_path_factory.mktemp("sources")
+    files = {
+        SourceType.CSV: directory.joinpath("ticks.csv"),
+        SourceType.PARQUET: directory.joinpath("ticks.parquet"),
+    }
+    ticks.to_csv(files[SourceType.CSV], index=False)
+    ticks.to_parquet(files[SourceType.PARQUET], index=False)
+
+    return files
+
+
+def _kwargs(source_type: SourceType) -> dict:
+    # The default CSV parser may be off by one unit in the last place
+    return {"float_precision": "round_trip"} if source_type == SourceType.CSV else {}
+
+
+def _expected(ticks: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    selected = ticks[(ticks["Datetime"] >= START) & (ticks["Datetime"] <= END)]
+
+    return selected[columns].reset_index(drop=True)
+
+
+def test_dataset_is_loaded_lazily(tmp_path: Path) -> None:
+    dataset = Dataset(
+        str(tmp_path.joinpath("missing.csv")),
+        source_type=SourceType.CSV,
+    )
+
+    with pytest.raises(FileNotFoundError):
+        dataset.get_dataset()
+
+
+@pytest.mark.parametrize("source_type", [SourceType.CSV, SourceType.PARQUET])
+def test_columns_are_projected_in_order(
+    files: dict,
+    ticks: pd.DataFrame,
+    source_type: SourceType,
+) -> None:
+    columns = ["Datetime", "Ask", "Bid"]
+    dataset = Dataset(
+        str(files[source_type]),
+        source_type,
+        columns=columns,
+        **_kwargs(source_type),
+    )
+
+    dataset.load()
+
+    assert list(dataset.dataset.columns) == columns
+    np.testing.assert_array_equal(dataset.get_column(1), ticks["Ask"].to_numpy())
+    np.testing.assert_array_equal(dataset.get_column(2), ticks["Bid"].to_numpy())
+
+
+@pytest.mark.parametrize("source_type", [SourceType.CSV, SourceType.PARQUET])
+def test_time_range_is_pushed_down(
+    files: dict,
+    ticks: pd.DataFrame,
+    source_type: SourceType,
+) -> None:
+    columns = ["Datetime", "Bid", "Ask"]
+    dataset = Dataset(
+        str(files[source_type]),
+        source_type,
+        columns=columns,
+        start=START,
+        end=END,
+        **_kwargs(source_type),
+    )
+
+    dataset.load()
+    expected = _expected(ticks, columns)
+
+    # Both bounds are included
+    assert len(dataset.dataset) == 50
+    np.testing.assert_array_equal(
+        pd.to_datetime(dataset.dataset["Datetime"]).to_numpy(),
+        expected["Datetime"].to_numpy(),
+    )
+    np.testing.assert_array_equal(dataset.get_column(1), expected["Bid"].to_numpy())
+
+
+def test_parquet_filters_reach_the_reader(
+    files: dict,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[dict] = []
+    read_parquet = pd.read_parquet
+
+    def recording(*args, **kwargs) -> pd.DataFrame:
+        calls.append(kwargs)
+        return read_parquet(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_parquet", recording)
+    Dataset(
+        str(files[SourceType.PARQUET]),
+        SourceType.PARQUET,
+        columns=["Datetime", "Bid"],
+        start=START,
+    ).load()
+
+    assert calls[0]["columns"] == ["Datetime", "Bid"]
+    assert calls[0]["filters"] == [("Datetime", ">=", pd.Timestamp(START))]
+
+
+def test_integer_times_and_custom_time_column(
+    ticks: pd.DataFrame,
+    tmp_path: Path,
+) -> None:
+    source = tmp_path.joinpath("ticks.parquet")
+    ticks.assign(Time=ticks["Datetime"].astype("int64")).to_parquet(source)
+
+    dataset = Dataset(
+        str(source),
+        SourceType.PARQUET,
+        columns=["Time", "Bid"],
+        start=START,
+        end=END,
+        time_column="Time",
+    )
+
+    np.testing.assert_array_equal(
+        dataset.get_column(1),
+        _expected(ticks, ["Bid"])["Bid"].to_numpy(),
+    )
+
+
+def test_unsorted_csv_is_masked(ticks: pd.DataFrame, tmp_path: Path) -> None:
+    source = tmp_path.joinpath("ticks.csv")
+    ticks.iloc[::-1].to_csv(source, index=False)
+
+    dataset = Dataset(
+        str(source),
+        SourceType.CSV,
+        start=START,
+        end=END,
+        **_kwargs(SourceType.CSV),
+    )
+
+    np.testing.assert_array_equal(
+        np.sort(dataset.get_column(1)),
+        np.sort(_expected(ticks, ["Bid"])["Bid"].to_numpy()),
+    )
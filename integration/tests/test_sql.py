@@ -0,0 +1,96 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import MetaData, create_engine, event
+from sqlalchemy.engine import Engine
+
+from inkosi.backtest.operation import sources
+from inkosi.backtest.operation.models import SourceType
+from inkosi.backtest.operation.sources import Dataset
+
+ROWS: int = 1000
+BATCH_SIZE: int = 64
+
+
+@pytest.fixture
+def engine(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Engine:
+    engine = create_engine(f"sqlite:///{tmp_path.joinpath('ticks.db')}")
+
+    bid = 1.1 + np.cumsum(np.random.default_rng(2).normal(scale=1e-4, size=ROWS))
+    pd.DataFrame(
+        {
+            "datetime": pd.date_range("2023-01-01", periods=ROWS, freq="s").astype(
+                "int64"
+            ),
+            "bid": bid,
+            "ask": bid + 2e-5,
+            "volume": np.arange(ROWS),
+        }
+    ).to_sql("ticks", engine, index=False)
+
+    monkeypatch.setattr(
+        sources,
+        "PostgreSQLInstance",
+        lambda: SimpleNamespace(engine=engine, metadata=MetaData()),
+    )
+    monkeypatch.setattr(
+        sources,
+        "get_postgresql_settings",
+        lambda: SimpleNamespace(BATCH_SIZE=BATCH_SIZE),
+    )
+
+    return engine
+
+
+def test_columns_and_time_range(engine: Engine) -> None:
+    progress: list[tuple[int, int]] = []
+    dataset = Dataset(
+        "ticks",
+        SourceType.SQL,
+        columns=["datetime", "bid"],
+        start=pd.Timestamp("2023-01-01 00:01:40"),
+        end=pd.Timestamp("2023-01-01 00:08:19"),
+        progress=lambda loaded, total: progress.append((loaded, total)),
+    )
+
+    expected = pd.read_sql_table("ticks", engine).iloc[100:500]
+
+    np.testing.assert_array_equal(
+        dataset.get_column(0),
+        expected["datetime"].to_numpy(),
+    )
+    np.testing.assert_array_equal(dataset.get_column(1), expected["bid"].to_numpy())
+    assert dataset.get_column(1).dtype == np.float64
+    assert progress[-1] == (400, 400) and len(progress) == -(-400 // BATCH_SIZE)
+
+
+def test_records_appended_while_streaming_are_ignored(engine: Engine) -> None:
+    # Append records right after the count, as a concurrent writer would
+    @event.listens_for(engine, "after_cursor_execute")
+    def append(connection, cursor, statement, *args) -> None:
+        if "count(" in statement.lower():
+            cursor.connection.execute(
+                "INSERT INTO ticks SELECT datetime + 1000000000000, bid, ask, volume"
+                " FROM ticks LIMIT 10"
+            )
+
+    try:
+        dataset = Dataset("ticks", SourceType.SQL, columns=["datetime", "bid", "ask"])
+        bid = dataset.get_column(1)
+    finally:
+        event.remove(engine, "after_cursor_execute", append)
+
+    assert bid.shape == (ROWS,)
+    np.testing.assert_array_equal(
+        bid,
+        pd.read_sql_table("ticks", engine)["bid"].to_numpy()[:ROWS],
+    )
+
+
+def test_unsupported_arguments_are_ignored(engine: Engine) -> None:
+    dataset = Dataset("ticks", SourceType.SQL, columns=["bid"], chunksize=10)
+
+    assert dataset.get_column(0).shape == (ROWS,)
@@ -0,0 +1,106 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inkosi.backtest.operation.models import (
+    TICKS_ASK_INDEX,
+    TICKS_BID_INDEX,
+    TICKS_DATETIME_INDEX,
+    SourceType,
+)
+from inkosi.backtest.operation.sources import Dataset
+from inkosi.backtest.operation.store import TickStore, write_tick_store
+
+ROWS: int = 1000
+
+
+@pytest.fixture(scope="module")
+def columns() -> dict[int, np.ndarray]:
+    generator = np.random.default_rng(11)
+
+    # Odd nanoseconds, which do not survive a cast to float64 at this magnitude
+    times = pd.Timestamp("2023-06-01", tz="UTC").value + np.cumsum(
+        generator.integers(1, 10**9, size=ROWS)
+    )
+    bid = 1.1 + np.cumsum(generator.normal(scale=1e-4, size=ROWS))
+
+    return {
+        TICKS_DATETIME_INDEX: times | 1,
+        TICKS_BID_INDEX: bid,
+        TICKS_ASK_INDEX: bid + 2e-5,
+    }
+
+
+@pytest.fixture(scope="module")
+def store(columns: dict, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    chunks = (
+        pd.DataFrame(
+            {index: column[start : start + 300] for index, column in columns.items()}
+        )
+        for start in range(0, ROWS, 300)
+    )
+
+    return write_tick_store(chunks, tmp_path_factory.mktemp("store"))
+
+
+def test_columns_round_trip_exactly(store: Path, columns: dict) -> None:
+    tick_store = TickStore(store)
+
+    assert len(tick_store) == ROWS
+    for index, column in columns.items():
+        assert tick_store.column(index).dtype == column.dtype
+        np.testing.assert_array_equal(tick_store.column(index), column)
+
+
+def test_dataset_keeps_exact_timestamps(store: Path, columns: dict) -> None:
+    dataset = Dataset(store, source_type=SourceType.MEMMAP)
+    times = columns[TICKS_DATETIME_INDEX]
+
+    assert float(times[1]) == float(times[1] + 1)
+    np.testing.assert_array_equal(dataset.get_column(TICKS_DATETIME_INDEX), times)
+
+    stacked = dataset.get_dataset()
+    assert stacked.shape == (ROWS, 3)
+    np.testing.assert_array_equal(
+        stacked[:, TICKS_DATETIME_INDEX].astype(np.int64),
+        times,
+    )
+    np.testing.assert_array_equal(
+        stacked[:, TICKS_BID_INDEX].astype(np.float64),
+        columns[TICKS_BID_INDEX],
+    )
+    np.testing.assert_array_equal(
+        dataset.time_index().timestamps(np.arange(ROWS)).view(np.int64),
+        times,
+    )
+
+
+def test_price_columns_stay_float64(store: Path, columns: dict) -> None:
+    dataset = Dataset(
+        store,
+        source_type=SourceType.MEMMAP,
+        columns=["bid", "ask"],
+    )
+
+    stacked = dataset.get_dataset()
+
+    assert stacked.dtype == np.float64
+    np.testing.assert_array_equal(stacked[:, 0], columns[TICKS_BID_INDEX])
+
+
+def test_time_range_is_a_slice(store: Path, columns: dict) -> None:
+    times = columns[TICKS_DATETIME_INDEX]
+    dataset = Dataset(
+        store,
+        source_type=SourceType.MEMMAP,
+        start=pd.Timestamp(int(times[100])),
+        end=pd.Timestamp(int(times[199])),
+    )
+
+    np.testing.assert_array_equal(
+        dataset.get_column(TICKS_DATETIME_INDEX),
+        times[100:200],
+    )
+    assert isinstance(dataset.get_column(TICKS_BID_INDEX), np.memmap)
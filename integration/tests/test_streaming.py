@@ -0,0 +1,164 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inkosi.backtest.operation.backtest import backtest
+from inkosi.backtest.operation.models import (
+    TICKS_ASK_INDEX,
+    TICKS_BID_INDEX,
+    TICKS_DATETIME_INDEX,
+    BacktestRequest,
+    BacktestResult,
+    SourceType,
+    TradeResult,
+)
+from inkosi.backtest.operation.sources import Dataset
+from inkosi.backtest.operation.store import TickStore
+from inkosi.backtest.operation.streaming import read_chunks, streaming_backtest
+from inkosi.database.mongodb.schemas import Position
+
+CHUNK_SIZE: int = 1500
+PRICES: list[int] = [TICKS_BID_INDEX, TICKS_ASK_INDEX]
+
+FIELDS: list[str] = [
+    "direction",
+    "entry_point",
+    "entry_point_index",
+    "take_profit",
+    "stop_loss",
+    "price_close",
+    "price_close_index",
+    "status",
+    "result",
+]
+
+
+@pytest.fixture(scope="module")
+def ticks(store: Path) -> pd.DataFrame:
+    tick_store = TickStore(store)
+
+    return pd.DataFrame(
+        {
+            "Datetime": tick_store.column(TICKS_DATETIME_INDEX).view("datetime64[ns]"),
+            "Bid": tick_store.column(TICKS_BID_INDEX),
+            "Ask": tick_store.column(TICKS_ASK_INDEX),
+        }
+    )
+
+
+@pytest.fixture(scope="module")
+def files(ticks: pd.DataFrame, tmp_path_factory: pytest.TempPathFactory) -> dict:
+    directory = tmp_path_factory.mktemp("files")
+    files = {
+        SourceType.PARQUET: directory.joinpath("ticks.parquet"),
+        SourceType.CSV: directory.joinpath("ticks.csv"),
+    }
+    ticks.to_parquet(files[SourceType.PARQUET], row_group_size=CHUNK_SIZE)
+    ticks.to_csv(files[SourceType.CSV], index=False)
+
+    try:
+        import tables  # noqa: F401
+    except ImportError:
+        return files
+
+    files[SourceType.HDF] = directory.joinpath("ticks.h5")
+    ticks.to_hdf(files[SourceType.HDF], key="ticks", format="table", index=False)
+
+    return files
+
+
+@pytest.fixture(scope="module")
+def expected(
+    store: Path,
+    trades: tuple[list[int], list[Position]],
+) -> BacktestResult:
+    starting_indexes, direction = trades
+
+    return backtest(
+        BacktestRequest(
+            starting_indexes=starting_indexes,
+            direction=direction,
+            take_profits=[0.3] * len(starting_indexes),
+            stop_losses=[0.2] * len(starting_indexes),
+            dataset=Dataset(store, source_type=SourceType.MEMMAP),
+            cache=False,
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "source_type",
+    [SourceType.PARQUET, SourceType.CSV, SourceType.HDF],
+)
+def test_prices_are_read_as_float64(files: dict, source_type: SourceType) -> None:
+    if source_type not in files:
+        pytest.skip("PyTables is not installed")
+
+    chunks = list(read_chunks(files[source_type], source_type, CHUNK_SIZE, PRICES))
+
+    assert len(chunks) == -(-sum(chunk.shape[0] for chunk in chunks) // CHUNK_SIZE)
+    for chunk in chunks:
+        assert list(chunk.columns) == PRICES
+        assert (chunk.dtypes == np.float64).all()
+
+
+@pytest.mark.parametrize(
+    "source_type",
+    [SourceType.PARQUET, SourceType.CSV, SourceType.HDF],
+)
+def test_streaming_matches_backtest(
+    files: dict,
+    trades: tuple[list[int], list[Position]],
+    expected: BacktestResult,
+    source_type: SourceType,
+) -> None:
+    if source_type not in files:
+        pytest.skip("PyTables is not installed")
+
+    # The default CSV parser may be off by one unit in the last place
+    kwargs = {"float_precision": "round_trip"} if source_type == SourceType.CSV else {}
+
+    starting_indexes, direction = trades
+    result = streaming_backtest(
+        read_chunks(files[source_type], source_type, CHUNK_SIZE, PRICES, **kwargs),
+        starting_indexes,
+        direction,
+        [0.3] * len(starting_indexes),
+        [0.2] * len(starting_indexes),
+    )
+
+    # Some trades are opened in a chunk and closed in a following one
+    closed = expected.price_close_index >= 0
+    assert np.any(
+        expected.entry_point_index[closed] // CHUNK_SIZE
+        < expected.price_close_index[closed] // CHUNK_SIZE
+    )
+
+    assert len(result) == len(expected)
+    for field in FIELDS:
+        np.testing.assert_array_equal(
+            getattr(result, field),
+            getattr(expected, field),
+            err_msg=field,
+        )
+
+
+def test_trade_straddling_a_chunk() -> None:
+    bid = np.array([1.0, 1.0, 1.0, 1.0, 1.0, 1.05, 1.2, 1.3])
+    ask = bid + 0.01
+    chunks = [
+        np.column_stack([np.zeros(4), bid[start : start + 4], ask[start : start + 4]])
+        for start in (0, 4)
+    ]
+
+    # The buy enters on the last tick of the first chunk and reaches its take profit
+    # on the second tick of the following one
+    result = streaming_backtest(iter(chunks), [2], [Position.BUY], [0.1], [0.5])
+
+    assert result.entry_point_index.tolist() == [3]
+    assert result.entry_point.tolist() == [1.0]
+    assert result.price_close_index.tolist() == [6]
+    assert result.price_close.tolist() == [1.2]
+    assert result.count_results()[TradeResult.PROFIT] == 1
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inkosi.backtest.operation.timeindex import TimeIndex
+
+ROWS: int = 2000
+
+
+@pytest.fixture(scope="module")
+def times() -> np.ndarray:
+    generator = np.random.default_rng(11)
+    gaps = generator.integers(1, 10**9, size=ROWS)
+
+    return pd.Timestamp("2023-03-01").value + np.cumsum(gaps)
+
+
+@pytest.fixture(scope="module")
+def queries(times: np.ndarray) -> np.ndarray:
+    generator = np.random.default_rng(12)
+    between = generator.integers(times[0] - 10**9, times[-1] + 10**9, size=500)
+
+    return np.concatenate([between, times[[0, -1]] - 1, times[[0, -1]] + 1])
+
+
+def test_exact_timestamps_match_get_indexer(times: np.ndarray) -> None:
+    index = TimeIndex(times)
+    reference = pd.DatetimeIndex(times)
+    exact = times[np.random.default_rng(13).choice(ROWS, size=300)]
+
+    np.testing.assert_array_equal(
+        index.locate(exact.astype("datetime64[ns]")),
+        reference.get_indexer(pd.DatetimeIndex(exact)),
+    )
+
+
+def test_left_matches_the_following_record(
+    times: np.ndarray,
+    queries: np.ndarray,
+) -> None:
+    following = pd.DatetimeIndex(times).get_indexer(
+        pd.DatetimeIndex(queries),
+        method="backfill",
+    )
+
+    np.testing.assert_array_equal(
+        TimeIndex(times).locate(queries),
+        np.where(following < 0, ROWS, following),
+    )
+
+
+def test_right_follows_the_preceding_record(
+    times: np.ndarray,
+    queries: np.ndarray,
+) -> None:
+    preceding = pd.DatetimeIndex(times).get_indexer(
+        pd.DatetimeIndex(queries),
+        method="pad",
+    )
+
+    np.testing.assert_array_equal(
+        TimeIndex(times).locate(queries, side="right"),
+        preceding + 1,
+    )
+
+
+def test_timestamps_of_any_type(times: np.ndarray) -> None:
+    index = TimeIndex(times.astype("datetime64[ns]"))
+    timestamp = pd.Timestamp(times[100])
+    expected = index.locate(times[100])
+
+    assert expected.tolist() == [100]
+    for value in [
+        timestamp.isoformat(),
+        timestamp.to_pydatetime(warn=False),
+        timestamp.tz_localize("UTC").tz_convert("Asia/Tokyo"),
+        [timestamp.isoformat()],
+        np.array([timestamp.to_datetime64()]),
+    ]:
+        np.testing.assert_array_equal(index.locate(value), expected)
+
+    # Aware timestamps are converted to UTC
+    tokyo = datetime(2023, 3, 1, 9, tzinfo=timezone(timedelta(hours=9)))
+    np.testing.assert_array_equal(
+        index.locate(tokyo),
+        index.locate("2023-03-01 00:00:00"),
+    )
+
+
+def test_indexes_map_back_to_timestamps(times: np.ndarray) -> None:
+    index = TimeIndex(times)
+    indexes = np.array([0, 5, ROWS - 1, -1, ROWS, -7])
+
+    timestamps = index.timestamps(indexes)
+
+    assert timestamps.dtype == np.dtype("datetime64[ns]")
+    np.testing.assert_array_equal(
+        timestamps[:3],
+        pd.DatetimeIndex(times)[indexes[:3]].to_numpy(),
+    )
+    assert np.isnat(timestamps[3:]).all()
+    np.testing.assert_array_equal(index.locate(timestamps[:3]), indexes[:3])
+
+
+def test_slice_includes_both_bounds() -> None:
+    times = pd.DatetimeIndex(
+        ["2023-03-01 00:00:00"] * 2
+        + ["2023-03-01 00:00:05"] * 3
+        + ["2023-03-01 00:00:07", "2023-03-01 00:00:09"]
+    )
+    index = TimeIndex(times.to_numpy())
+    records = np.arange(len(times))
+
+    for start, end in [
+        ("2023-03-01 00:00:00", "2023-03-01 00:00:05"),
+        ("2023-03-01 00:00:01", "2023-03-01 00:00:06"),
+        ("2023-03-01 00:00:05", "2023-03-01 00:00:05"),
+        ("2023-03-01 00:00:06", "2023-03-01 00:00:06"),
+        (None, "2023-03-01 00:00:07"),
+        ("2023-03-01 00:00:07", None),
+        (None, None),
+    ]:
+        np.testing.assert_array_equal(
+            records[index.slice(start, end)],
+            records[times.slice_indexer(start, end)],
+        )
+
+
+def test_integer_times_are_not_copied(times: np.ndarray) -> None:
+    index = TimeIndex(times)
+
+    assert len(index) == ROWS and np.shares_memory(index.times, times)
+
+
+def test_unsorted_times_are_rejected(times: np.ndarray) -> None:
+    with pytest.raises(ValueError):
+        TimeIndex(times[::-1])
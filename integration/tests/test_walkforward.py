@@ -0,0 +1,163 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inkosi.backtest.operation.backtest import filter_dataset
+from inkosi.backtest.operation.models import TICKS_BID_INDEX, SourceType
+from inkosi.backtest.operation.schemas import (
+    AvailableRawColumns,
+    AvailableTechincalIndicators,
+    Elements,
+    Filter,
+    Relation,
+)
+from inkosi.backtest.operation.sources import Dataset
+from inkosi.backtest.operation.sweep import sweep
+from inkosi.backtest.operation.walkforward import (
+    WalkForwardResult,
+    walk_forward,
+    walk_forward_windows,
+)
+from inkosi.database.mongodb.schemas import Position
+
+TAKE_PROFITS: list[float] = [0.1, 0.3, 0.5]
+STOP_LOSSES: list[float] = [0.1, 0.2, 0.4]
+IN_SAMPLE: int = 6000
+OUT_OF_SAMPLE: int = 3000
+
+
+def _candidate(length: int) -> list[Filter]:
+    return [
+        Filter(
+            first_element={Elements.ELEMENT: AvailableRawColumns.CLOSE_PRICE},
+            second_element={
+                Elements.ELEMENT: AvailableTechincalIndicators.SMA,
+                Elements.PERIOD: length,
+            },
+            relation=Relation.GREATER,
+        )
+    ]
+
+
+CANDIDATES: list[list[Filter]] = [_candidate(50), _candidate(500)]
+
+
+@pytest.fixture(scope="module")
+def dataset(store: Path) -> Dataset:
+    return Dataset(store, source_type=SourceType.MEMMAP)
+
+
+@pytest.fixture(scope="module")
+def data_frame(dataset: Dataset) -> pd.DataFrame:
+    return pd.DataFrame(
+        {AvailableRawColumns.CLOSE_PRICE: dataset.get_column(TICKS_BID_INDEX)}
+    )
+
+
+@pytest.fixture(scope="module")
+def result(dataset: Dataset, data_frame: pd.DataFrame) -> WalkForwardResult:
+    return walk_forward(
+        data_frame,
+        dataset,
+        CANDIDATES,
+        Position.BUY,
+        TAKE_PROFITS,
+        STOP_LOSSES,
+        in_sample=IN_SAMPLE,
+        out_of_sample=OUT_OF_SAMPLE,
+        workers=1,
+    )
+
+
+@pytest.mark.parametrize("anchored", [False, True])
+def test_windows_do_not_overlap(anchored: bool) -> None:
+    windows = walk_forward_windows(20_000, IN_SAMPLE, OUT_OF_SAMPLE, anchored=anchored)
+
+    assert windows[0] == (0, IN_SAMPLE, IN_SAMPLE + OUT_OF_SAMPLE)
+    assert windows[-1][2] == 20_000
+    for start, stop, out_of_sample_stop in windows:
+        assert start < stop < out_of_sample_stop
+        assert start == 0 if anchored else stop - start == IN_SAMPLE
+    for previous, following in zip(windows, windows[1:]):
+        assert previous[2] == following[1]
+
+
+def test_out_of_sample_trades_stay_in_their_window(result: WalkForwardResult) -> None:
+    assert len(result.windows) == 5
+    for window in result.windows:
+        trades = window.result
+        closed = trades.price_close_index >= 0
+
+        assert window.candidate is not None and len(trades)
+        assert np.all(trades.entry_point_index > window.in_sample_stop)
+        assert np.all(trades.entry_point_index < window.out_of_sample_stop)
+        assert np.all(trades.price_close_index[closed] < window.out_of_sample_stop)
+        assert trades.time_opening is not None
+
+    assert len(result.stitched()) == sum(len(w.result) for w in result.windows)
+
+
+def test_parameters_match_a_sweep_of_each_window(
+    store: Path,
+    dataset: Dataset,
+    data_frame: pd.DataFrame,
+    result: WalkForwardResult,
+) -> None:
+    times = dataset.time_index()
+
+    for window in result.windows:
+        # The in-sample period, as a dataset ending with it
+        in_sample = Dataset(
+            store,
+            source_type=SourceType.MEMMAP,
+            end=times.timestamps([window.in_sample_stop - 1])[0],
+        )
+
+        best = (-np.inf, None, None, None)
+        for candidate, filters in enumerate(CANDIDATES):
+            positions = filter_dataset(data_frame, filters)
+            positions = positions[
+                (positions >= window.in_sample_start)
+                & (positions + 1 < window.in_sample_stop)
+            ]
+            cube = sweep(
+                in_sample,
+                positions,
+                Position.BUY,
+                TAKE_PROFITS,
+                STOP_LOSSES,
+                workers=1,
+            )
+
+            win_rate = cube.win_rate()
+            if np.nanmax(win_rate) > best[0]:
+                best = (np.nanmax(win_rate), candidate, *cube.best())
+
+        assert window.in_sample_win_rate == pytest.approx(best[0])
+        assert (window.candidate, window.take_profit, window.stop_loss) == best[1:]
+
+
+def test_process_pool_matches_a_single_process(
+    dataset: Dataset,
+    data_frame: pd.DataFrame,
+    result: WalkForwardResult,
+) -> None:
+    pooled = walk_forward(
+        data_frame,
+        dataset,
+        CANDIDATES,
+        Position.BUY,
+        TAKE_PROFITS,
+        STOP_LOSSES,
+        in_sample=IN_SAMPLE,
+        out_of_sample=OUT_OF_SAMPLE,
+        workers=2,
+    )
+
+    pd.testing.assert_frame_equal(pooled.to_pandas(), result.to_pandas())
+    np.testing.assert_array_equal(
+        pooled.stitched().price_close_index,
+        result.stitched().price_close_index,
+    )
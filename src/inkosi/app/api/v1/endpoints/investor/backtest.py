@@ -1,8 +1,118 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, status
+from fastapi.responses import JSONResponse
+
+from inkosi.backtest.operation.jobs import (
+    BacktestJob,
+    BacktestSpec,
+    JobStatus,
+    WorkersUnavailable,
+    get_backtest_jobs,
+    resolve_source,
+)
 
 router = APIRouter()
 
 
-@router.post(path="/backtest")
-async def backtest():
-    ...
+def _job_content(job: BacktestJob) -> dict:
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "submitted_at": job.submitted_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "error": job.error,
+        "trades": len(job.result) if job.result is not None else None,
+    }
+
+
+@router.post(
+    path="/backtest",
+    summary="Submit a backtest job",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def backtest(spec: BacktestSpec) -> JSONResponse:
+    if spec.ticker is None:
+        try:
+            resolve_source(spec)
+        except ValueError as error:
+            return JSONResponse(
+                content={"detail": str(error)},
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+    try:
+        job = get_backtest_jobs().submit(spec)
+    except WorkersUnavailable as error:
+        return JSONResponse(
+            content={"detail": f"{error}, retry later"},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    if job is None:
+        return JSONResponse(
+            content={"detail": "Too many backtest jobs queued, retry later"},
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+
+    return JSONResponse(
+        content=_job_content(job),
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+
+
+@router.get(
+    path="/backtest/{job_id}",
+    summary="Get the status of a backtest job",
+)
+async def backtest_status(job_id: str) -> JSONResponse:
+    job = get_backtest_jobs().get(job_id)
+    if job is None:
+        return JSONResponse(
+            content={"detail": "Unable to find the backtest job"},
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+
+    return JSONResponse(
+        content=_job_content(job),
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@router.get(
+    path="/backtest/{job_id}/results",
+    summary="Get a page of the trades of a completed backtest job",
+)
+async def backtest_results(
+    job_id: str,
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=100, ge=1, le=1000),
+) -> JSONResponse:
+    job = get_backtest_jobs().get(job_id)
+    if job is None:
+        return JSONResponse(
+            content={"detail": "Unable to find the backtest job"},
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+
+    if job.status != JobStatus.COMPLETED:
+        return JSONResponse(
+            content={"detail": f"The backtest job is {job.status}"},
+            status_code=status.HTTP_409_CONFLICT,
+        )
+
+    first = (page - 1) * page_size
+    trades = job.result.select(slice(first, first + page_size)).to_pandas()
+    for column in trades.select_dtypes(include="datetime").columns:
+        trades[column] = trades[column].dt.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+    return JSONResponse(
+        content={
+            "job_id": job.job_id,
+            "page": page,
+            "page_size": page_size,
+            "total": len(job.result),
+            "trades": trades.astype(object)
+            .where(trades.notna(), None)
+            .to_dict(orient="records"),
+        },
+        status_code=status.HTTP_200_OK,
+    )
@@ -7,6 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from inkosi import __project_name__, __version__
 from inkosi.app import _constants
 from inkosi.app.api.v1._routes import v1_router
+from inkosi.backtest.operation.jobs import get_backtest_jobs
 from inkosi.database.mongodb.database import MongoDBInstance
 from inkosi.database.postgresql.database import PostgreSQLInstance
 from inkosi.database.postgresql.models import (
@@ -162,6 +163,7 @@ async def startup_event() -> None:
 )
 async def shutdown() -> None:
     RiskManagement().unload_models()
+    get_backtest_jobs().shutdown()
 
 
 @app.get(
@@ -0,0 +1,233 @@
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import lru_cache
+from threading import Lock
+from typing import Hashable
+
+import numpy as np
+import streamlit as st
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.asset import Asset
+from inkosi.backtest.operation.quote import Quote
+from inkosi.utils.settings import get_backtesting_settings
+
+
+class QuotesUnavailable(Exception):
+    """
+    Raised when the quotes of a financial instrument cannot be loaded, so that the
+    failure is not cached.
+    """
+
+
+class QuotesCache:
+    """
+    In-memory LRU cache of quotes shared by the reruns and the sessions of the app,
+    bounded by the bytes of the quotes it holds as well as by their number. The
+    entries expire after a time-to-live.
+
+    The columns of the quotes are stored as read-only views, so that the sessions
+    share them without copying.
+
+    Attributes:
+        max_bytes (int): The maximum number of bytes held by the cache.
+        max_entries (int): The maximum number of quotes held by the cache.
+        ttl (float): The number of seconds the quotes are kept.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int, ttl: float) -> None:
+        """
+        Initializes a QuotesCache instance.
+
+        Parameters:
+            max_bytes (int): The maximum number of bytes held by the cache.
+            max_entries (int): The maximum number of quotes held by the cache.
+            ttl (float): The number of seconds the quotes are kept.
+        """
+
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries: OrderedDict[Hashable, tuple[float, int, dict]] = OrderedDict()
+        self._nbytes: int = 0
+        self._lock = Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Get the number of bytes held by the cache.
+
+        Returns:
+            (int): The number of bytes of the cached quotes.
+        """
+
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> dict[str, NDArray] | None:
+        """
+        Look up the quotes of a key.
+
+        Parameters:
+            key (Hashable): The key of the quotes.
+
+        Returns:
+            (dict[str, NDArray] | None): The quotes or None if they are not cached or
+                have expired.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expiry, nbytes, result = entry
+            if expiry < time.monotonic():
+                del self._entries[key]
+                self._nbytes -= nbytes
+                return None
+
+            self._entries.move_to_end(key)
+
+            return dict(result)
+
+    def put(self, key: Hashable, result: dict[str, NDArray]) -> dict[str, NDArray]:
+        """
+        Store the quotes of a key, evicting the least recently used ones if needed.
+        Quotes larger than the whole cache are returned without being stored.
+
+        Parameters:
+            key (Hashable): The key of the quotes.
+            result (dict[str, NDArray]): The quotes.
+
+        Returns:
+            (dict[str, NDArray]): The quotes, with read-only columns.
+        """
+
+        stored = {}
+        for column, values in result.items():
+            view = np.asarray(values).view()
+            view.flags.writeable = False
+            stored[column] = view
+        nbytes = sum(values.nbytes for values in stored.values())
+
+        if nbytes > self.max_bytes:
+            return dict(stored)
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous[1]
+
+            while self._entries and (
+                self._nbytes + nbytes > self.max_bytes
+                or len(self._entries) >= self.max_entries
+            ):
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._nbytes -= evicted
+
+            self._entries[key] = (time.monotonic() + self.ttl, nbytes, stored)
+            self._nbytes += nbytes
+
+        return dict(stored)
+
+
+@lru_cache
+def get_quotes_cache() -> QuotesCache:
+    """
+    Get the process-wide quotes cache of the app, sized through the
+    `Backtesting.AppCacheMaxBytes`, `Backtesting.AppCacheMaxEntries` and
+    `Backtesting.AppCacheTTL` settings.
+
+    Returns:
+        (QuotesCache): The quotes cache of the app.
+    """
+
+    settings = get_backtesting_settings()
+
+    return QuotesCache(
+        max_bytes=settings.AppCacheMaxBytes,
+        max_entries=settings.AppCacheMaxEntries,
+        ttl=settings.AppCacheTTL,
+    )
+
+
+def load_quotes(
+    ticker: str,
+    time_frame: str,
+    start: date,
+    end: date,
+) -> dict[str, NDArray]:
+    """
+    Load the quotes of a financial instrument, cached across the reruns and the
+    sessions of the app per (ticker, time frame, date range).
+
+    Parameters:
+        ticker (str): The symbol of the financial instrument.
+        time_frame (str): The time frame of the quotes.
+        start (date): The start date of the quotes.
+        end (date): The end date of the quotes.
+
+    Returns:
+        (dict[str, NDArray]): The quotes, as returned by `Quote.download_quote`, with
+            read-only columns.
+
+    Raises:
+        QuotesUnavailable: If the quotes cannot be loaded.
+    """
+
+    quotes_cache = get_quotes_cache()
+    key = (ticker, time_frame, start, end)
+
+    result = quotes_cache.get(key)
+    if result is not None:
+        return result
+
+    with st.spinner("Loading the quotes..."):
+        result = Quote(time_frame=time_frame).download_quote(
+            ticker,
+            start=start,
+            end=end,
+        )
+    if result is None:
+        raise QuotesUnavailable(f"Unable to load the quotes of {ticker}")
+
+    return quotes_cache.put(key, result)
+
+
+def get_asset(
+    ticker: str,
+    time_frame: str,
+    start: date,
+    end: date,
+) -> Asset | None:
+    """
+    Get an asset from the cached quotes, which are downloaded only if the parameters
+    have not been requested within the TTL of the cache.
+
+    Parameters:
+        ticker (str): The symbol of the financial instrument.
+        time_frame (str): The time frame of the quotes.
+        start (date): The start date of the quotes.
+        end (date): The end date of the quotes.
+
+    Returns:
+        (Asset | None): The asset or None if its quotes cannot be loaded.
+    """
+
+    try:
+        result = load_quotes(ticker, time_frame, start, end)
+    except QuotesUnavailable:
+        return None
+
+    return Asset(
+        ticker,
+        time_frame=time_frame,
+        start=start,
+        end=end,
+        result=result,
+    )
@@ -7,11 +7,11 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 
-from inkosi.backtest.operation.asset import Asset
+from inkosi.backtest.app.data import get_asset
 from inkosi.backtest.operation.backtest import backtest, filter_dataset
 from inkosi.backtest.operation.models import (
-    BacktestRecord,
     BacktestRequest,
+    BacktestResult,
     SourceType,
     TradeResult,
     TradeStatus,
@@ -156,36 +156,36 @@ else:
         source_type = st.sidebar.selectbox(
             "Select the Data Source Type",
             options=DataSourceType.list(),
-            on_change=reset_asset(),
+            on_change=reset_asset,
         )
 
         ticker_selection = st.sidebar.selectbox(
             label="Ticker",
             options=get_default_tickers(),
             placeholder="Select Ticker",
-            on_change=reset_asset(),
+            on_change=reset_asset,
         )
         time_frame = st.sidebar.selectbox(
             label="Time Frame",
             options=TimeFrames.list(),
             placeholder="Select Time Frames",
-            on_change=reset_asset(),
+            on_change=reset_asset,
         )
         column = st.sidebar.selectbox(
             label="Column",
             options=VisualisationOptions.list(),
             placeholder="Select Column",
-            on_change=reset_asset(),
+            on_change=reset_asset,
         )
         start_date = st.sidebar.date_input(
             "Start Date",
             value=datetime.today() - timedelta(days=4),
-            on_change=reset_asset(),
+            on_change=reset_asset,
         )
         end_date = st.sidebar.date_input(
             "End Date",
             max_value=datetime.today(),
-            on_change=reset_asset(),
+            on_change=reset_asset,
         )
 
         backtesting_tab, sampling_tab = st.tabs(["Backtesting", "Sampling"])
@@ -312,8 +312,8 @@ else:
             "Backtest",
             use_container_width=True,
         ):
-            asset = Asset(
-                asset_name=ticker_selection,
+            asset = get_asset(
+                ticker_selection,
                 time_frame=time_frame,
                 start=start_date,
                 end=end_date,
@@ -375,37 +375,26 @@ else:
                     dataset=Dataset(asset, source_type=SourceType.ASSET),
                 )
 
-                backtest_result: list[BacktestRecord] = backtest(backtest_request)
-
-                profit_trades, losses_trades, na_trades = 0, 0, 0
-                closed_trades, pending_trades = 0, 0
+                backtest_result: BacktestResult = backtest(backtest_request)
 
-                for result in backtest_result:
-                    match result.result:
-                        case TradeResult.PROFIT:
-                            profit_trades += 1
-                        case TradeResult.LOSS:
-                            losses_trades += 1
-                        case TradeResult.PENDING:
-                            na_trades += 1
+                results = backtest_result.count_results()
+                statuses = backtest_result.count_statuses()
 
-                    match result.status:
-                        case TradeStatus.CLOSED:
-                            closed_trades += 1
-                        case TradeStatus.PENDING:
-                            pending_trades += 1
+                profit_trades = results[TradeResult.PROFIT]
+                losses_trades = results[TradeResult.LOSS]
+                closed_trades = statuses[TradeStatus.CLOSED]
+                pending_trades = statuses[TradeStatus.PENDING]
 
-                trades = profit_trades + losses_trades + pending_trades
+                win_rate = backtest_result.win_rate()
+                win_rate_no_pending = backtest_result.win_rate(include_pending=False)
 
                 profitable_ratio_trades: str = (
-                    format(profit_trades / trades, ".2f")
-                    if trades > 0
-                    else "Not Available"
+                    format(win_rate, ".2f") if win_rate is not None else "Not Available"
                 )
 
                 profitable_ratio_trades_no_pending_trades: str = (
-                    format(profit_trades / (profit_trades + losses_trades), ".2f")
-                    if (profit_trades + losses_trades) > 0
+                    format(win_rate_no_pending, ".2f")
+                    if win_rate_no_pending is not None
                     else "Not Available"
                 )
 
@@ -483,32 +472,40 @@ else:
             use_container_width=True,
         ):
             st.session_state["sampled"] = True
-            asset = Asset(
+            asset = get_asset(
                 ticker_selection,
                 time_frame=time_frame,
                 start=start_date,
                 end=end_date,
             )
-            set_asset(
-                data=asset.sampling(
+            scenarios = (
+                asset.sampling(
                     sampling_method=sampling_method,
                     steps_forward=steps_forward,
                     column=column,
                     samples=samples,
                 )
+                if asset is not None
+                else None
             )
+            if scenarios is not None:
+                set_asset(data=scenarios.plotting())
 
         if not st.session_state.get("sampled", False):
-            asset = Asset(
+            asset = get_asset(
                 ticker_selection,
                 time_frame=time_frame,
                 start=start_date,
                 end=end_date,
             )
-            set_asset(asset.plotting())
+            if asset is not None:
+                set_asset(asset.plotting())
+            else:
+                st.session_state.pop("asset", None)
+                st.error(f"Unable to load the quotes of {ticker_selection}", icon="🚨")
 
         charts = []
-        for data in st.session_state.get("asset")[1]:
+        for data in st.session_state.get("asset", ((), ()))[1]:
             line_chart = (
                 alt.Chart(
                     pd.DataFrame(
@@ -527,4 +524,5 @@ else:
             )
             charts.append(line_chart)
 
-        st.altair_chart(alt.layer(*charts), use_container_width=True)
+        if charts:
+            st.altair_chart(alt.layer(*charts), use_container_width=True)
@@ -0,0 +1,172 @@
+import numpy as np
+from numpy.typing import NDArray
+
+EMA_BLOCK_EXPONENT: float = 30.0
+EMA_CARRY_TOLERANCE: float = 1e-20
+
+
+def sma(close: NDArray, length: int) -> NDArray:
+    """
+    Simple Moving Average computed through cumulative sums.
+
+    The series is centred on its first valid value before being summed, which keeps
+    the cumulative sums small and the result accurate on long series. The missing
+    values are counted apart, so that a NaN only affects the windows containing it,
+    as done by pandas_ta.
+
+    Parameters:
+        close (NDArray): The series.
+        length (int): The period of the moving average.
+
+    Returns:
+        (NDArray): The moving average, NaN over the first `length - 1` records and
+            over the windows containing a NaN.
+    """
+
+    close = np.asarray(close, dtype=np.float64)
+    length = int(length)
+    result = np.full(close.shape[0], np.nan)
+
+    if length < 1 or close.shape[0] < length:
+        return result
+
+    valid = ~np.isnan(close)
+    if not valid.any():
+        return result
+
+    offset = close[np.argmax(valid)]
+    cumulative = np.cumsum(np.where(valid, close - offset, 0.0))
+    windows = cumulative[length - 1 :].copy()
+    windows[1:] -= cumulative[:-length]
+
+    counts = np.cumsum(valid)
+    window_counts = counts[length - 1 :].copy()
+    window_counts[1:] -= counts[:-length]
+
+    result[length - 1 :] = np.where(
+        window_counts == length,
+        windows / length + offset,
+        np.nan,
+    )
+
+    return result
+
+
+def wma(close: NDArray, length: int) -> NDArray:
+    """
+    Weighted Moving Average, with linearly increasing weights, computed through a
+    convolution.
+
+    Parameters:
+        close (NDArray): The series.
+        length (int): The period of the moving average.
+
+    Returns:
+        (NDArray): The moving average, NaN over the first `length - 1` records.
+    """
+
+    close = np.asarray(close, dtype=np.float64)
+    length = int(length)
+    result = np.full(close.shape[0], np.nan)
+
+    if length < 1 or close.shape[0] < length:
+        return result
+
+    weights = np.arange(1, length + 1, dtype=np.float64)
+    result[length - 1 :] = np.convolve(close, weights[::-1], mode="valid") / (
+        weights.sum()
+    )
+
+    return result
+
+
+def ema(close: NDArray, length: int) -> NDArray:
+    """
+    Exponential Moving Average seeded with the Simple Moving Average of the first
+    `length` records, as done by pandas_ta.
+
+    The recursion `ema[i] = a * close[i] + (1 - a) * ema[i - 1]` is solved in blocks:
+    inside each block it is expressed in closed form through a cumulative sum, while
+    the last value of each block seeds the next one. The blocks are long enough for
+    the influence of a block on the following ones to vanish after a couple of
+    blocks, and short enough for the rescaling factors `(1 - a) ** -t` to stay within
+    `exp(30)`.
+
+    The recursion restarts after each gap of missing values: every run of valid
+    values is averaged as a series of its own, so that a NaN never spreads past the
+    following `length - 1` records.
+
+    Parameters:
+        close (NDArray): The series.
+        length (int): The period of the moving average.
+
+    Returns:
+        (NDArray): The moving average, NaN over the missing values and over the first
+            `length - 1` records following them and the start of the series.
+    """
+
+    close = np.asarray(close, dtype=np.float64)
+    length = int(length)
+
+    valid = ~np.isnan(close)
+    if valid.all():
+        return _ema(close, length)
+
+    result = np.full(close.shape[0], np.nan)
+
+    # Runs of valid values long enough to be averaged
+    edges = np.diff(np.concatenate([[False], valid, [False]]).astype(np.int8))
+    starts, stops = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    long_enough = stops - starts >= max(length, 1)
+
+    for start, stop in zip(starts[long_enough], stops[long_enough]):
+        result[start:stop] = _ema(close[start:stop], length)
+
+    return result
+
+
+def _ema(close: NDArray, length: int) -> NDArray:
+    result = np.full(close.shape[0], np.nan)
+
+    if length < 1 or close.shape[0] < length:
+        return result
+
+    alpha = 2.0 / (length + 1)
+    decay = 1.0 - alpha
+    result[length - 1] = close[:length].mean()
+
+    values = close[length:]
+    if not values.shape[0] or decay == 0.0:
+        result[length:] = values
+        return result
+
+    block = max(int(EMA_BLOCK_EXPONENT / -np.log(decay)), 1)
+    n_blocks = -(-values.shape[0] // block)
+
+    padded = np.zeros(n_blocks * block)
+    padded[: values.shape[0]] = values
+    padded = padded.reshape(n_blocks, block)
+
+    steps = np.arange(block)
+    powers = decay**steps
+
+    # EMA of each block as if the value preceding it were zero
+    local = alpha * powers * np.cumsum(padded / powers, axis=1)
+    carry_weights = decay * powers
+
+    # Value preceding each block: the recursion across blocks decays by
+    # `decay ** block`, about exp(-30), so only the few terms above
+    # EMA_CARRY_TOLERANCE are accumulated
+    block_decay = decay**block
+    ends = local[:, -1].copy()
+    previous = result[length - 1] * block_decay ** np.arange(n_blocks)
+    term, k = 1.0, 0
+    while term > EMA_CARRY_TOLERANCE and k < n_blocks - 1:
+        previous[1 + k :] += term * ends[: n_blocks - 1 - k]
+        term, k = term * block_decay, k + 1
+
+    local += carry_weights * previous[:, None]
+
+    result[length:] = local.ravel()[: values.shape[0]]
+
+    return result
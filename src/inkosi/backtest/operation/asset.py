@@ -5,6 +5,12 @@ import pandas as pd
 from numpy.typing import NDArray
 
 from inkosi.backtest.operation.quote import Quote
+from inkosi.backtest.operation.scenarios import (
+    DEFAULT_CHUNK_SIZE,
+    MAX_PATHS,
+    ScenarioResult,
+    simulate,
+)
 from inkosi.backtest.operation.schemas import AvailableRawColumns, SamplingMethods
 
 
@@ -17,9 +23,10 @@ class Asset:
         asset_name (str): The name of the financial asset.
         period (str): The time period for historical data. Default is "1y" (1 year).
         time_frame (str): The time frame for data intervals. Default is "1d" (1 day).
-        quote (Quote): An instance of the Quote class for downloading financial
-            instrument quotes.
-        result (dict): The result of downloading financial instrument quotes.
+        quote (Quote | None): An instance of the Quote class for downloading financial
+            instrument quotes, None if the quotes have been provided.
+        result (dict): The result of downloading financial instrument quotes, typed
+            columns of datetime64 dates and float64 prices and returns.
     """
 
     def __init__(
@@ -29,6 +36,7 @@ class Asset:
         time_frame: str = "1d",
         start: date | None = None,
         end: date | None = None,
+        result: dict[str, NDArray] | None = None,
     ):
         """
         Initializes an Asset instance.
@@ -43,18 +51,24 @@ class Asset:
                 Default is None.
             end (date, optional, default None): The end date for historical data.
                 Default is None.
+            result (dict[str, NDArray], optional, default None): The quotes already
+                downloaded, e.g. from a cache, in which case nothing is downloaded.
         """
 
         self.asset_name = asset_name
         self.period = period
         self.time_frame = time_frame
 
-        self.quote = Quote(time_frame=time_frame)
-        self.result = self.quote.download_quote(
-            self.asset_name,
-            start=start,
-            end=end,
-        )
+        self.quote: Quote | None = None
+        self.result = result
+
+        if self.result is None:
+            self.quote = Quote(time_frame=time_frame)
+            self.result = self.quote.download_quote(
+                self.asset_name,
+                start=start,
+                end=end,
+            )
 
     def sampling(
         self,
@@ -62,112 +76,88 @@ class Asset:
         steps_forward: int,
         column: str = AvailableRawColumns.CLOSE_PRICE,
         samples: int = 1,
-    ) -> NDArray | None:
+        seed: int | None = None,
+        quantiles: list[float] | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int | None = 1,
+    ) -> ScenarioResult | None:
         """
         Generate samples based on historical data.
 
+        The paths are generated in chunks and, if quantiles are requested, reduced on
+        the fly to quantile bands, so that the number of samples is not bounded by
+        the memory. Without quantiles, the paths are returned as they are and their
+        number is bounded by `MAX_PATHS`.
+
         Parameters:
             sampling_method (SamplingMethods): The method used for generating samples.
             steps_forward (int): The number of steps forward in time for each sample.
             column (str, default "Close Price"): The column of historical data to use
                 for sampling. Default is "Close Price".
-            samples (int, default 1): The number of samples to generate. Default is 1.
+            samples (int, default 1): The number of samples to generate, at most
+                `MAX_PATHS` without quantiles. Default is 1.
+            seed (int, optional, default None): The seed of the samples, random if
+                None.
+            quantiles (list[float], optional, default None): The probabilities of the
+                quantile bands to reduce the samples to, None to keep the samples.
+            chunk_size (int, default 10_000): The number of samples generated at once.
+            workers (int, optional, default 1): The number of worker processes, the
+                number of CPUs if None.
+
+        Returns:
+            (ScenarioResult | None): The samples, which start from the last value of
+                the history stored once, or None if the parameters are not valid.
         """
 
         if not 1 < steps_forward < 255 or not isinstance(steps_forward, int):
             return None
 
-        if not 1 <= samples < 10000 or not isinstance(samples, int):
+        if not 1 <= samples or not isinstance(samples, int):
             return None
 
-        prices = self.result.get(column, np.array([0]))
-        last_prices = np.ones(shape=(samples, 1)) * prices[-1]
+        if quantiles is None and samples > MAX_PATHS:
+            return None
+
+        prices = np.asarray(self.result.get(column, np.array([0])), dtype=np.float64)
 
         match sampling_method:
-            case SamplingMethods.NORMAL_DISTRIBUTION:
-                sampling = np.random.normal(
-                    loc=0,
-                    scale=np.std(
-                        self.close_prices(),
-                    ),
-                    size=(samples, steps_forward - 1),
-                )
-
-                cum_raw_last_prices = np.hstack((last_prices, sampling))
-                cum_prices = np.cumsum(cum_raw_last_prices, axis=1)
-
-                return self.plotting(
-                    column,
-                    np.hstack(
-                        (
-                            np.repeat(
-                                np.reshape(prices, (prices.shape[0], 1)),
-                                repeats=samples,
-                                axis=1,
-                            ).T,
-                            cum_prices,
-                        )
-                    ),
-                )
-            case SamplingMethods.LAPLACE_DISTRIBUTION:
-                sampling = np.random.laplace(
-                    loc=0,
-                    scale=np.std(
-                        self.close_prices(),
-                    ),
-                    size=(samples, steps_forward - 1),
-                )
-
-                cum_raw_last_prices = np.hstack((last_prices, sampling))
-                cum_prices = np.cumsum(cum_raw_last_prices, axis=1)
-
-                return self.plotting(
-                    column,
-                    np.hstack(
-                        (
-                            np.repeat(
-                                np.reshape(prices, (prices.shape[0], 1)),
-                                repeats=samples,
-                                axis=1,
-                            ).T,
-                            cum_prices,
-                        )
-                    ),
-                )
+            case (
+                SamplingMethods.NORMAL_DISTRIBUTION
+                | SamplingMethods.LAPLACE_DISTRIBUTION
+            ):
+                scale = np.std(self.close_prices())
             case SamplingMethods.UNIFORM_DISTRIBUTION:
-                sampling = np.random.uniform(
-                    low=0,
-                    high=np.max(prices) - np.min(prices),
-                    size=(samples, steps_forward - 1),
-                )
-                cum_raw_last_prices = np.hstack((last_prices, sampling))
-                cum_prices = np.cumsum(cum_raw_last_prices, axis=1)
-
-                return self.plotting(
-                    column,
-                    np.hstack(
-                        (
-                            np.repeat(
-                                np.reshape(prices, (prices.shape[0], 1)),
-                                repeats=samples,
-                                axis=1,
-                            ).T,
-                            cum_prices,
-                        )
-                    ),
-                )
+                scale = np.max(prices) - np.min(prices)
             case _:
                 return None
 
+        return simulate(
+            history=prices,
+            sampling_method=sampling_method,
+            steps_forward=steps_forward,
+            samples=samples,
+            scale=scale,
+            seed=seed,
+            chunk_size=chunk_size,
+            quantiles=quantiles,
+            workers=workers,
+        )
+
+    def _column(self, column: AvailableRawColumns, dtype: np.dtype) -> NDArray:
+        if self.result is None or column not in self.result:
+            return np.empty(0, dtype=dtype)
+
+        return np.asarray(self.result[column], dtype=dtype)
+
     def dates(self) -> NDArray:
         """
         Get the dates associated with the historical data.
 
         Returns:
-            NDArray: An array of dates.
+            NDArray: An array of datetime64 dates.
         """
 
-        return self.result.get(AvailableRawColumns.DATES, [])
+        return self._column(AvailableRawColumns.DATES, "datetime64[ns]")
 
     def open_prices(self) -> NDArray:
         """
@@ -176,7 +166,7 @@ class Asset:
         Returns:
             NDArray: An array of open prices.
         """
-        return self.result.get(AvailableRawColumns.OPEN_PRICE, [])
+        return self._column(AvailableRawColumns.OPEN_PRICE, np.float64)
 
     def high_prices(self) -> NDArray:
         """
@@ -185,7 +175,7 @@ class Asset:
         Returns:
             NDArray: An array of high prices.
         """
-        return self.result.get(AvailableRawColumns.HIGH_PRICE, [])
+        return self._column(AvailableRawColumns.HIGH_PRICE, np.float64)
 
     def low_prices(self) -> NDArray:
         """
@@ -194,7 +184,7 @@ class Asset:
         Returns:
             NDArray: An array of low prices.
         """
-        return self.result.get(AvailableRawColumns.LOW_PRICE, [])
+        return self._column(AvailableRawColumns.LOW_PRICE, np.float64)
 
     def close_prices(self) -> NDArray:
         """
@@ -203,7 +193,7 @@ class Asset:
         Returns:
             NDArray: An array of close prices.
         """
-        return self.result.get(AvailableRawColumns.CLOSE_PRICE, [])
+        return self._column(AvailableRawColumns.CLOSE_PRICE, np.float64)
 
     def returns(self) -> NDArray:
         """
@@ -212,7 +202,7 @@ class Asset:
         Returns:
             NDArray: An array of returns.
         """
-        return self.result.get(AvailableRawColumns.RETURNS, [])
+        return self._column(AvailableRawColumns.RETURNS, np.float64)
 
     def return_distribution(self) -> NDArray:
         """
@@ -221,7 +211,7 @@ class Asset:
         Returns:
             NDArray: An array of sorted returns.
         """
-        return np.sort(self.result.get(AvailableRawColumns.RETURNS, []))
+        return np.sort(self._column(AvailableRawColumns.RETURNS, np.float64))
 
     def data_frame(self) -> pd.DataFrame:
         """
@@ -1,23 +1,40 @@
+from typing import Any
+
 import numpy as np
 import pandas as pd
-import pandas_ta as ta
 from numpy.typing import NDArray
 
+from inkosi.backtest import indicators
+from inkosi.backtest.operation.barriers import (
+    barrier_outcomes,
+    closing_prices,
+    entry_points,
+    resolve_barriers,
+)
+from inkosi.backtest.operation.cache import (
+    ResultCache,
+    fingerprint,
+    get_indicator_cache,
+    get_result_cache,
+)
+from inkosi.backtest.operation.expressions import compile_filters
 from inkosi.backtest.operation.models import (
     TICKS_ASK_INDEX,
     TICKS_BID_INDEX,
+    BacktestEngine,
     BacktestRecord,
     BacktestRequest,
+    BacktestResult,
     TradeResult,
     TradeStatus,
 )
 from inkosi.backtest.operation.schemas import (
     AvailableRawColumns,
     AvailableTechincalIndicators,
-    ComparisonElement,
     Elements,
     Filter,
-    Relation,
+    FilterGroup,
+    IndicatorBackend,
 )
 from inkosi.database.mongodb.schemas import Position
 from inkosi.log.log import Logger
@@ -30,83 +47,130 @@ logger = Logger(
 )
 
 
+def _indicator(
+    data_frame: pd.DataFrame,
+    column_type: AvailableTechincalIndicators,
+    length: int | float,
+    backend: IndicatorBackend,
+) -> NDArray:
+    if backend == IndicatorBackend.PANDAS_TA:
+        import pandas_ta  # noqa: F401
+
+        match column_type:
+            case AvailableTechincalIndicators.SMA:
+                return data_frame.ta.sma(
+                    close=data_frame[Elements.CLOSE_PRICE],
+                    length=length,
+                ).to_numpy()
+            case AvailableTechincalIndicators.WMA:
+                return data_frame.ta.wma(
+                    close=data_frame[Elements.CLOSE_PRICE],
+                    length=length,
+                ).to_numpy()
+            case AvailableTechincalIndicators.EMA:
+                return data_frame.ta.ema(
+                    close=data_frame[Elements.CLOSE_PRICE],
+                    length=length,
+                ).to_numpy()
+
+    close = data_frame[Elements.CLOSE_PRICE].to_numpy(dtype=np.float64)
+
+    match column_type:
+        case AvailableTechincalIndicators.SMA:
+            return indicators.sma(close, length)
+        case AvailableTechincalIndicators.WMA:
+            return indicators.wma(close, length)
+        case AvailableTechincalIndicators.EMA:
+            return indicators.ema(close, length)
+
+
 def technical_column(
     data_frame: pd.DataFrame,
     column_type: AvailableRawColumns | AvailableTechincalIndicators | None,
     additional_information: dict = {},
+    data_fingerprint: str | None = None,
+    backend: IndicatorBackend = IndicatorBackend.NUMPY,
 ) -> NDArray | None:
-    if AvailableRawColumns.has(column_type):
+    """
+    Get a raw column of the data frame or compute a technical indicator over it.
+
+    The technical indicators are computed by the native NumPy kernels unless
+    requested otherwise, and memoized in the indicator cache, keyed on the
+    fingerprint of the source column, the indicator, its period, the source column and
+    the backend, so that the same indicator is computed only once per dataset.
+
+    Parameters:
+        data_frame (pd.DataFrame): The data frame of the asset.
+        column_type (AvailableRawColumns | AvailableTechincalIndicators | None): The
+            raw column or the technical indicator.
+        additional_information (dict, default {}): The parameters of the technical
+            indicator, such as its period.
+        data_fingerprint (str, optional, default None): The fingerprint of the source
+            column, computed if not provided.
+        backend (IndicatorBackend, default "numpy"): The backend computing the
+            technical indicators.
+
+    Returns:
+        (NDArray | None): The requested column.
+    """
+
+    if not AvailableTechincalIndicators.has(column_type):
         return data_frame[column_type]
 
-    match column_type:
-        case AvailableTechincalIndicators.SMA:
-            return data_frame.ta.sma(
-                close=data_frame[Elements.CLOSE_PRICE],
-                length=additional_information.get(
-                    Elements.PERIOD,
-                    get_technical_indicators_values().MovingAveragePeriod,
-                ),
-            ).to_numpy()
-        case AvailableTechincalIndicators.WMA:
-            return data_frame.ta.wma(
-                close=data_frame[Elements.CLOSE_PRICE],
-                length=additional_information.get(
-                    Elements.PERIOD,
-                    get_technical_indicators_values().MovingAveragePeriod,
-                ),
-            ).to_numpy()
-        case AvailableTechincalIndicators.EMA:
-            return data_frame.ta.ema(
-                close=data_frame[Elements.CLOSE_PRICE],
-                length=additional_information.get(
-                    Elements.PERIOD,
-                    get_technical_indicators_values().MovingAveragePeriod,
-                ),
-            ).to_numpy()
-        case _:
-            return data_frame[column_type]
+    length = additional_information.get(
+        Elements.PERIOD,
+        get_technical_indicators_values().MovingAveragePeriod,
+    )
+
+    if data_fingerprint is None:
+        data_fingerprint = fingerprint(data_frame[Elements.CLOSE_PRICE].to_numpy())
+
+    return get_indicator_cache().get_or_compute(
+        (
+            data_fingerprint,
+            str(column_type),
+            length,
+            str(Elements.CLOSE_PRICE),
+            str(backend),
+        ),
+        lambda: _indicator(data_frame, column_type, length, backend),
+    )
 
 
 def filter_dataset(
     data_frame: pd.DataFrame,
-    filters: list[Filter],
+    filters: list[Filter] | FilterGroup,
 ) -> NDArray:
-    indexes_list = set(data_frame.index)
+    """
+    Select the records of the data frame satisfying the filters.
 
-    for _filter in filters:
-        first_element: ComparisonElement = _filter.first_element
-        second_element: ComparisonElement = _filter.second_element
-        relation: Relation = _filter.relation
+    The filters are compiled into a single plan, so that every distinct column is
+    computed once, and their boolean masks are combined with AND (for a list of
+    filters) or with the operators of the groups.
 
-        first_column: NDArray = technical_column(
-            data_frame=data_frame,
-            column_type=first_element.get(Elements.ELEMENT),
-            additional_information=first_element,
-        )
+    Parameters:
+        data_frame (pd.DataFrame): The data frame of the asset.
+        filters (list[Filter] | FilterGroup): The filters to apply.
 
-        second_column: NDArray = technical_column(
-            data_frame,
-            column_type=second_element.get(Elements.ELEMENT),
-            additional_information=second_element,
-        )
+    Returns:
+        (NDArray): The sorted positions of the selected records, empty if a filter has
+            an unknown relation.
+    """
 
-        match relation:
-            case Relation.GREATER:
-                _indexes = np.nonzero(first_column > second_column)
-            case Relation.GREATER_THAN:
-                _indexes = np.nonzero(first_column >= second_column)
-            case Relation.LESS:
-                _indexes = np.nonzero(first_column < second_column)
-            case Relation.LESS_THAN:
-                _indexes = np.nonzero(first_column <= second_column)
-            case Relation.EQUAL:
-                _indexes = np.nonzero(first_column == second_column)
-            case _:
-                return np.array([])
+    plan = compile_filters(filters)
+    data_fingerprint = fingerprint(data_frame[Elements.CLOSE_PRICE].to_numpy())
 
-        indexes_list.intersection_update(_indexes[0])
+    columns: list[NDArray] = [
+        technical_column(
+            data_frame=data_frame,
+            column_type=element.get(Elements.ELEMENT),
+            additional_information=element,
+            data_fingerprint=data_fingerprint,
+        )
+        for element in plan.columns
+    ]
 
-    return np.array(list(indexes_list))
+    return plan.evaluate(columns, length=data_frame.shape[0])
 
 
 def checker(
@@ -144,21 +208,13 @@ def checker(
             return current_index + result
 
 
-def backtest(request: BacktestRequest) -> list[BacktestRecord] | None:
+def _backtest_iterative(
+    request: BacktestRequest,
+    dataset: NDArray,
+) -> list[BacktestRecord]:
     result: list[BacktestRecord] = []
-    dataset: NDArray | None = request.dataset.get_dataset()
-    if dataset is None:
-        return None
-
     n_dataset: int = dataset.shape[0]
 
-    if len(request.direction) != len(request.starting_indexes):
-        logger.error(
-            "The length of the 'Direction' vector is not equal to the 'Starting"
-            " Indexes' vector"
-        )
-        return
-
     for occurence, direction, take_profit, stop_loss in zip(
         request.starting_indexes,
         request.direction,
@@ -237,6 +293,13 @@ def backtest(request: BacktestRequest) -> list[BacktestRecord] | None:
                 f"Unable to identify the specified 'Direction' parameter: {direction}"
             )
 
+        if result_up < result_down:
+            price_close_index: int = result_up
+            price_close: float = dataset[result_up, TICKS_BID_INDEX]
+        else:
+            price_close_index: int = result_down
+            price_close: float = dataset[result_down, TICKS_ASK_INDEX]
+
         result.append(
             BacktestRecord(
                 direction=direction,
@@ -244,13 +307,158 @@ def backtest(request: BacktestRequest) -> list[BacktestRecord] | None:
                 entry_point_index=entry_point_index,
                 take_profit=take_profit,
                 stop_loss=stop_loss,
-                price_close=...,
-                price_close_index=...,
-                time_opening=...,
-                time_closing=...,
+                price_close=price_close,
+                price_close_index=price_close_index,
+                time_opening=None,
+                time_closing=None,
                 status=trade_status,
                 result=trade_result,
             )
         )
 
     return result
+
+
+def _backtest_vectorized(
+    request: BacktestRequest,
+    bid: NDArray,
+    ask: NDArray,
+) -> BacktestResult:
+    bid = np.asarray(bid, dtype=np.float64)
+    ask = np.asarray(ask, dtype=np.float64)
+
+    kept, entry_indexes, directions, entry_prices = entry_points(
+        bid,
+        ask,
+        request.starting_indexes,
+        request.direction,
+    )
+    take_profits = np.asarray(request.take_profits, dtype=np.float64)[kept]
+    stop_losses = np.asarray(request.stop_losses, dtype=np.float64)[kept]
+
+    upper, lower = resolve_barriers(
+        bid,
+        ask,
+        entry_indexes,
+        entry_prices,
+        take_profits,
+        stop_losses,
+        index=(
+            request.dataset.extrema_index()
+            if request.engine == BacktestEngine.INDEXED
+            else None
+        ),
+    )
+    close_indexes, status, trade_results = barrier_outcomes(directions, upper, lower)
+    close_prices = closing_prices(bid, ask, close_indexes, lower)
+
+    return BacktestResult(
+        direction=directions,
+        entry_point=entry_prices,
+        entry_point_index=entry_indexes,
+        take_profit=take_profits,
+        stop_loss=stop_losses,
+        price_close=close_prices,
+        price_close_index=close_indexes,
+        status=status,
+        result=trade_results,
+    )
+
+
+def _run_backtest(request: BacktestRequest) -> BacktestResult | None:
+    if request.engine == BacktestEngine.ITERATIVE:
+        dataset: NDArray | None = request.dataset.get_dataset()
+        if dataset is None:
+            return None
+
+        return BacktestResult.from_records(_backtest_iterative(request, dataset))
+
+    # The vectorised engines only read the bid and ask columns, which are not copied
+    # when the dataset is a memory-mapped store
+    bid: NDArray | None = request.dataset.get_column(TICKS_BID_INDEX)
+    ask: NDArray | None = request.dataset.get_column(TICKS_ASK_INDEX)
+    if bid is None or ask is None:
+        return None
+
+    return _backtest_vectorized(request, bid, ask)
+
+
+def with_times(result: BacktestResult | None, dataset: Any) -> BacktestResult | None:
+    """
+    Map the trades of a result to their times, when the dataset provides a time
+    index.
+
+    Parameters:
+        result (BacktestResult | None): The result of the trades.
+        dataset (Dataset): The dataset of the trades.
+
+    Returns:
+        (BacktestResult | None): The result with the opening and closing times of the
+            trades, or as it is if they cannot be mapped.
+    """
+
+    if result is None or not hasattr(dataset, "time_index"):
+        return result
+
+    try:
+        return result.with_times(dataset.time_index())
+    except (TypeError, ValueError) as error:
+        logger.warn(f"Unable to map the trades to their times: {error}")
+        return result
+
+
+def backtest(request: BacktestRequest) -> BacktestResult | None:
+    """
+    Backtest a set of trades against the dataset of the request.
+
+    The barriers are resolved by the engine specified in the request: the vectorised
+    engines resolve all the trades at once, scanning the prices or querying the
+    range-extrema index of the dataset, and also report the trades for which one
+    or both barriers are never hit (the latter as pending), while the iterative engine
+    walks the dataset trade by trade through `checker` and skips them.
+
+    When the request allows it and its dataset provides a fingerprint, the result is
+    looked up in the on-disk result cache before being computed, and stored in it
+    afterwards. A result that cannot be stored is still returned.
+
+    When the dataset provides a time index, the opening and closing times of the
+    trades are mapped from their indexes. They are not cached, as the fingerprint of
+    the dataset does not cover its times.
+
+    Parameters:
+        request (BacktestRequest): The trades to backtest and their dataset.
+
+    Returns:
+        (BacktestResult | None): The columnar result of the trades or None if the
+            request is not valid.
+    """
+
+    if len(request.direction) != len(request.starting_indexes):
+        logger.error(
+            "The length of the 'Direction' vector is not equal to the 'Starting"
+            " Indexes' vector"
+        )
+        return
+
+    result_cache: ResultCache | None = get_result_cache() if request.cache else None
+    data_fingerprint: str | None = (
+        request.dataset.fingerprint()
+        if result_cache is not None and hasattr(request.dataset, "fingerprint")
+        else None
+    )
+    if data_fingerprint is None:
+        return with_times(_run_backtest(request), request.dataset)
+
+    key = result_cache.key(request, data_fingerprint)
+    result: BacktestResult | None = result_cache.get(key)
+    if result is not None:
+        return with_times(result, request.dataset)
+
+    result = _run_backtest(request)
+    if result is not None:
+        try:
+            result_cache.put(key, result)
+        except OSError as error:
+            logger.warn(f"Unable to store the backtest result in the cache: {error}")
+
+    return with_times(result, request.dataset)
@@ -0,0 +1,360 @@
+import numpy as np
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.extrema import RangeExtremaIndex
+from inkosi.backtest.operation.models import TradeResult, TradeStatus, encode
+from inkosi.database.mongodb.schemas import Position
+from inkosi.log.log import Logger
+
+DEFAULT_WINDOW: int = 1024
+DEFAULT_MAX_ELEMENTS: int = 2**22
+
+logger = Logger(
+    module_name="barriers",
+    package_name="backtest",
+    database=False,
+)
+
+
+def entry_points(
+    bid: NDArray,
+    ask: NDArray,
+    starting_indexes: NDArray | list[int],
+    directions: NDArray | list[Position],
+) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+    """
+    Locate the entry point of a batch of trades.
+
+    Each trade is opened on the record following its starting index, at the bid
+    price for buy trades and at the ask price for sell trades. As done by `backtest`,
+    the trades from the first one exceeding the dataset onwards are discarded, as well
+    as the ones with an unknown direction.
+
+    Parameters:
+        bid (NDArray): The bid prices.
+        ask (NDArray): The ask prices.
+        starting_indexes (NDArray | list[int]): The starting index of each trade.
+        directions (NDArray | list[Position]): The direction of each trade.
+
+    Returns:
+        (tuple[NDArray, NDArray, NDArray, NDArray]): The positions of the kept trades
+            in the input, their entry index, direction code and entry price.
+    """
+
+    entry_indexes = np.asarray(starting_indexes, dtype=np.int64) + 1
+    direction_codes = encode(directions, Position)
+
+    kept = np.arange(entry_indexes.shape[0])
+    exhausted = np.nonzero(entry_indexes > bid.shape[0] - 1)[0]
+    if exhausted.size:
+        logger.critical("Backtest Interrupted... Dataset records exhausted")
+        kept = kept[: exhausted[0]]
+
+    kept = kept[direction_codes[kept] >= 0]
+    entry_indexes, direction_codes = entry_indexes[kept], direction_codes[kept]
+
+    entry_prices = np.where(
+        direction_codes == Position.list().index(Position.BUY),
+        bid[entry_indexes],
+        ask[entry_indexes],
+    )
+
+    return kept, entry_indexes, direction_codes, entry_prices
+
+
+def _scan_window(
+    series: NDArray,
+    positions: NDArray,
+    levels: NDArray,
+    width: int,
+    above: bool,
+) -> NDArray:
+    """
+    Scan a window of `width` elements starting at each position.
+
+    Parameters:
+        series (NDArray): The one-dimensional series to scan.
+        positions (NDArray): The first index of each window.
+        levels (NDArray): The barrier level of each window.
+        width (int): The number of elements of each window.
+        above (bool): True if the barrier is hit when the series is greater or equal
+            than the level, False if it is hit when it is less or equal.
+
+    Returns:
+        (NDArray): The offset of the first hit within each window, -1 if the barrier
+            is not hit inside the window.
+    """
+
+    indexes = positions[:, None] + np.arange(width)
+    valid = indexes < series.shape[0]
+    values = series[np.minimum(indexes, series.shape[0] - 1)]
+
+    if above:
+        hits = (values >= levels[:, None]) & valid
+    else:
+        hits = (values <= levels[:, None]) & valid
+
+    return np.where(hits.any(axis=1), hits.argmax(axis=1), -1)
+
+
+def first_passage(
+    series: NDArray,
+    starting_indexes: NDArray,
+    levels: NDArray,
+    above: bool,
+    window: int = DEFAULT_WINDOW,
+    max_elements: int = DEFAULT_MAX_ELEMENTS,
+) -> NDArray:
+    """
+    Find, for every starting index, the first index at which the series reaches the
+    corresponding level.
+
+    All the entries are scanned together over windows of growing width: the entries
+    resolved in a window are dropped, while the others move forward to the next one.
+    The number of elements materialised at once is bounded by `max_elements`.
+
+    Parameters:
+        series (NDArray): The one-dimensional series to scan.
+        starting_indexes (NDArray): The index from which each scan starts.
+        levels (NDArray): The barrier level of each scan.
+        above (bool): True if the barrier is hit when the series is greater or equal
+            than the level, False if it is hit when it is less or equal.
+        window (int, default 1024): The width of the first window.
+        max_elements (int, default 2**22): The maximum number of elements scanned in a
+            single vectorised step.
+
+    Returns:
+        (NDArray): The index of the first hit for each starting index, -1 if the
+            barrier is never hit.
+    """
+
+    series = np.asarray(series, dtype=np.float64)
+    positions = np.asarray(starting_indexes, dtype=np.int64).copy()
+    levels = np.asarray(levels, dtype=np.float64)
+
+    result = np.full(positions.shape[0], -1, dtype=np.int64)
+    active = np.nonzero(positions < series.shape[0])[0]
+    width = max(int(window), 1)
+
+    while active.size:
+        rows = max(max_elements // width, 1)
+
+        for chunk in range(0, active.size, rows):
+            entries = active[chunk : chunk + rows]
+            offsets = _scan_window(
+                series,
+                positions[entries],
+                levels[entries],
+                width,
+                above,
+            )
+            found = offsets >= 0
+            result[entries[found]] = positions[entries[found]] + offsets[found]
+
+        positions[active] += width
+        active = active[(result[active] < 0) & (positions[active] < series.shape[0])]
+
+        if active.size:
+            width = max(min(width * 2, max_elements // active.size), width)
+
+    return result
+
+
+def first_passage_paths(
+    paths: NDArray,
+    starting_index: int,
+    levels: NDArray,
+    above: bool,
+    max_elements: int = DEFAULT_MAX_ELEMENTS,
+) -> NDArray:
+    """
+    Find, for every path of a matrix, the first index along axis 1 at which the
+    path reaches the corresponding level.
+
+    The paths are scanned in blocks of rows, so that the number of elements
+    materialised at once is bounded by `max_elements`.
+
+    Parameters:
+        paths (NDArray): The paths, one per row.
+        starting_index (int): The column from which every scan starts.
+        levels (NDArray): The barrier level of each path.
+        above (bool): True if the barrier is hit when the path is greater or equal
+            than the level, False if it is hit when it is less or equal.
+        max_elements (int, default 2**22): The maximum number of elements scanned in a
+            single vectorised step.
+
+    Returns:
+        (NDArray): The index of the first hit for each path, -1 if the barrier is
+            never hit.
+    """
+
+    n_paths, steps = paths.shape
+    levels = np.asarray(levels, dtype=np.float64)
+    result = np.full(n_paths, -1, dtype=np.int64)
+
+    if starting_index >= steps:
+        return result
+
+    rows = max(max_elements // (steps - starting_index), 1)
+    for first in range(0, n_paths, rows):
+        block = paths[first : first + rows, starting_index:]
+        block_levels = levels[first : first + rows, None]
+        hits = block >= block_levels if above else block <= block_levels
+
+        offsets = hits.argmax(axis=1)
+        found = hits[np.arange(hits.shape[0]), offsets]
+        result[first : first + rows] = np.where(found, offsets + starting_index, -1)
+
+    return result
+
+
+def resolve_barriers(
+    bid: NDArray,
+    ask: NDArray,
+    entry_indexes: NDArray,
+    entry_prices: NDArray,
+    take_profits: NDArray,
+    stop_losses: NDArray,
+    window: int = DEFAULT_WINDOW,
+    max_elements: int = DEFAULT_MAX_ELEMENTS,
+    index: RangeExtremaIndex | None = None,
+) -> tuple[NDArray, NDArray]:
+    """
+    Resolve the upper and lower barriers of a batch of trades.
+
+    The upper barrier is placed at `entry_price + take_profit` and checked on the bid
+    prices, the lower barrier at `entry_price - |stop_loss|` and checked on the ask
+    prices, as done by `checker`. Both barriers are searched strictly after the entry
+    index, either by scanning the prices or, when a range-extrema index is provided,
+    through its O(log n) first-passage queries.
+
+    Parameters:
+        bid (NDArray): The bid prices.
+        ask (NDArray): The ask prices.
+        entry_indexes (NDArray): The index at which each trade is opened.
+        entry_prices (NDArray): The price at which each trade is opened.
+        take_profits (NDArray): The take-profit distance of each trade.
+        stop_losses (NDArray): The stop-loss distance of each trade.
+        window (int, default 1024): The width of the first scanning window.
+        max_elements (int, default 2**22): The maximum number of elements scanned in a
+            single vectorised step.
+        index (RangeExtremaIndex, optional, default None): The range-extrema index
+            built over the bid and ask prices.
+
+    Returns:
+        (tuple[NDArray, NDArray]): The index of the first upper and lower barrier hit
+            of each trade, -1 if the barrier is never hit.
+    """
+
+    starting_indexes = np.asarray(entry_indexes, dtype=np.int64) + 1
+    entry_prices = np.asarray(entry_prices, dtype=np.float64)
+    upper_levels = entry_prices + np.asarray(take_profits, dtype=np.float64)
+    lower_levels = entry_prices - np.abs(np.asarray(stop_losses, dtype=np.float64))
+
+    if index is not None:
+        return (
+            index.first_bid_above(starting_indexes, upper_levels),
+            index.first_ask_below(starting_indexes, lower_levels),
+        )
+
+    upper = first_passage(
+        bid,
+        starting_indexes,
+        upper_levels,
+        above=True,
+        window=window,
+        max_elements=max_elements,
+    )
+    lower = first_passage(
+        ask,
+        starting_indexes,
+        lower_levels,
+        above=False,
+        window=window,
+        max_elements=max_elements,
+    )
+
+    return upper, lower
+
+
+def barrier_outcomes(
+    directions: NDArray,
+    upper: NDArray,
+    lower: NDArray,
+) -> tuple[NDArray, NDArray, NDArray]:
+    """
+    Turn the barrier hits of a batch of trades into their outcomes.
+
+    A trade is closed by the barrier hit first, the lower one winning ties. When
+    neither barrier is hit the trade is left pending.
+
+    Parameters:
+        directions (NDArray): The direction codes (buy/sell) of each trade.
+        upper (NDArray): The index of the first upper barrier hit, -1 if none.
+        lower (NDArray): The index of the first lower barrier hit, -1 if none.
+
+    Returns:
+        (tuple[NDArray, NDArray, NDArray]): The closing index (-1 if pending), the
+            status codes and the result codes of each trade.
+    """
+
+    upper_first = (upper >= 0) & ((lower < 0) | (upper < lower))
+    lower_first = (lower >= 0) & ~upper_first
+
+    close_index = np.where(upper_first, upper, np.where(lower_first, lower, -1))
+
+    status = np.where(
+        close_index >= 0,
+        TradeStatus.list().index(TradeStatus.CLOSED),
+        TradeStatus.list().index(TradeStatus.PENDING),
+    ).astype(np.int8)
+
+    buy = np.asarray(directions) == Position.list().index(Position.BUY)
+    result = np.full(
+        upper.shape[0],
+        TradeResult.list().index(TradeResult.PENDING),
+        dtype=np.int8,
+    )
+    result[(upper_first & buy) | (lower_first & ~buy)] = TradeResult.list().index(
+        TradeResult.PROFIT
+    )
+    result[(lower_first & buy) | (upper_first & ~buy)] = TradeResult.list().index(
+        TradeResult.LOSS
+    )
+
+    return close_index, status, result
+
+
+def closing_prices(
+    bid: NDArray,
+    ask: NDArray,
+    close_indexes: NDArray,
+    lower: NDArray,
+) -> NDArray:
+    """
+    Get the closing price of a batch of trades from the barrier that closed them: the
+    ask price for the lower barrier, which wins ties, and the bid price for the upper
+    one.
+
+    Parameters:
+        bid (NDArray): The bid prices, or the bid paths with one row per trade.
+        ask (NDArray): The ask prices, or the ask paths with one row per trade.
+        close_indexes (NDArray): The closing index of each trade, -1 if pending.
+        lower (NDArray): The index of the first lower barrier hit, -1 if none.
+
+    Returns:
+        (NDArray): The closing price of each trade, NaN if pending.
+    """
+
+    closing = np.maximum(close_indexes, 0)
+    if bid.ndim == 2:
+        rows = np.arange(closing.shape[0])
+        bid_prices, ask_prices = bid[rows, closing], ask[rows, closing]
+    else:
+        bid_prices, ask_prices = bid[closing], ask[closing]
+
+    return np.where(
+        close_indexes < 0,
+        np.nan,
+        np.where(close_indexes == lower, ask_prices, bid_prices),
+    )
@@ -0,0 +1,211 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.schemas import AvailableRawColumns, TimeFrames
+
+NANOSECONDS_PER_MINUTE: int = 60 * 10**9
+NANOSECONDS_PER_DAY: int = 24 * 60 * NANOSECONDS_PER_MINUTE
+
+# Width of the time frames of constant duration
+TIME_FRAME_NANOSECONDS: dict[TimeFrames, int] = {
+    TimeFrames.MINUTES_1: NANOSECONDS_PER_MINUTE,
+    TimeFrames.MINUTES_2: 2 * NANOSECONDS_PER_MINUTE,
+    TimeFrames.MINUTES_5: 5 * NANOSECONDS_PER_MINUTE,
+    TimeFrames.MINUTES_15: 15 * NANOSECONDS_PER_MINUTE,
+    TimeFrames.MINUTES_30: 30 * NANOSECONDS_PER_MINUTE,
+    TimeFrames.MINUTES_60: 60 * NANOSECONDS_PER_MINUTE,
+    TimeFrames.MINUTES_90: 90 * NANOSECONDS_PER_MINUTE,
+    TimeFrames.HOUR_1: 60 * NANOSECONDS_PER_MINUTE,
+    TimeFrames.DAY_1: NANOSECONDS_PER_DAY,
+    TimeFrames.DAY_5: 5 * NANOSECONDS_PER_DAY,
+    TimeFrames.WEEK_1: 7 * NANOSECONDS_PER_DAY,
+}
+
+# Number of months of the calendar time frames
+TIME_FRAME_MONTHS: dict[TimeFrames, int] = {
+    TimeFrames.MONTH_1: 1,
+    TimeFrames.MONTH_3: 3,
+}
+
+# The epoch is a Thursday, the weeks start on the following Monday
+WEEK_ORIGIN: int = 4 * NANOSECONDS_PER_DAY
+
+
+@dataclass
+class Bars:
+    """
+    Data class representing the OHLC bars built from tick data.
+
+    The bars only cover the periods with ticks. The ticks of the bar i are the
+    ticks `offsets[i]` to `offsets[i + 1]` (excluded), so that the bars map back to
+    exact tick indexes.
+
+    Attributes:
+        time_frame (TimeFrames): The time frame of the bars.
+        dates (NDArray): The opening time of each bar, as datetime64.
+        open (NDArray): The first bid of each bar.
+        high (NDArray): The highest bid of each bar.
+        low (NDArray): The lowest bid of each bar.
+        close (NDArray): The last bid of each bar.
+        close_ask (NDArray): The last ask of each bar.
+        offsets (NDArray): The index of the first tick of each bar, followed by the
+            number of ticks.
+    """
+
+    time_frame: TimeFrames
+    dates: NDArray
+    open: NDArray
+    high: NDArray
+    low: NDArray
+    close: NDArray
+    close_ask: NDArray
+    offsets: NDArray
+
+    def __len__(self) -> int:
+        return self.dates.shape[0]
+
+    def ticks(self) -> NDArray:
+        """
+        Get the number of ticks of each bar.
+
+        Returns:
+            (NDArray): The number of ticks of each bar.
+        """
+
+        return np.diff(self.offsets)
+
+    def first_ticks(self, positions: NDArray | list[int]) -> NDArray:
+        """
+        Map bars to the index of their first tick.
+
+        Parameters:
+            positions (NDArray | list[int]): The positions of the bars.
+
+        Returns:
+            (NDArray): The index of the first tick of each bar.
+        """
+
+        return self.offsets[np.asarray(positions, dtype=np.int64)]
+
+    def starting_indexes(self, positions: NDArray | list[int]) -> NDArray:
+        """
+        Map the bars selected by the filters to the starting indexes of their trades
+        in the ticks: the last tick of each bar, so that the trades enter on the
+        first tick following the close of the bar, as `backtest` enters on the
+        record following the starting index.
+
+        Parameters:
+            positions (NDArray | list[int]): The positions of the bars, e.g. as
+                returned by `filter_dataset` over `data_frame()`.
+
+        Returns:
+            (NDArray): The starting tick index of each trade.
+        """
+
+        return self.offsets[np.asarray(positions, dtype=np.int64) + 1] - 1
+
+    def data_frame(self) -> pd.DataFrame:
+        """
+        Convert the bars to a pandas DataFrame with the columns of an asset, so that
+        the filters can be evaluated on them. As for the quotes of an asset, the
+        returns are the differences between the close and the open prices.
+
+        Returns:
+            (pd.DataFrame): A DataFrame with a row per bar.
+        """
+
+        return pd.DataFrame(
+            {
+                AvailableRawColumns.DATES: self.dates,
+                AvailableRawColumns.OPEN_PRICE: self.open,
+                AvailableRawColumns.HIGH_PRICE: self.high,
+                AvailableRawColumns.LOW_PRICE: self.low,
+                AvailableRawColumns.CLOSE_PRICE: self.close,
+                AvailableRawColumns.RETURNS: self.close - self.open,
+            },
+            copy=False,
+        )
+
+
+def bar_keys(times: NDArray, time_frame: TimeFrames) -> NDArray:
+    """
+    Compute the bar of each tick as the time of the opening of the bar.
+
+    Parameters:
+        times (NDArray): The int64 nanoseconds since the epoch of the ticks.
+        time_frame (TimeFrames): The time frame of the bars.
+
+    Returns:
+        (NDArray): The int64 nanoseconds since the epoch of the opening of the bar
+            of each tick.
+    """
+
+    if time_frame in TIME_FRAME_MONTHS:
+        months = times.astype("datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+        months -= months % TIME_FRAME_MONTHS[time_frame]
+
+        return months.astype("datetime64[M]").astype("datetime64[ns]").astype(np.int64)
+
+    width = TIME_FRAME_NANOSECONDS[time_frame]
+    origin = WEEK_ORIGIN if time_frame == TimeFrames.WEEK_1 else 0
+
+    return (times - origin) // width * width + origin
+
+
+def resample_ticks(
+    times: NDArray,
+    bid: NDArray,
+    ask: NDArray,
+    time_frame: TimeFrames,
+) -> Bars:
+    """
+    Build the OHLC bars of a time frame from tick data sorted by time.
+
+    The bars are built in a single vectorised pass: the boundaries of the bars are
+    the changes of the bar of the ticks, and their highs and lows are reduced
+    between the boundaries.
+
+    Parameters:
+        times (NDArray): The int64 nanoseconds since the epoch of the ticks.
+        bid (NDArray): The bid of the ticks.
+        ask (NDArray): The ask of the ticks.
+        time_frame (TimeFrames): The time frame of the bars.
+
+    Returns:
+        (Bars): The bars of the ticks.
+    """
+
+    times = np.asarray(times, dtype=np.int64)
+    bid = np.asarray(bid, dtype=np.float64)
+    ask = np.asarray(ask, dtype=np.float64)
+
+    if not times.shape[0]:
+        empty = np.empty(0, dtype=np.float64)
+        return Bars(
+            time_frame=time_frame,
+            dates=np.empty(0, dtype="datetime64[ns]"),
+            open=empty,
+            high=empty,
+            low=empty,
+            close=empty,
+            close_ask=empty,
+            offsets=np.zeros(1, dtype=np.int64),
+        )
+
+    keys = bar_keys(times, time_frame)
+    starts = np.concatenate([[0], np.flatnonzero(keys[1:] != keys[:-1]) + 1])
+    offsets = np.append(starts, times.shape[0]).astype(np.int64)
+
+    return Bars(
+        time_frame=time_frame,
+        dates=keys[starts].astype("datetime64[ns]"),
+        open=bid[starts],
+        high=np.maximum.reduceat(bid, starts),
+        low=np.minimum.reduceat(bid, starts),
+        close=bid[offsets[1:] - 1],
+        close_ask=ask[offsets[1:] - 1],
+        offsets=offsets,
+    )
@@ -0,0 +1,346 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.asset import Asset
+from inkosi.backtest.operation.backtest import backtest, filter_dataset
+from inkosi.backtest.operation.extrema import RangeExtremaIndex
+from inkosi.backtest.operation.models import (
+    TICKS_ASK_INDEX,
+    TICKS_BID_INDEX,
+    BacktestEngine,
+    BacktestRequest,
+    BacktestResult,
+)
+from inkosi.backtest.operation.schemas import AvailableRawColumns, Filter
+from inkosi.database.mongodb.schemas import Position
+from inkosi.log.log import Logger
+from inkosi.utils.settings import get_default_tickers
+
+logger = Logger(
+    module_name="batch",
+    package_name="backtest",
+    database=False,
+)
+
+SHARED_COLUMNS: list[AvailableRawColumns] = [
+    AvailableRawColumns.OPEN_PRICE,
+    AvailableRawColumns.HIGH_PRICE,
+    AvailableRawColumns.LOW_PRICE,
+    AvailableRawColumns.CLOSE_PRICE,
+    AvailableRawColumns.RETURNS,
+]
+
+
+@dataclass(frozen=True)
+class SharedColumns:
+    """
+    Picklable descriptor of a set of columns stored in a shared memory block.
+
+    Attributes:
+        name (str): The name of the shared memory block.
+        length (int): The number of records of each column.
+        columns (tuple[tuple[str, str, int], ...]): The name, dtype and byte offset of
+            each column inside the block.
+    """
+
+    name: str
+    length: int
+    columns: tuple[tuple[str, str, int], ...]
+
+    @classmethod
+    def create(cls, data: dict[str, NDArray]) -> tuple["SharedColumns", SharedMemory]:
+        """
+        Copy the columns into a new shared memory block.
+
+        Parameters:
+            data (dict[str, NDArray]): The columns to share, all of the same length.
+
+        Returns:
+            (tuple[SharedColumns, SharedMemory]): The descriptor of the columns and the
+                shared memory block, which must be unlinked by the caller.
+        """
+
+        length = len(next(iter(data.values()))) if data else 0
+        columns, offset = [], 0
+        for column_name, values in data.items():
+            values = np.ascontiguousarray(values)
+            columns.append((column_name, values.dtype.str, offset))
+            offset += values.nbytes
+
+        shared_memory = SharedMemory(create=True, size=max(offset, 1))
+        descriptor = cls(name=shared_memory.name, length=length, columns=tuple(columns))
+
+        for (column_name, _, _), view in zip(
+            descriptor.columns,
+            descriptor.views(shared_memory).values(),
+        ):
+            view[:] = data[column_name]
+
+        return descriptor, shared_memory
+
+    def views(self, shared_memory: SharedMemory) -> dict[str, NDArray]:
+        """
+        Get zero-copy views of the columns over the shared memory block.
+
+        Parameters:
+            shared_memory (SharedMemory): The shared memory block of the columns.
+
+        Returns:
+            (dict[str, NDArray]): The columns by name.
+        """
+
+        return {
+            column_name: np.ndarray(
+                shape=(self.length,),
+                dtype=np.dtype(dtype),
+                buffer=shared_memory.buf,
+                offset=offset,
+            )
+            for column_name, dtype, offset in self.columns
+        }
+
+    def attach(self) -> tuple[dict[str, NDArray], SharedMemory]:
+        """
+        Attach to the shared memory block from another process.
+
+        Returns:
+            (tuple[dict[str, NDArray], SharedMemory]): The columns by name and the
+                shared memory block, which must be closed by the caller.
+        """
+
+        shared_memory = SharedMemory(name=self.name)
+
+        return self.views(shared_memory), shared_memory
+
+
+class _SharedDataset:
+    """
+    Minimal dataset over columns attached from shared memory, exposing the interface
+    used by `backtest`. The columns are returned as they are, without copying, and
+    only stacked for the iterative engine.
+    """
+
+    def __init__(self, columns: list[NDArray]) -> None:
+        self.columns = columns
+        self.np_dataset: NDArray | None = None
+        self._extrema_index: RangeExtremaIndex | None = None
+
+    def get_dataset(self) -> NDArray:
+        if self.np_dataset is None:
+            self.np_dataset = np.column_stack(self.columns)
+
+        return self.np_dataset
+
+    def get_column(self, index: int) -> NDArray:
+        return self.columns[index]
+
+    def extrema_index(self) -> RangeExtremaIndex:
+        if self._extrema_index is None:
+            self._extrema_index = RangeExtremaIndex(
+                bid=self.columns[TICKS_BID_INDEX],
+                ask=self.columns[TICKS_ASK_INDEX],
+            )
+
+        return self._extrema_index
+
+
+@dataclass
+class BatchResult:
+    """
+    Data class representing the combined result of a multi-asset backtest.
+
+    Attributes:
+        tickers (list[str]): The tickers that have been backtested.
+        ticker (NDArray): The position in `tickers` of the ticker of each trade.
+        result (BacktestResult): The trades of all the tickers.
+    """
+
+    tickers: list[str]
+    ticker: NDArray
+    result: BacktestResult
+
+    def select(self, ticker: str) -> BacktestResult:
+        """
+        Get the trades of a single ticker.
+
+        Parameters:
+            ticker (str): The ticker.
+
+        Returns:
+            (BacktestResult): The trades of the ticker.
+        """
+
+        return self.result.select(self.ticker == self.tickers.index(ticker))
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Convert the combined result to a pandas DataFrame with a ticker column.
+
+        Returns:
+            (pd.DataFrame): A DataFrame with a row per trade.
+        """
+
+        data_frame = self.result.to_pandas()
+        data_frame.insert(
+            0,
+            "ticker",
+            pd.Categorical.from_codes(self.ticker, categories=self.tickers),
+        )
+
+        return data_frame
+
+
+def _backtest_shared(
+    descriptor: SharedColumns,
+    filters: list[Filter],
+    direction: Position,
+    take_profit: float,
+    stop_loss: float,
+    engine: BacktestEngine,
+) -> BacktestResult:
+    """
+    Filter and backtest a single asset whose columns are stored in shared memory.
+    """
+
+    columns, shared_memory = descriptor.attach()
+
+    try:
+        indexes = filter_dataset(pd.DataFrame(columns, copy=False), filters=filters)
+        n_indexes = indexes.shape[0]
+
+        # Same layout as the datasets built from an asset: dates, close, open
+        dataset = _SharedDataset(
+            [
+                np.arange(descriptor.length, dtype=np.float64),
+                columns[AvailableRawColumns.CLOSE_PRICE],
+                columns[AvailableRawColumns.OPEN_PRICE],
+            ]
+        )
+
+        result = backtest(
+            BacktestRequest(
+                starting_indexes=indexes.tolist(),
+                direction=[direction] * n_indexes,
+                take_profits=[take_profit] * n_indexes,
+                stop_losses=[stop_loss] * n_indexes,
+                dataset=dataset,
+                engine=engine,
+            )
+        )
+    finally:
+        # The views over the block must be released before it is closed
+        dataset = None
+        del columns
+        shared_memory.close()
+
+    return result if result is not None else BacktestResult.empty()
+
+
+def run_batch(
+    filters: list[Filter],
+    direction: Position,
+    take_profit: float,
+    stop_loss: float,
+    tickers: list[str] | None = None,
+    time_frame: str = "1d",
+    start: date | None = None,
+    end: date | None = None,
+    engine: BacktestEngine = BacktestEngine.VECTORIZED,
+    workers: int | None = None,
+) -> BatchResult:
+    """
+    Backtest the same rules over several assets in parallel.
+
+    The assets are loaded in the calling process and their columns are copied once
+    into shared memory, so that the worker processes of the pool attach to them
+    instead of receiving a pickled copy. Only the columnar results are sent back.
+
+    Parameters:
+        filters (list[Filter]): The rules selecting the entries.
+        direction (Position): The trading direction.
+        take_profit (float): The take-profit level.
+        stop_loss (float): The stop-loss level.
+        tickers (list[str], optional, default None): The tickers to backtest, by
+            default the ones listed in the `Backtesting.Tickers` setting.
+        time_frame (str, default "1d"): The time frame of the data.
+        start (date, optional, default None): The start date of the data.
+        end (date, optional, default None): The end date of the data.
+        engine (BacktestEngine, default "vectorized"): The backtest engine.
+        workers (int, optional, default None): The number of worker processes, by
+            default the number of CPUs.
+
+    Returns:
+        (BatchResult): The combined result of the tickers that have been backtested.
+    """
+
+    tickers = list(tickers if tickers is not None else get_default_tickers())
+
+    shared: dict[str, tuple[SharedColumns, SharedMemory]] = {}
+    results: dict[str, BacktestResult] = {}
+
+    try:
+        for ticker in tickers:
+            asset = Asset(
+                asset_name=ticker,
+                time_frame=time_frame,
+                start=start,
+                end=end,
+            )
+            if asset.result is None:
+                logger.error(f"Unable to load the ticker {ticker}, skipping it")
+                continue
+
+            shared[ticker] = SharedColumns.create(
+                {
+                    column: np.asarray(asset.result[column], dtype=np.float64)
+                    for column in SHARED_COLUMNS
+                }
+            )
+
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            futures = {
+                executor.submit(
+                    _backtest_shared,
+                    descriptor,
+                    filters,
+                    direction,
+                    take_profit,
+                    stop_loss,
+                    engine,
+                ): ticker
+                for ticker, (descriptor, _) in shared.items()
+            }
+
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as error:
+                    logger.error(
+                        f"Unable to backtest the ticker {futures[future]}. Error"
+                        f" occurred: {error}"
+                    )
+    finally:
+        for _, shared_memory in shared.values():
+            shared_memory.close()
+            shared_memory.unlink()
+
+    backtested = [ticker for ticker in tickers if ticker in results]
+
+    return BatchResult(
+        tickers=backtested,
+        ticker=np.concatenate(
+            [
+                np.full(len(results[ticker]), code, dtype=np.int32)
+                for code, ticker in enumerate(backtested)
+            ]
+            or [np.empty(0, dtype=np.int32)]
+        ),
+        result=BacktestResult.concatenate([results[ticker] for ticker in backtested]),
+    )
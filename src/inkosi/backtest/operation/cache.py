@@ -0,0 +1,622 @@
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from collections import OrderedDict
+from dataclasses import fields
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Hashable
+from urllib.parse import quote
+from zipfile import BadZipFile
+
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.models import (
+    BacktestEngine,
+    BacktestRequest,
+    BacktestResult,
+    encode,
+)
+from inkosi.database.mongodb.schemas import Position
+from inkosi.log.log import Logger
+from inkosi.utils.settings import (
+    get_backtesting_settings,
+    get_project_path,
+    get_technical_indicators_values,
+)
+
+logger = Logger(
+    module_name="cache",
+    package_name="backtest",
+    database=False,
+)
+
+
+def fingerprint(*arrays: NDArray) -> str:
+    """
+    Compute a content fingerprint of one or more arrays.
+
+    Parameters:
+        *arrays (NDArray): The arrays to fingerprint.
+
+    Returns:
+        (str): The hexadecimal digest of the shape, dtype and content of the arrays.
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        if array.dtype.hasobject:
+            digest.update(repr(array.tolist()).encode())
+        else:
+            digest.update(memoryview(array).cast("B"))
+
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    Thread-safe LRU cache of indicator columns bounded by their size in bytes.
+
+    The cached arrays are made read-only, so that the callers cannot alter the values
+    shared with the following lookups.
+
+    Attributes:
+        max_bytes (int): The maximum number of bytes held by the cache.
+        hits (int): The number of lookups served by the cache.
+        misses (int): The number of lookups that had to compute the indicator.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """
+        Initializes an IndicatorCache instance.
+
+        Parameters:
+            max_bytes (int): The maximum number of bytes held by the cache.
+        """
+
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[Hashable, NDArray] = OrderedDict()
+        self._nbytes = 0
+        self._lock = Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes currently held by the cache.
+        """
+
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> NDArray | None:
+        """
+        Look up an indicator column.
+
+        Parameters:
+            key (Hashable): The key of the column.
+
+        Returns:
+            (NDArray | None): The cached column or None if it is not cached.
+        """
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return value
+
+    def put(self, key: Hashable, value: NDArray) -> NDArray:
+        """
+        Store an indicator column, evicting the least recently used ones if needed.
+        Columns larger than the whole cache are returned without being stored.
+
+        Parameters:
+            key (Hashable): The key of the column.
+            value (NDArray): The column.
+
+        Returns:
+            (NDArray): A read-only view of the column, the column itself being left
+                writable.
+        """
+
+        value = np.asarray(value).view()
+        value.flags.writeable = False
+
+        if value.nbytes > self.max_bytes:
+            return value
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous.nbytes
+
+            while self._entries and self._nbytes + value.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+
+            self._entries[key] = value
+            self._nbytes += value.nbytes
+
+        return value
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        function: Callable[[], NDArray],
+    ) -> NDArray:
+        """
+        Look up an indicator column, computing and storing it on a miss.
+
+        Parameters:
+            key (Hashable): The key of the column.
+            function (Callable[[], NDArray]): The function computing the column.
+
+        Returns:
+            (NDArray): The read-only column.
+        """
+
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, function())
+
+        return value
+
+    def clear(self) -> None:
+        """
+        Remove all the cached columns and reset the counters.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the statistics of the cache.
+
+        Returns:
+            (dict[str, int]): The number of hits, misses, entries and bytes held.
+        """
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self),
+            "bytes": self.nbytes,
+        }
+
+
+@lru_cache
+def get_indicator_cache() -> IndicatorCache:
+    """
+    Get the process-wide indicator cache, sized through the
+    `TechnicalIndicators.CacheMaxBytes` setting.
+
+    Returns:
+        (IndicatorCache): The indicator cache.
+    """
+
+    return IndicatorCache(max_bytes=get_technical_indicators_values().CacheMaxBytes)
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of backtest results, bounded by its size in
+    bytes.
+
+    Each result is stored as a compressed `.npz` archive named after the hash of the
+    trades of the request, its engine and the fingerprint of its dataset, so that
+    the same request over the same data always hits the same entry. The
+    modification time of the archives records their last use: the least recently
+    used ones are evicted when the cache exceeds its size.
+
+    Attributes:
+        directory (Path): The directory of the cache.
+        max_bytes (int): The maximum number of bytes held by the cache.
+        hits (int): The number of lookups served by the cache.
+        misses (int): The number of lookups not found in the cache.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int) -> None:
+        """
+        Initializes a ResultCache instance.
+
+        Parameters:
+            directory (str | Path): The directory of the cache, created if needed.
+            max_bytes (int): The maximum number of bytes held by the cache.
+        """
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = Lock()
+
+    @staticmethod
+    def key(request: BacktestRequest, data_fingerprint: str) -> str:
+        """
+        Compute the key of a request.
+
+        Parameters:
+            request (BacktestRequest): The backtest request.
+            data_fingerprint (str): The fingerprint of the dataset of the request.
+
+        Returns:
+            (str): The hexadecimal key of the request.
+        """
+
+        return fingerprint(
+            np.asarray(request.starting_indexes, dtype=np.int64),
+            encode(request.direction, Position),
+            np.asarray(request.take_profits, dtype=np.float64),
+            np.asarray(request.stop_losses, dtype=np.float64),
+            np.asarray(
+                [BacktestEngine(request.engine).value, data_fingerprint],
+                dtype=object,
+            ),
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.directory.joinpath(f"{key}.npz")
+
+    def get(self, key: str) -> BacktestResult | None:
+        """
+        Look up a backtest result.
+
+        Parameters:
+            key (str): The key of the request.
+
+        Returns:
+            (BacktestResult | None): The cached result or None if it is not cached.
+        """
+
+        path = self._path(key)
+        try:
+            with np.load(path) as archive:
+                result = BacktestResult(
+                    **{
+                        field.name: archive[field.name]
+                        for field in fields(BacktestResult)
+                        if field.name in archive.files
+                    }
+                )
+            os.utime(path)
+        except (OSError, KeyError, ValueError, BadZipFile, zlib.error):
+            # Missing or corrupt entries are misses
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+
+        return result
+
+    def put(self, key: str, result: BacktestResult) -> None:
+        """
+        Store a backtest result, evicting the least recently used ones if needed.
+
+        Parameters:
+            key (str): The key of the request.
+            result (BacktestResult): The result of the request.
+
+        Raises:
+            OSError: If the result cannot be written, in which case no partial entry
+                is left behind.
+        """
+
+        path = self._path(key)
+        partial: Path | None = None
+        try:
+            # The partial file is unique to the call, so that the concurrent puts of
+            # the same key, from other threads or processes, never write to it
+            with tempfile.NamedTemporaryFile(
+                dir=self.directory,
+                prefix=f"{key}.",
+                suffix=".part",
+                delete=False,
+            ) as file:
+                partial = Path(file.name)
+                np.savez_compressed(
+                    file,
+                    **{
+                        field.name: getattr(result, field.name)
+                        for field in fields(result)
+                        if getattr(result, field.name) is not None
+                    },
+                )
+            os.replace(partial, path)
+        except OSError:
+            if partial is not None:
+                partial.unlink(missing_ok=True)
+            raise
+
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for path in self.directory.glob("*.npz"):
+                try:
+                    status = path.stat()
+                except OSError:
+                    continue
+                entries.append((status.st_mtime, status.st_size, path))
+
+            nbytes = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if nbytes <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                nbytes -= size
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes currently held by the cache.
+        """
+
+        return sum(path.stat().st_size for path in self.directory.glob("*.npz"))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.directory.glob("*.npz"))
+
+    def clear(self) -> None:
+        """
+        Remove all the cached results and reset the counters.
+        """
+
+        with self._lock:
+            for path in self.directory.glob("*.npz"):
+                path.unlink(missing_ok=True)
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the statistics of the cache.
+
+        Returns:
+            (dict[str, int]): The number of hits, misses, entries and bytes held.
+        """
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self),
+            "bytes": self.nbytes,
+        }
+
+
+@lru_cache
+def get_result_cache() -> ResultCache | None:
+    """
+    Get the process-wide cache of backtest results, located and sized through the
+    `Backtesting.CacheDirectory` and `Backtesting.CacheMaxBytes` settings.
+
+    Returns:
+        (ResultCache | None): The result cache or None if it is disabled or its
+            directory cannot be created.
+    """
+
+    settings = get_backtesting_settings()
+    if settings.CacheMaxBytes <= 0:
+        return None
+
+    try:
+        return ResultCache(
+            directory=get_project_path(settings.CacheDirectory),
+            max_bytes=settings.CacheMaxBytes,
+        )
+    except OSError as error:
+        logger.warn(f"The backtest result cache is disabled: {error}")
+        return None
+
+
+class QuoteCache:
+    """
+    On-disk cache of historical quotes, with a Parquet file per (ticker, interval).
+
+    Next to the quotes, the cache records the time ranges it covers, so that a
+    request is served from disk as far as it overlaps them and only the missing
+    ranges have to be downloaded.
+
+    Attributes:
+        directory (Path): The directory of the cache.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        """
+        Initializes a QuoteCache instance.
+
+        Parameters:
+            directory (str | Path): The directory of the cache, created if needed.
+        """
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._lock = Lock()
+
+    def _path(self, ticker: str, interval: str, suffix: str) -> Path:
+        return self.directory.joinpath(f"{quote(ticker, safe='')}_{interval}{suffix}")
+
+    def coverage(self, ticker: str, interval: str) -> list[tuple[pd.Timestamp, ...]]:
+        """
+        Get the time ranges covered by the cache.
+
+        Parameters:
+            ticker (str): The symbol of the financial instrument.
+            interval (str): The time frame of the quotes.
+
+        Returns:
+            (list[tuple[pd.Timestamp, ...]]): The sorted, disjoint [start, end)
+                ranges covered.
+        """
+
+        path = self._path(ticker, interval, ".json")
+        if not path.exists():
+            return []
+
+        return [
+            (pd.Timestamp(start), pd.Timestamp(end))
+            for start, end in json.loads(path.read_text())
+        ]
+
+    def missing(
+        self,
+        ticker: str,
+        interval: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+    ) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Get the parts of a time range not covered by the cache.
+
+        Parameters:
+            ticker (str): The symbol of the financial instrument.
+            interval (str): The time frame of the quotes.
+            start (pd.Timestamp): The start of the range.
+            end (pd.Timestamp): The end of the range (excluded).
+
+        Returns:
+            (list[tuple[pd.Timestamp, pd.Timestamp]]): The [start, end) ranges to
+                download.
+        """
+
+        ranges = []
+        for covered_start, covered_end in self.coverage(ticker, interval):
+            if covered_end <= start or covered_start >= end:
+                continue
+            if covered_start > start:
+                ranges.append((start, covered_start))
+            start = max(start, covered_end)
+
+        if start < end:
+            ranges.append((start, end))
+
+        return ranges
+
+    def read(
+        self,
+        ticker: str,
+        interval: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+    ) -> pd.DataFrame:
+        """
+        Read the cached quotes of a time range.
+
+        Parameters:
+            ticker (str): The symbol of the financial instrument.
+            interval (str): The time frame of the quotes.
+            start (pd.Timestamp): The start of the range.
+            end (pd.Timestamp): The end of the range (excluded).
+
+        Returns:
+            (pd.DataFrame): The quotes indexed by date, empty if none is cached.
+        """
+
+        path = self._path(ticker, interval, ".parquet")
+        if not path.exists():
+            return pd.DataFrame()
+
+        quotes = pd.read_parquet(path)
+
+        return quotes[(quotes.index >= start) & (quotes.index < end)]
+
+    def write(
+        self,
+        ticker: str,
+        interval: str,
+        quotes: pd.DataFrame,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+    ) -> None:
+        """
+        Merge downloaded quotes into the cache and mark their range as covered.
+
+        Empty quotes are ignored, as an empty download cannot be told apart from a
+        failed one: their range is left uncovered, to be downloaded again.
+
+        Parameters:
+            ticker (str): The symbol of the financial instrument.
+            interval (str): The time frame of the quotes.
+            quotes (pd.DataFrame): The quotes indexed by (timezone-naive) date.
+            start (pd.Timestamp): The start of the downloaded range.
+            end (pd.Timestamp): The end of the downloaded range (excluded), not
+                marked as covered if not after the start.
+        """
+
+        if quotes.empty:
+            return
+
+        path = self._path(ticker, interval, ".parquet")
+
+        with self._lock:
+            if path.exists():
+                quotes = pd.concat([pd.read_parquet(path), quotes])
+                quotes = quotes[~quotes.index.duplicated(keep="last")]
+
+            partial = path.with_suffix(f".{os.getpid()}.part")
+            quotes.sort_index().to_parquet(partial)
+            os.replace(partial, path)
+
+            ranges = sorted(
+                [*self.coverage(ticker, interval)]
+                + ([(start, end)] if start < end else [])
+            )
+            if not ranges:
+                return
+
+            merged = [ranges[0]]
+            for range_start, range_end in ranges[1:]:
+                if range_start <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+                else:
+                    merged.append((range_start, range_end))
+
+            self._path(ticker, interval, ".json").write_text(
+                json.dumps(
+                    [
+                        [range_start.isoformat(), range_end.isoformat()]
+                        for range_start, range_end in merged
+                    ]
+                )
+            )
+
+
+@lru_cache
+def get_quote_cache() -> QuoteCache:
+    """
+    Get the process-wide quote cache, located through the
+    `Backtesting.QuoteCacheDirectory` setting.
+
+    Returns:
+        (QuoteCache): The quote cache.
+    """
+
+    return QuoteCache(
+        directory=get_project_path(get_backtesting_settings().QuoteCacheDirectory)
+    )
@@ -0,0 +1,180 @@
+from dataclasses import dataclass, field
+from typing import TypeAlias
+
+import numpy as np
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.schemas import (
+    AvailableTechincalIndicators,
+    ComparisonElement,
+    Elements,
+    Filter,
+    FilterGroup,
+    LogicalOperator,
+    Relation,
+)
+from inkosi.utils.settings import get_technical_indicators_values
+
+RELATIONS: dict[Relation, np.ufunc] = {
+    Relation.GREATER: np.greater,
+    Relation.GREATER_THAN: np.greater_equal,
+    Relation.LESS: np.less,
+    Relation.LESS_THAN: np.less_equal,
+    Relation.EQUAL: np.equal,
+}
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """
+    Node of a filter plan comparing two columns of the plan.
+
+    Attributes:
+        first (int): The position of the first column in `FilterPlan.columns`.
+        second (int): The position of the second column in `FilterPlan.columns`.
+        relation (Relation): The relational operator.
+    """
+
+    first: int
+    second: int
+    relation: Relation
+
+
+@dataclass(frozen=True)
+class Combination:
+    """
+    Node of a filter plan combining the masks of its children.
+
+    Attributes:
+        operator (LogicalOperator): The logical operator.
+        children (tuple[PlanNode, ...]): The combined nodes.
+    """
+
+    operator: LogicalOperator
+    children: tuple["PlanNode", ...]
+
+
+PlanNode: TypeAlias = Comparison | Combination
+
+
+@dataclass
+class FilterPlan:
+    """
+    Data class representing a compiled set of filters.
+
+    Every distinct column (raw column or technical indicator with its period) appears
+    once in `columns`, however many filters refer to it, so that it is computed only
+    once when the plan is evaluated.
+
+    Attributes:
+        columns (list[ComparisonElement]): The distinct columns used by the plan.
+        root (PlanNode | None): The root of the evaluation tree, None if a filter has
+            an unknown relation.
+    """
+
+    columns: list[ComparisonElement] = field(default_factory=list)
+    root: PlanNode | None = None
+
+    def evaluate(self, columns: list[NDArray], length: int) -> NDArray:
+        """
+        Evaluate the plan over the computed columns.
+
+        Parameters:
+            columns (list[NDArray]): The values of `self.columns`, in the same order.
+            length (int): The number of records of the dataset.
+
+        Returns:
+            (NDArray): The sorted positions of the records satisfying the plan.
+        """
+
+        if self.root is None:
+            return np.array([], dtype=np.int64)
+
+        columns = [np.asarray(column) for column in columns]
+
+        return np.flatnonzero(self._mask(self.root, columns, length))
+
+    def _mask(self, node: PlanNode, columns: list[NDArray], length: int) -> NDArray:
+        if isinstance(node, Comparison):
+            return RELATIONS[node.relation](columns[node.first], columns[node.second])
+
+        masks = [self._mask(child, columns, length) for child in node.children]
+
+        match node.operator:
+            case LogicalOperator.OR:
+                if not masks:
+                    return np.zeros(length, dtype=bool)
+                return np.logical_or.reduce(masks)
+            case LogicalOperator.NOT:
+                if not masks:
+                    return np.zeros(length, dtype=bool)
+                return ~np.logical_and.reduce(masks)
+            case _:
+                if not masks:
+                    return np.ones(length, dtype=bool)
+                return np.logical_and.reduce(masks)
+
+
+def _column_key(element: ComparisonElement) -> tuple:
+    column_type = element.get(Elements.ELEMENT)
+    if not AvailableTechincalIndicators.has(column_type):
+        return (column_type,)
+
+    return (
+        column_type,
+        element.get(
+            Elements.PERIOD,
+            get_technical_indicators_values().MovingAveragePeriod,
+        ),
+    )
+
+
+def compile_filters(filters: list[Filter] | FilterGroup) -> FilterPlan:
+    """
+    Compile a list of filters, combined with AND, or a group of filters into a single
+    evaluation plan.
+
+    Parameters:
+        filters (list[Filter] | FilterGroup): The filters to compile.
+
+    Returns:
+        (FilterPlan): The evaluation plan, whose root is None if a filter has an
+            unknown relation.
+    """
+
+    plan = FilterPlan()
+    slots: dict[tuple, int] = {}
+
+    def slot(element: ComparisonElement) -> int:
+        key = _column_key(element)
+        if key not in slots:
+            slots[key] = len(plan.columns)
+            plan.columns.append(element)
+
+        return slots[key]
+
+    def build(item: Filter | FilterGroup) -> PlanNode | None:
+        if isinstance(item, FilterGroup):
+            children = [build(child) for child in item.filters]
+            if any(child is None for child in children):
+                return None
+
+            return Combination(operator=item.operator, children=tuple(children))
+
+        if not Relation.has(item.relation):
+            return None
+
+        return Comparison(
+            first=slot(item.first_element),
+            second=slot(item.second_element),
+            relation=Relation(item.relation),
+        )
+
+    if not isinstance(filters, FilterGroup):
+        filters = FilterGroup(operator=LogicalOperator.AND, filters=list(filters))
+
+    plan.root = build(filters)
+    if plan.root is None:
+        plan.columns = []
+
+    return plan
@@ -0,0 +1,269 @@
+from functools import cached_property
+
+import numpy as np
+from numpy.typing import NDArray
+
+DEFAULT_BLOCK_SIZE: int = 256
+
+
+class BlockSparseTable:
+    """
+    Range-extremum index over a one-dimensional series.
+
+    The series is split in blocks of `block_size` elements and a sparse table is
+    built over the block extrema, so the memory footprint is
+    O(n / block_size * log(n / block_size)) while range and first-passage queries cost
+    O(log n) plus a scan of at most two blocks.
+
+    Attributes:
+        series (NDArray): The indexed series.
+        maximum (bool): True if the table stores maxima, False if it stores minima.
+        block_size (int): The number of elements of each block.
+        n_blocks (int): The number of blocks.
+        levels (list[NDArray]): The sparse table, where `levels[k][j]` is the extremum
+            of the blocks from `j` to `j + 2**k - 1`.
+    """
+
+    def __init__(
+        self,
+        series: NDArray,
+        maximum: bool = True,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ) -> None:
+        """
+        Initializes a BlockSparseTable instance.
+
+        Parameters:
+            series (NDArray): The series to index.
+            maximum (bool, default True): True to index maxima, False to index minima.
+            block_size (int, default 256): The number of elements of each block.
+        """
+
+        self.series = np.asarray(series, dtype=np.float64)
+        self.maximum = maximum
+        self.block_size = max(int(block_size), 1)
+
+        self._function = np.maximum if maximum else np.minimum
+        self._reduce = np.max if maximum else np.min
+        self._neutral = -np.inf if maximum else np.inf
+
+        self.n_blocks = -(-self.series.shape[0] // self.block_size)
+        padded = np.full(self.n_blocks * self.block_size, self._neutral)
+        padded[: self.series.shape[0]] = self.series
+
+        self.levels: list[NDArray] = [
+            self._reduce(padded.reshape(self.n_blocks, self.block_size), axis=1)
+        ]
+        width = 1
+        while 2 * width <= self.n_blocks:
+            previous = self.levels[-1]
+            self.levels.append(self._function(previous[:-width], previous[width:]))
+            width *= 2
+
+    def _reaches(self, values: NDArray, levels: NDArray) -> NDArray:
+        return values >= levels if self.maximum else values <= levels
+
+    def _window(
+        self,
+        starts: NDArray,
+        stops: NDArray,
+    ) -> tuple[NDArray, NDArray]:
+        """
+        Gather the elements in [start, stop) of windows at most one block wide.
+
+        Returns:
+            (tuple[NDArray, NDArray]): The gathered elements and the mask of the ones
+                belonging to each window.
+        """
+
+        indexes = starts[:, None] + np.arange(self.block_size)
+        valid = indexes < stops[:, None]
+        values = self.series[np.minimum(indexes, self.series.shape[0] - 1)]
+
+        return values, valid
+
+    def _blocks(self, first: NDArray, last: NDArray) -> NDArray:
+        """
+        Extremum of the blocks in [first, last), neutral where the range is empty.
+        """
+
+        count = last - first
+        result = np.full(first.shape[0], self._neutral)
+        non_empty = count > 0
+
+        k = np.zeros(first.shape[0], dtype=np.int64)
+        k[non_empty] = np.floor(np.log2(count[non_empty])).astype(np.int64)
+
+        for level in np.unique(k[non_empty]):
+            rows = non_empty & (k == level)
+            table = self.levels[level]
+            result[rows] = self._function(
+                table[first[rows]],
+                table[last[rows] - (1 << level)],
+            )
+
+        return result
+
+    def query(self, starts: NDArray, stops: NDArray) -> NDArray:
+        """
+        Extremum of the series over each range [start, stop).
+
+        Parameters:
+            starts (NDArray): The first index of each range.
+            stops (NDArray): The index following the last one of each range.
+
+        Returns:
+            (NDArray): The extremum of each range, -inf (maxima) or +inf (minima) for
+                empty ranges.
+        """
+
+        starts = np.clip(np.atleast_1d(starts).astype(np.int64), 0, None)
+        stops = np.minimum(
+            np.atleast_1d(stops).astype(np.int64),
+            self.series.shape[0],
+        )
+
+        first_block = -(-starts // self.block_size)
+        last_block = stops // self.block_size
+
+        head_stop = np.minimum(first_block * self.block_size, stops)
+        values, valid = self._window(starts, head_stop)
+        head = self._reduce(np.where(valid, values, self._neutral), axis=1)
+
+        tail_start = np.maximum(last_block * self.block_size, head_stop)
+        values, valid = self._window(tail_start, stops)
+        tail = self._reduce(np.where(valid, values, self._neutral), axis=1)
+
+        return self._function(
+            self._function(head, tail),
+            self._blocks(first_block, np.maximum(last_block, first_block)),
+        )
+
+    def first_reaching(self, starts: NDArray, levels: NDArray) -> NDArray:
+        """
+        First index at or after each start where the series reaches the level, i.e.
+        is greater or equal (maxima) or less or equal (minima) than it.
+
+        Parameters:
+            starts (NDArray): The index from which each search starts.
+            levels (NDArray): The level of each search.
+
+        Returns:
+            (NDArray): The first index reaching each level, -1 if none.
+        """
+
+        starts = np.clip(np.atleast_1d(starts).astype(np.int64), 0, None)
+        levels = np.broadcast_to(
+            np.asarray(levels, dtype=np.float64),
+            starts.shape,
+        )
+
+        result = np.full(starts.shape[0], -1, dtype=np.int64)
+        searching = starts < self.series.shape[0]
+
+        # Remainder of the block containing the starting index
+        block_end = (starts // self.block_size + 1) * self.block_size
+        values, valid = self._window(starts, block_end)
+        hits = self._reaches(values, levels[:, None]) & valid & searching[:, None]
+        found = hits.any(axis=1)
+        result[found] = starts[found] + hits[found].argmax(axis=1)
+
+        # Binary lifting over the sparse table to the first block reaching the level
+        searching &= ~found
+        position = starts // self.block_size + 1
+        for k in range(len(self.levels) - 1, -1, -1):
+            table = self.levels[k]
+            movable = searching & (position < table.shape[0])
+            rows = np.nonzero(movable)[0]
+            skip = ~self._reaches(table[position[rows]], levels[rows])
+            position[rows[skip]] += 1 << k
+
+        searching &= position < self.n_blocks
+        rows = np.nonzero(searching)[0]
+        block_start = position[rows] * self.block_size
+        values, valid = self._window(block_start, block_start + self.block_size)
+        hits = self._reaches(values, levels[rows, None]) & valid
+        found = hits.any(axis=1)
+        result[rows[found]] = block_start[found] + hits[found].argmax(axis=1)
+
+        return result
+
+
+class RangeExtremaIndex:
+    """
+    Range-extrema index over the bid and ask columns of a dataset.
+
+    The sparse tables are built lazily, the first time they are queried, and kept in
+    memory so that they can be reused across backtests on the same dataset.
+
+    Attributes:
+        bid (NDArray): The bid prices.
+        ask (NDArray): The ask prices.
+        block_size (int): The number of elements of each block of the sparse tables.
+    """
+
+    def __init__(
+        self,
+        bid: NDArray,
+        ask: NDArray,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ) -> None:
+        """
+        Initializes a RangeExtremaIndex instance.
+
+        Parameters:
+            bid (NDArray): The bid prices.
+            ask (NDArray): The ask prices.
+            block_size (int, default 256): The number of elements of each block of the
+                sparse tables.
+        """
+
+        self.bid = np.asarray(bid, dtype=np.float64)
+        self.ask = np.asarray(ask, dtype=np.float64)
+        self.block_size = block_size
+
+    @cached_property
+    def bid_max(self) -> BlockSparseTable:
+        return BlockSparseTable(self.bid, maximum=True, block_size=self.block_size)
+
+    @cached_property
+    def bid_min(self) -> BlockSparseTable:
+        return BlockSparseTable(self.bid, maximum=False, block_size=self.block_size)
+
+    @cached_property
+    def ask_max(self) -> BlockSparseTable:
+        return BlockSparseTable(self.ask, maximum=True, block_size=self.block_size)
+
+    @cached_property
+    def ask_min(self) -> BlockSparseTable:
+        return BlockSparseTable(self.ask, maximum=False, block_size=self.block_size)
+
+    def first_bid_above(self, starts: NDArray, levels: NDArray) -> NDArray:
+        """
+        First index at or after each start where the bid is greater or equal than the
+        level, -1 if none.
+        """
+
+        return self.bid_max.first_reaching(starts, levels)
+
+    def first_ask_below(self, starts: NDArray, levels: NDArray) -> NDArray:
+        """
+        First index at or after each start where the ask is less or equal than the
+        level, -1 if none.
+        """
+
+        return self.ask_min.first_reaching(starts, levels)
+
+    def bid_range(self, starts: NDArray, stops: NDArray) -> tuple[NDArray, NDArray]:
+        """
+        Minimum and maximum bid over each range [start, stop).
+        """
+
+        return self.bid_min.query(starts, stops), self.bid_max.query(starts, stops)
+
+    def ask_range(self, starts: NDArray, stops: NDArray) -> tuple[NDArray, NDArray]:
+        """
+        Minimum and maximum ask over each range [start, stop).
+        """
+
+        return self.ask_min.query(starts, stops), self.ask_max.query(starts, stops)
@@ -0,0 +1,345 @@
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.barriers import (
+    barrier_outcomes,
+    closing_prices,
+    first_passage,
+)
+from inkosi.backtest.operation.models import (
+    TICKS_ASK_INDEX,
+    TICKS_BID_INDEX,
+    BacktestRequest,
+    BacktestResult,
+    TradeResult,
+    TradeStatus,
+    encode,
+)
+from inkosi.database.mongodb.schemas import Position
+from inkosi.log.log import Logger
+
+logger = Logger(
+    module_name="incremental",
+    package_name="backtest",
+    database=False,
+)
+
+
+@dataclass
+class BacktestState:
+    """
+    Persistable state of an incremental backtest.
+
+    The state keeps every requested trade, including the ones whose entry point is
+    not in the dataset yet, together with the barriers found so far and the last
+    tick scanned, so that a following run only scans the ticks appended since.
+
+    Attributes:
+        starting_indexes (NDArray): The starting index of each trade.
+        direction (NDArray): The trading direction codes (buy/sell).
+        take_profit (NDArray): The take-profit level of each trade.
+        stop_loss (NDArray): The stop-loss level of each trade.
+        entry_point (NDArray): The entry point of each trade, NaN if the trade is not
+            open yet.
+        upper (NDArray): The index of the first tick hitting the upper barrier, -1 if
+            not hit.
+        lower (NDArray): The index of the first tick hitting the lower barrier, -1 if
+            not hit.
+        price_close (NDArray): The closing price of each trade, NaN if pending.
+        status (NDArray): The status codes (closed/pending).
+        result (NDArray): The result codes (profit/loss/pending).
+        last_index (int): The index of the last tick scanned, -1 if none.
+    """
+
+    starting_indexes: NDArray
+    direction: NDArray
+    take_profit: NDArray
+    stop_loss: NDArray
+    entry_point: NDArray
+    upper: NDArray
+    lower: NDArray
+    price_close: NDArray
+    status: NDArray
+    result: NDArray
+    last_index: int = -1
+
+    @classmethod
+    def empty(cls) -> "BacktestState":
+        """
+        Create a state without trades.
+
+        Returns:
+            (BacktestState): An empty state.
+        """
+
+        return cls(
+            starting_indexes=np.empty(0, dtype=np.int64),
+            direction=np.empty(0, dtype=np.int8),
+            take_profit=np.empty(0, dtype=np.float64),
+            stop_loss=np.empty(0, dtype=np.float64),
+            entry_point=np.empty(0, dtype=np.float64),
+            upper=np.empty(0, dtype=np.int64),
+            lower=np.empty(0, dtype=np.int64),
+            price_close=np.empty(0, dtype=np.float64),
+            status=np.empty(0, dtype=np.int8),
+            result=np.empty(0, dtype=np.int8),
+        )
+
+    def __len__(self) -> int:
+        return self.starting_indexes.shape[0]
+
+    def save(self, path: str | Path) -> Path:
+        """
+        Save the state as a NumPy `.npz` archive.
+
+        Parameters:
+            path (str | Path): The path of the archive.
+
+        Returns:
+            (Path): The path of the archive.
+        """
+
+        path = Path(path)
+        with open(path, "wb") as file:
+            np.savez(
+                file,
+                **{field.name: getattr(self, field.name) for field in fields(self)},
+            )
+
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BacktestState":
+        """
+        Load a state saved by `save`.
+
+        Parameters:
+            path (str | Path): The path of the archive.
+
+        Returns:
+            (BacktestState): The loaded state.
+        """
+
+        with np.load(path) as archive:
+            values = {field.name: archive[field.name] for field in fields(cls)}
+
+        values["last_index"] = int(values["last_index"])
+
+        return cls(**values)
+
+    def to_result(self) -> BacktestResult:
+        """
+        Get the result of the open trades, as returned by `backtest` over the ticks
+        scanned so far: the trades following the first one not open yet are left
+        out.
+
+        Returns:
+            (BacktestResult): The columnar result of the trades.
+        """
+
+        kept = np.arange(len(self))
+        waiting = np.nonzero(self.starting_indexes + 1 > self.last_index)[0]
+        if waiting.size:
+            kept = kept[: waiting[0]]
+        kept = kept[self.direction[kept] >= 0]
+
+        close_indexes, _, _ = barrier_outcomes(
+            self.direction[kept],
+            self.upper[kept],
+            self.lower[kept],
+        )
+
+        return BacktestResult(
+            direction=self.direction[kept],
+            entry_point=self.entry_point[kept],
+            entry_point_index=self.starting_indexes[kept] + 1,
+            take_profit=self.take_profit[kept],
+            stop_loss=self.stop_loss[kept],
+            price_close=self.price_close[kept],
+            price_close_index=close_indexes,
+            status=self.status[kept],
+            result=self.result[kept],
+        )
+
+
+def _is_prefix(state: BacktestState, request: BacktestRequest) -> bool:
+    n_trades = len(state)
+    if len(request.starting_indexes) < n_trades:
+        return False
+
+    return (
+        np.array_equal(
+            np.asarray(request.starting_indexes[:n_trades], dtype=np.int64),
+            state.starting_indexes,
+        )
+        and np.array_equal(
+            encode(request.direction[:n_trades], Position), state.direction
+        )
+        and np.array_equal(
+            np.asarray(request.take_profits[:n_trades], dtype=np.float64),
+            state.take_profit,
+        )
+        and np.array_equal(
+            np.asarray(request.stop_losses[:n_trades], dtype=np.float64),
+            state.stop_loss,
+        )
+    )
+
+
+def incremental_backtest(
+    request: BacktestRequest,
+    state: BacktestState | None = None,
+) -> BacktestState | None:
+    """
+    Backtest a set of trades, resuming from the state of a previous run.
+
+    The trades of the previous run must be the first trades of the request, which
+    can append new ones. Only the ticks appended to the dataset since the previous
+    run are scanned for the trades still pending, while the new trades are scanned
+    from their entry point. The outcomes are the same as the ones of the vectorised
+    `backtest` engine over the whole dataset.
+
+    Parameters:
+        request (BacktestRequest): The trades to backtest and their dataset.
+        state (BacktestState | None): The state of the previous run, None to start
+            from scratch.
+
+    Returns:
+        (BacktestState | None): The updated state or None if the request is not
+            valid.
+    """
+
+    if len(request.direction) != len(request.starting_indexes):
+        logger.error(
+            "The length of the 'Direction' vector is not equal to the 'Starting"
+            " Indexes' vector"
+        )
+        return
+
+    bid: NDArray | None = request.dataset.get_column(TICKS_BID_INDEX)
+    ask: NDArray | None = request.dataset.get_column(TICKS_ASK_INDEX)
+    if bid is None or ask is None:
+        return None
+
+    bid = np.asarray(bid, dtype=np.float64)
+    ask = np.asarray(ask, dtype=np.float64)
+    last_index = bid.shape[0] - 1
+
+    if state is None:
+        state = BacktestState.empty()
+    elif not _is_prefix(state, request):
+        logger.warn(
+            "The trades of the state are not the first trades of the request,"
+            " backtesting from scratch"
+        )
+        state = BacktestState.empty()
+    elif state.last_index > last_index:
+        logger.warn(
+            "The dataset is shorter than the one of the state, backtesting from"
+            " scratch"
+        )
+        state = BacktestState.empty()
+
+    # Append the new trades, not open yet
+    n_previous = len(state)
+    n_new = len(request.starting_indexes) - n_previous
+    pending_code = TradeStatus.list().index(TradeStatus.PENDING)
+    state = BacktestState(
+        starting_indexes=np.concatenate(
+            [
+                state.starting_indexes,
+                np.asarray(request.starting_indexes[n_previous:], dtype=np.int64),
+            ]
+        ),
+        direction=np.concatenate(
+            [state.direction, encode(request.direction[n_previous:], Position)]
+        ),
+        take_profit=np.concatenate(
+            [
+                state.take_profit,
+                np.asarray(request.take_profits[n_previous:], dtype=np.float64),
+            ]
+        ),
+        stop_loss=np.concatenate(
+            [
+                state.stop_loss,
+                np.asarray(request.stop_losses[n_previous:], dtype=np.float64),
+            ]
+        ),
+        entry_point=np.concatenate([state.entry_point, np.full(n_new, np.nan)]),
+        upper=np.concatenate([state.upper, np.full(n_new, -1, dtype=np.int64)]),
+        lower=np.concatenate([state.lower, np.full(n_new, -1, dtype=np.int64)]),
+        price_close=np.concatenate([state.price_close, np.full(n_new, np.nan)]),
+        status=np.concatenate(
+            [state.status, np.full(n_new, pending_code, dtype=np.int8)]
+        ),
+        result=np.concatenate(
+            [
+                state.result,
+                np.full(
+                    n_new,
+                    TradeResult.list().index(TradeResult.PENDING),
+                    dtype=np.int8,
+                ),
+            ]
+        ),
+        last_index=state.last_index,
+    )
+
+    entry_indexes = state.starting_indexes + 1
+    buy = state.direction == Position.list().index(Position.BUY)
+
+    # Open the trades whose entry point has been reached
+    was_open = ~np.isnan(state.entry_point)
+    opening = np.nonzero(
+        ~was_open & (state.direction >= 0) & (entry_indexes <= last_index)
+    )[0]
+    state.entry_point[opening] = np.where(
+        buy[opening],
+        bid[entry_indexes[opening]],
+        ask[entry_indexes[opening]],
+    )
+
+    # Scan the pending trades: the new ticks only for the trades already open, from
+    # their entry point for the trades just opened
+    is_open = ~np.isnan(state.entry_point)
+    active = np.nonzero(is_open & (state.status == pending_code))[0]
+    starts = np.where(
+        was_open[active],
+        np.maximum(entry_indexes[active] + 1, state.last_index + 1),
+        entry_indexes[active] + 1,
+    )
+    upper = first_passage(
+        bid,
+        starts,
+        state.entry_point[active] + state.take_profit[active],
+        above=True,
+    )
+    lower = first_passage(
+        ask,
+        starts,
+        state.entry_point[active] - np.abs(state.stop_loss[active]),
+        above=False,
+    )
+
+    close_indexes, status, trade_results = barrier_outcomes(
+        state.direction[active],
+        upper,
+        lower,
+    )
+    state.upper[active] = upper
+    state.lower[active] = lower
+    state.status[active] = status
+    state.result[active] = trade_results
+    state.price_close[active] = closing_prices(bid, ask, close_indexes, lower)
+    state.last_index = last_index
+
+    logger.info(
+        f"Scanned {active.shape[0]} pending trades, {opening.shape[0]} of them new,"
+        f" up to the tick {last_index}"
+    )
+
+    return state
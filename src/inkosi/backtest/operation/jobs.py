@@ -0,0 +1,384 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from threading import Lock
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+
+from inkosi.backtest.operation.asset import Asset
+from inkosi.backtest.operation.backtest import backtest, filter_dataset
+from inkosi.backtest.operation.models import (
+    TICKS_ASK_INDEX,
+    TICKS_BID_INDEX,
+    BacktestEngine,
+    BacktestRequest,
+    BacktestResult,
+    SourceType,
+)
+from inkosi.backtest.operation.schemas import AvailableRawColumns, Filter
+from inkosi.backtest.operation.sources import Dataset
+from inkosi.database.mongodb.schemas import Position
+from inkosi.log.log import Logger
+from inkosi.utils.settings import get_backtesting_settings, get_project_path
+from inkosi.utils.utils import EnhancedStrEnum
+
+logger = Logger(
+    module_name="jobs",
+    package_name="backtest",
+    database=False,
+)
+
+
+class WorkersUnavailable(Exception):
+    """
+    Raised when a backtest job cannot be handed over to the worker processes, even
+    by a new pool.
+    """
+
+
+class JobStatus(EnhancedStrEnum):
+    """
+    Enumeration class representing the status of a backtest job.
+
+    Attributes:
+        QUEUED (str): The job is waiting for a worker.
+        RUNNING (str): The job is being run by a worker.
+        COMPLETED (str): The job has completed and its result is available.
+        FAILED (str): The job has failed.
+    """
+
+    QUEUED: str = "queued"
+    RUNNING: str = "running"
+    COMPLETED: str = "completed"
+    FAILED: str = "failed"
+
+
+@dataclass
+class BacktestSpec:
+    """
+    Data class representing the specification of a backtest job.
+
+    The data is either the quotes of a ticker or a tick dataset, in which case the
+    filters are evaluated on its bid as close price and on its ask as open price.
+
+    Attributes:
+        take_profit (float): The take-profit level of the trades.
+        stop_loss (float): The stop-loss level of the trades.
+        direction (Position, default "buy"): The trading direction.
+        filters (list[Filter]): The rules selecting the entries.
+        ticker (str | None): The symbol of the financial instrument.
+        time_frame (str, default "1d"): The time frame of the quotes of the ticker.
+        start (date | None): The start date of the data.
+        end (date | None): The end date of the data.
+        source (str | None): The SQL table, file path or tick store directory of the
+            dataset, used if no ticker is specified. Only the tables and the paths
+            accepted by `resolve_source` can be read.
+        source_type (SourceType | None): The type of the dataset source.
+        engine (BacktestEngine, default "vectorized"): The backtest engine.
+    """
+
+    take_profit: float
+    stop_loss: float
+    direction: Position = Position.BUY
+    filters: list[Filter] = field(default_factory=list)
+    ticker: str | None = None
+    time_frame: str = "1d"
+    start: date | None = None
+    end: date | None = None
+    source: str | None = None
+    source_type: SourceType | None = None
+    engine: BacktestEngine = BacktestEngine.VECTORIZED
+
+
+@dataclass
+class BacktestJob:
+    """
+    Data class representing a backtest job.
+
+    Attributes:
+        job_id (str): The identifier of the job.
+        spec (BacktestSpec): The specification of the backtest.
+        status (JobStatus): The status of the job.
+        submitted_at (datetime): The time the job has been submitted at.
+        finished_at (datetime | None): The time the job has completed or failed at.
+        error (str | None): The error message of a failed job.
+        result (BacktestResult | None): The result of a completed job.
+    """
+
+    job_id: str
+    spec: BacktestSpec
+    status: JobStatus = JobStatus.QUEUED
+    submitted_at: datetime = field(default_factory=datetime.now)
+    finished_at: datetime | None = None
+    error: str | None = None
+    result: BacktestResult | None = None
+
+
+def resolve_source(spec: BacktestSpec) -> str:
+    """
+    Resolve the dataset source of a specification, so that a job only reads the
+    datasets made available to it: the SQL tables listed in the
+    `Backtesting.DatasetTables` setting, and the files and tick stores under the
+    `Backtesting.DataDirectory` setting.
+
+    Parameters:
+        spec (BacktestSpec): The specification of the backtest.
+
+    Returns:
+        (str): The SQL table or the absolute path of the dataset.
+
+    Raises:
+        ValueError: If the source is missing or is not an available dataset.
+    """
+
+    if spec.source is None or spec.source_type is None:
+        raise ValueError("Neither a ticker nor a dataset source has been specified")
+
+    settings = get_backtesting_settings()
+
+    match spec.source_type:
+        case SourceType.SQL:
+            if spec.source not in settings.DatasetTables:
+                raise ValueError(f"The table {spec.source} is not an available dataset")
+
+            return spec.source
+        case SourceType.ASSET:
+            raise ValueError("The quotes of an asset are specified through its ticker")
+
+    root = get_project_path(settings.DataDirectory).resolve()
+    path = root.joinpath(spec.source).resolve()
+    if not path.is_relative_to(root):
+        raise ValueError(f"The path {spec.source} is not an available dataset")
+
+    return str(path)
+
+
+def run_backtest_job(spec: BacktestSpec) -> BacktestResult:
+    """
+    Run the backtest of a job specification, in a worker process.
+
+    Parameters:
+        spec (BacktestSpec): The specification of the backtest.
+
+    Returns:
+        (BacktestResult): The columnar result of the backtest.
+
+    Raises:
+        ValueError: If the specification has no data or its data cannot be loaded.
+    """
+
+    if spec.ticker is not None:
+        asset = Asset(
+            asset_name=spec.ticker,
+            time_frame=spec.time_frame,
+            start=spec.start,
+            end=spec.end,
+        )
+        if asset.result is None:
+            raise ValueError(f"Unable to load the ticker {spec.ticker}")
+
+        data_frame = asset.data_frame()
+        dataset = Dataset(asset, source_type=SourceType.ASSET)
+    else:
+        dataset = Dataset(
+            resolve_source(spec),
+            source_type=spec.source_type,
+            start=spec.start,
+            end=spec.end,
+        )
+        data_frame = pd.DataFrame(
+            {
+                AvailableRawColumns.CLOSE_PRICE: dataset.get_column(TICKS_BID_INDEX),
+                AvailableRawColumns.OPEN_PRICE: dataset.get_column(TICKS_ASK_INDEX),
+            }
+        )
+
+    starting_indexes = filter_dataset(data_frame, filters=spec.filters)
+
+    result = backtest(
+        BacktestRequest(
+            starting_indexes=starting_indexes.tolist(),
+            direction=[spec.direction] * starting_indexes.shape[0],
+            take_profits=np.full(starting_indexes.shape[0], spec.take_profit).tolist(),
+            stop_losses=np.full(starting_indexes.shape[0], spec.stop_loss).tolist(),
+            dataset=dataset,
+            engine=spec.engine,
+        )
+    )
+    if result is None:
+        raise ValueError("Unable to backtest the specification")
+
+    return result
+
+
+class BacktestJobs:
+    """
+    Queue of backtest jobs run by a pool of worker processes, so that a backtest
+    never runs in the process serving the requests.
+
+    Submitting a job only hands it over to the pool: the status and the result of
+    the job are updated by the pool when it completes, and kept until the number of
+    finished jobs exceeds the retention. When a worker dies, the pool fails the jobs
+    it holds and is replaced by a new pool.
+
+    Attributes:
+        workers (int): The number of worker processes.
+        max_queued (int): The maximum number of jobs queued or running at once.
+        retention (int): The maximum number of finished jobs kept.
+    """
+
+    def __init__(self, workers: int, max_queued: int, retention: int) -> None:
+        """
+        Initializes a BacktestJobs instance. The worker processes are started on the
+        first submission.
+
+        Parameters:
+            workers (int): The number of worker processes.
+            max_queued (int): The maximum number of jobs queued or running at once.
+            retention (int): The maximum number of finished jobs kept.
+        """
+
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention = retention
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._jobs: OrderedDict[str, BacktestJob] = OrderedDict()
+        self._futures: dict[str, Future] = {}
+        self._lock = Lock()
+
+    def submit(self, spec: BacktestSpec) -> BacktestJob | None:
+        """
+        Submit a backtest job.
+
+        Parameters:
+            spec (BacktestSpec): The specification of the backtest.
+
+        Returns:
+            (BacktestJob | None): The queued job or None if too many jobs are already
+                queued or running.
+
+        Raises:
+            WorkersUnavailable: If the job cannot be handed over to the workers.
+        """
+
+        with self._lock:
+            if len(self._futures) >= self.max_queued:
+                return None
+
+            job = BacktestJob(job_id=uuid4().hex, spec=spec)
+            future = self._submit(spec)
+            executor = self._executor
+            self._jobs[job.job_id] = job
+            self._futures[job.job_id] = future
+
+        # Called by the pool once the job is done, or right away if it already is
+        future.add_done_callback(
+            lambda future: self._finish(job.job_id, future, executor)
+        )
+
+        return job
+
+    def _submit(self, spec: BacktestSpec) -> Future:
+        # A pool is broken for good once one of its workers has died, so it is
+        # replaced once by a new pool
+        for _ in range(2):
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+            try:
+                return self._executor.submit(run_backtest_job, spec)
+            except BrokenProcessPool as error:
+                logger.warn(f"The backtest worker pool is broken: {error}")
+                self._discard(self._executor)
+
+        raise WorkersUnavailable("Unable to start the backtest workers")
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        # The jobs still queued or running on a broken pool are failed by the pool
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(
+        self,
+        job_id: str,
+        future: Future,
+        executor: ProcessPoolExecutor,
+    ) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            self._futures.pop(job_id, None)
+            job.finished_at = datetime.now()
+
+            try:
+                job.result = future.result()
+                job.status = JobStatus.COMPLETED
+            except Exception as error:
+                job.error = str(error)
+                job.status = JobStatus.FAILED
+                logger.error(f"The backtest job {job_id} has failed: {error}")
+
+                if isinstance(error, BrokenProcessPool):
+                    self._discard(executor)
+
+            finished = [
+                key
+                for key, value in self._jobs.items()
+                if value.finished_at is not None
+            ]
+            for key in finished[: max(len(finished) - self.retention, 0)]:
+                del self._jobs[key]
+
+    def get(self, job_id: str) -> BacktestJob | None:
+        """
+        Get a job and its current status.
+
+        Parameters:
+            job_id (str): The identifier of the job.
+
+        Returns:
+            (BacktestJob | None): The job or None if it is unknown or no longer kept.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            future = self._futures.get(job_id)
+            if job is not None and future is not None and future.running():
+                job.status = JobStatus.RUNNING
+
+        return job
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes, cancelling the jobs not started yet.
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+@lru_cache
+def get_backtest_jobs() -> BacktestJobs:
+    """
+    Get the process-wide queue of backtest jobs, sized through the
+    `Backtesting.JobWorkers`, `Backtesting.MaxQueuedJobs` and
+    `Backtesting.JobRetention` settings.
+
+    Returns:
+        (BacktestJobs): The queue of backtest jobs.
+    """
+
+    settings = get_backtesting_settings()
+
+    return BacktestJobs(
+        workers=settings.JobWorkers,
+        max_queued=settings.MaxQueuedJobs,
+        retention=settings.JobRetention,
+    )
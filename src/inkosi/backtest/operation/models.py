@@ -1,6 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields, replace
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterator
+
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
 
 from inkosi.database.mongodb.schemas import Position
 from inkosi.utils.utils import EnhancedStrEnum
@@ -19,6 +23,8 @@ class SourceType(EnhancedStrEnum):
         CSV (str): Represents a CSV data source.
         HDF (str): Represents an HDF data source.
         PARQUET (str): Represents a Parquet data source.
+        ASSET (str): Represents an Asset data source.
+        MEMMAP (str): Represents a memory-mapped columnar tick store.
     """
 
     SQL: str = "sql"
@@ -26,6 +32,7 @@ class SourceType(EnhancedStrEnum):
     HDF: str = "hdf"
     PARQUET: str = "parquet"
     ASSET: str = "asset"
+    MEMMAP: str = "memmap"
 
 
 class TradeResult(EnhancedStrEnum):
@@ -56,6 +63,24 @@ class TradeStatus(EnhancedStrEnum):
     PENDING: str = "pending"
 
 
+class BacktestEngine(EnhancedStrEnum):
+    """
+    Enumeration of backtest engines.
+
+    Attributes:
+        VECTORIZED (str): Resolves the barriers of all the trades in batched NumPy
+            passes.
+        INDEXED (str): Resolves the barriers of all the trades through the
+            range-extrema index of the dataset, built once and reused across
+            backtests.
+        ITERATIVE (str): Resolves the barriers trade by trade through `checker`.
+    """
+
+    VECTORIZED: str = "vectorized"
+    INDEXED: str = "indexed"
+    ITERATIVE: str = "iterative"
+
+
 @dataclass
 class BacktestRecord:
     """
@@ -69,8 +94,8 @@ class BacktestRecord:
         stop_loss (float): The stop-loss level of the trade.
         price_close (float): The closing price of the trade.
         price_close_index (int): The index of the closing price in the dataset.
-        time_opening (datetime): The timestamp when the trade was opened.
-        time_closing (datetime): The timestamp when the trade was closed.
+        time_opening (datetime | None): The timestamp when the trade was opened.
+        time_closing (datetime | None): The timestamp when the trade was closed.
         status (TradeStatus): The status of the trade (closed/pending).
         result (TradeResult): The result of the trade (profit/loss/pending).
     """
@@ -82,12 +107,320 @@ class BacktestRecord:
     stop_loss: float
     price_close: float
     price_close_index: int
-    time_opening: datetime
-    time_closing: datetime
+    time_opening: datetime | None
+    time_closing: datetime | None
     status: TradeStatus
     result: TradeResult
 
 
+def encode(
+    values: NDArray | list,
+    enumeration: type[EnhancedStrEnum],
+) -> NDArray:
+    """
+    Encode enumeration values as their position in `enumeration.list()`.
+
+    Parameters:
+        values (NDArray | list): The values to encode.
+        enumeration (type[EnhancedStrEnum]): The enumeration of the values.
+
+    Returns:
+        (NDArray): The int8 codes of the values, -1 for unknown values.
+    """
+
+    values = np.asarray(values, dtype=object)
+    codes = np.full(values.shape[0], -1, dtype=np.int8)
+
+    for code, member in enumerate(enumeration.list()):
+        codes[values == member] = code
+
+    return codes
+
+
+@dataclass
+class BacktestResult:
+    """
+    Columnar (struct-of-arrays) representation of the trades of a backtest.
+
+    The direction, status and result of each trade are stored as int8 codes, i.e.
+    positions in `Position.list()`, `TradeStatus.list()` and `TradeResult.list()`.
+    Pending trades have a closing index equal to -1 and a NaN closing price. The
+    opening and closing times are only known once mapped through the time index of
+    the dataset (see `with_times`), the closing time of pending trades being NaT.
+
+    Attributes:
+        direction (NDArray): The trading direction codes (buy/sell).
+        entry_point (NDArray): The entry point of each trade.
+        entry_point_index (NDArray): The index of the entry point in the dataset.
+        take_profit (NDArray): The take-profit level of each trade.
+        stop_loss (NDArray): The stop-loss level of each trade.
+        price_close (NDArray): The closing price of each trade.
+        price_close_index (NDArray): The index of the closing price in the dataset.
+        status (NDArray): The status codes (closed/pending).
+        result (NDArray): The result codes (profit/loss/pending).
+        time_opening (NDArray | None): The datetime64 opening time of each trade.
+        time_closing (NDArray | None): The datetime64 closing time of each trade.
+    """
+
+    direction: NDArray
+    entry_point: NDArray
+    entry_point_index: NDArray
+    take_profit: NDArray
+    stop_loss: NDArray
+    price_close: NDArray
+    price_close_index: NDArray
+    status: NDArray
+    result: NDArray
+    time_opening: NDArray | None = None
+    time_closing: NDArray | None = None
+
+    @classmethod
+    def empty(cls) -> "BacktestResult":
+        """
+        Create a result without trades.
+
+        Returns:
+            (BacktestResult): An empty result.
+        """
+
+        return cls.from_records([])
+
+    @classmethod
+    def from_records(cls, records: list[BacktestRecord]) -> "BacktestResult":
+        """
+        Create a result from a list of backtest records.
+
+        Parameters:
+            records (list[BacktestRecord]): The records of the trades.
+
+        Returns:
+            (BacktestResult): The columnar representation of the records.
+        """
+
+        def column(name: str) -> list:
+            return [getattr(record, name) for record in records]
+
+        def optional(name: str, missing: float) -> list:
+            return [missing if value is None else value for value in column(name)]
+
+        return cls(
+            direction=encode(column("direction"), Position),
+            entry_point=np.asarray(column("entry_point"), dtype=np.float64),
+            entry_point_index=np.asarray(column("entry_point_index"), dtype=np.int64),
+            take_profit=np.asarray(column("take_profit"), dtype=np.float64),
+            stop_loss=np.asarray(column("stop_loss"), dtype=np.float64),
+            price_close=np.asarray(optional("price_close", np.nan), dtype=np.float64),
+            price_close_index=np.asarray(
+                optional("price_close_index", -1),
+                dtype=np.int64,
+            ),
+            status=encode(column("status"), TradeStatus),
+            result=encode(column("result"), TradeResult),
+        )
+
+    @classmethod
+    def concatenate(cls, results: list["BacktestResult"]) -> "BacktestResult":
+        """
+        Concatenate several results into a single one.
+
+        Parameters:
+            results (list[BacktestResult]): The results to concatenate.
+
+        Returns:
+            (BacktestResult): The concatenated result.
+        """
+
+        if not results:
+            return cls.empty()
+
+        # The times are kept only if all the results have them
+        columns = {}
+        for field in fields(cls):
+            values = [getattr(result, field.name) for result in results]
+            if all(value is not None for value in values):
+                columns[field.name] = np.concatenate(values)
+
+        return cls(**columns)
+
+    def __len__(self) -> int:
+        return self.entry_point_index.shape[0]
+
+    def __getitem__(self, item: int) -> BacktestRecord:
+        closed = self.price_close_index[item] >= 0
+
+        return BacktestRecord(
+            direction=Position.list()[self.direction[item]],
+            entry_point=float(self.entry_point[item]),
+            entry_point_index=int(self.entry_point_index[item]),
+            take_profit=float(self.take_profit[item]),
+            stop_loss=float(self.stop_loss[item]),
+            price_close=float(self.price_close[item]) if closed else None,
+            price_close_index=int(self.price_close_index[item]) if closed else None,
+            time_opening=self._time(self.time_opening, item),
+            time_closing=self._time(self.time_closing, item),
+            status=TradeStatus.list()[self.status[item]],
+            result=TradeResult.list()[self.result[item]],
+        )
+
+    @staticmethod
+    def _time(times: NDArray | None, item: int) -> datetime | None:
+        if times is None or np.isnat(times[item]):
+            return None
+
+        return pd.Timestamp(times[item]).to_pydatetime()
+
+    def __iter__(self) -> Iterator[BacktestRecord]:
+        for item in range(len(self)):
+            yield self[item]
+
+    def select(self, mask: NDArray) -> "BacktestResult":
+        """
+        Select a subset of the trades.
+
+        Parameters:
+            mask (NDArray): A boolean mask or an array of positions of the trades.
+
+        Returns:
+            (BacktestResult): The selected trades.
+        """
+
+        return BacktestResult(
+            **{
+                field.name: getattr(self, field.name)[mask]
+                for field in fields(self)
+                if getattr(self, field.name) is not None
+            }
+        )
+
+    def with_times(self, time_index: Any) -> "BacktestResult":
+        """
+        Map the entry and closing indexes of the trades to their times.
+
+        Parameters:
+            time_index (TimeIndex): The time index of the dataset of the trades.
+
+        Returns:
+            (BacktestResult): The trades with their opening and closing times.
+        """
+
+        return replace(
+            self,
+            time_opening=time_index.timestamps(self.entry_point_index),
+            time_closing=time_index.timestamps(self.price_close_index),
+        )
+
+    def count_results(self) -> dict[TradeResult, int]:
+        """
+        Count the trades by result.
+
+        Returns:
+            (dict[TradeResult, int]): The number of trades of each result.
+        """
+
+        counts = np.bincount(
+            self.result[self.result >= 0],
+            minlength=len(TradeResult.list()),
+        )
+
+        return dict(zip(TradeResult.list(), counts.tolist()))
+
+    def count_statuses(self) -> dict[TradeStatus, int]:
+        """
+        Count the trades by status.
+
+        Returns:
+            (dict[TradeStatus, int]): The number of trades of each status.
+        """
+
+        counts = np.bincount(
+            self.status[self.status >= 0],
+            minlength=len(TradeStatus.list()),
+        )
+
+        return dict(zip(TradeStatus.list(), counts.tolist()))
+
+    def win_rate(self, include_pending: bool = True) -> float | None:
+        """
+        Compute the ratio of profitable trades.
+
+        Parameters:
+            include_pending (bool, default True): True to compute the ratio over all
+                the trades, False to compute it over the closed trades only.
+
+        Returns:
+            (float | None): The ratio of profitable trades or None if there are no
+                trades to compute it over.
+        """
+
+        counts = self.count_results()
+        trades = counts[TradeResult.PROFIT] + counts[TradeResult.LOSS]
+        if include_pending:
+            trades += counts[TradeResult.PENDING]
+
+        return counts[TradeResult.PROFIT] / trades if trades > 0 else None
+
+    def holding_periods(self) -> NDArray:
+        """
+        Compute the number of records each trade has been held for.
+
+        Returns:
+            (NDArray): The holding period of each trade, -1 for pending trades.
+        """
+
+        return np.where(
+            self.price_close_index >= 0,
+            self.price_close_index - self.entry_point_index,
+            -1,
+        )
+
+    def holding_durations(self) -> NDArray | None:
+        """
+        Compute the time each trade has been held for.
+
+        Returns:
+            (NDArray | None): The timedelta64 holding duration of each trade, NaT for
+                pending trades, or None if the times of the trades are unknown.
+        """
+
+        if self.time_opening is None or self.time_closing is None:
+            return None
+
+        return self.time_closing - self.time_opening
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Convert the result to a pandas DataFrame without copying the numerical
+        columns. Direction, status and result are exposed as categoricals over their
+        codes, and the opening and closing times are included when known.
+
+        Returns:
+            (pd.DataFrame): A DataFrame with a row per trade.
+        """
+
+        def categorical(codes: NDArray, enumeration: type[EnhancedStrEnum]):
+            return pd.Categorical.from_codes(
+                codes,
+                categories=[member.value for member in enumeration.list()],
+            )
+
+        columns = {
+            "direction": categorical(self.direction, Position),
+            "entry_point": self.entry_point,
+            "entry_point_index": self.entry_point_index,
+            "take_profit": self.take_profit,
+            "stop_loss": self.stop_loss,
+            "price_close": self.price_close,
+            "price_close_index": self.price_close_index,
+            "status": categorical(self.status, TradeStatus),
+            "result": categorical(self.result, TradeResult),
+        }
+        if self.time_opening is not None and self.time_closing is not None:
+            columns["time_opening"] = self.time_opening
+            columns["time_closing"] = self.time_closing
+
+        return pd.DataFrame(columns, copy=False)
+
+
 @dataclass
 class BacktestRequest:
     """
@@ -99,6 +432,10 @@ class BacktestRequest:
         take_profits (list[float]): List of take-profit levels for backtesting.
         stop_losses (list[float]): List of stop-loss levels for backtesting.
         dataset (Dataset): The dataset used for backtesting.
+        engine (BacktestEngine, default "vectorized"): The engine used to resolve the
+            take-profit and stop-loss barriers.
+        cache (bool, default True): True to look up and store the result in the
+            on-disk result cache, when the dataset provides a fingerprint.
     """
 
     starting_indexes: list[int]
@@ -106,3 +443,5 @@ class BacktestRequest:
     take_profits: list[float]
     stop_losses: list[float]
     dataset: Any
+    engine: BacktestEngine = BacktestEngine.VECTORIZED
+    cache: bool = True
@@ -0,0 +1,242 @@
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.barriers import (
+    DEFAULT_MAX_ELEMENTS,
+    barrier_outcomes,
+    closing_prices,
+    entry_points,
+    first_passage_paths,
+)
+from inkosi.backtest.operation.models import BacktestResult, TradeResult, TradeStatus
+from inkosi.database.mongodb.schemas import Position
+from inkosi.log.log import Logger
+
+logger = Logger(
+    module_name="montecarlo",
+    package_name="backtest",
+    database=False,
+)
+
+
+@dataclass
+class PathsBacktestResult:
+    """
+    Data class representing the outcomes of a set of trades over a matrix of
+    simulated paths.
+
+    The trade-level arrays have shape (trades,), while the outcome arrays have shape
+    (paths, trades), with the cell (i, j) holding the outcome of the trade j on the
+    path i. The codes follow `BacktestResult`.
+
+    Attributes:
+        direction (NDArray): The trading direction codes (buy/sell).
+        entry_point_index (NDArray): The column of the entry point in the paths.
+        take_profit (NDArray): The take-profit level of each trade.
+        stop_loss (NDArray): The stop-loss level of each trade.
+        entry_point (NDArray): The entry point of each trade on each path.
+        price_close (NDArray): The closing price, NaN if pending.
+        price_close_index (NDArray): The column of the closing price, -1 if pending.
+        status (NDArray): The status codes (closed/pending).
+        result (NDArray): The result codes (profit/loss/pending).
+    """
+
+    direction: NDArray
+    entry_point_index: NDArray
+    take_profit: NDArray
+    stop_loss: NDArray
+    entry_point: NDArray
+    price_close: NDArray
+    price_close_index: NDArray
+    status: NDArray
+    result: NDArray
+
+    def __len__(self) -> int:
+        return self.result.shape[0]
+
+    def path(self, item: int) -> BacktestResult:
+        """
+        Get the trades of a single path.
+
+        Parameters:
+            item (int): The position of the path.
+
+        Returns:
+            (BacktestResult): The columnar result of the trades on the path.
+        """
+
+        return BacktestResult(
+            direction=self.direction,
+            entry_point=self.entry_point[item],
+            entry_point_index=self.entry_point_index,
+            take_profit=self.take_profit,
+            stop_loss=self.stop_loss,
+            price_close=self.price_close[item],
+            price_close_index=self.price_close_index[item],
+            status=self.status[item],
+            result=self.result[item],
+        )
+
+    def result_probabilities(self) -> dict[TradeResult, NDArray]:
+        """
+        Compute the probability of each result of each trade over the paths.
+
+        Returns:
+            (dict[TradeResult, NDArray]): The ratio of paths on which each trade has
+                each result.
+        """
+
+        return {
+            member: (self.result == code).mean(axis=0)
+            for code, member in enumerate(TradeResult.list())
+        }
+
+    def win_rates(self, include_pending: bool = True) -> NDArray:
+        """
+        Compute the distribution of the ratio of profitable trades over the paths.
+
+        Parameters:
+            include_pending (bool, default True): True to compute the ratio over all
+                the trades, False to compute it over the closed trades only.
+
+        Returns:
+            (NDArray): The ratio of profitable trades of each path, NaN if there are
+                no trades to compute it over.
+        """
+
+        profits = (self.result == TradeResult.list().index(TradeResult.PROFIT)).sum(1)
+        trades = (
+            np.full(len(self), self.result.shape[1])
+            if include_pending
+            else (self.status == TradeStatus.list().index(TradeStatus.CLOSED)).sum(1)
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(trades > 0, profits / trades, np.nan)
+
+    def holding_periods(self) -> NDArray:
+        """
+        Compute the number of steps each trade has been held for on each path.
+
+        Returns:
+            (NDArray): The holding periods, -1 for pending trades.
+        """
+
+        return np.where(
+            self.price_close_index >= 0,
+            self.price_close_index - self.entry_point_index[None, :],
+            -1,
+        )
+
+
+def paths_backtest(
+    paths: NDArray,
+    starting_indexes: NDArray | list[int],
+    direction: NDArray | list[Position],
+    take_profits: NDArray | list[float],
+    stop_losses: NDArray | list[float],
+    spread: float = 0.0,
+    max_elements: int = DEFAULT_MAX_ELEMENTS,
+) -> PathsBacktestResult:
+    """
+    Backtest a set of trades over every path of a matrix of simulated paths, e.g. the
+    scenarios of `Asset.sampling`.
+
+    The barrier logic is the one of `backtest`: each trade enters on the step
+    following its starting index, at the bid for a buy and at the ask for a sell,
+    and is closed by the first hit of the take-profit barrier on the bid or of the
+    stop-loss barrier on the ask. The paths are used as bid and, shifted by
+    `spread`, as ask. The first passages are found along axis 1 for all the paths
+    at once.
+
+    The trades are selected as by `entry_points`, and resolved as by the vectorised
+    engines of `backtest` (`resolve_barriers` and `barrier_outcomes`): on a path on
+    which a trade hits neither barrier, the trade is left pending, with a NaN
+    closing price and a closing index of -1, rather than being valued at the last
+    simulated price. Each path thus gives the same result as `backtest` over a
+    dataset holding that path, except that the iterative engine skips such trades.
+
+    Parameters:
+        paths (NDArray): The simulated paths, one per row.
+        starting_indexes (NDArray | list[int]): The starting column of each trade.
+        direction (NDArray | list[Position]): The direction of each trade.
+        take_profits (NDArray | list[float]): The take-profit level of each trade.
+        stop_losses (NDArray | list[float]): The stop-loss level of each trade.
+        spread (float, default 0.0): The difference between the ask and the bid.
+        max_elements (int, default 2**22): The maximum number of elements scanned in a
+            single vectorised step.
+
+    Returns:
+        (PathsBacktestResult): The outcomes of every trade on every path.
+    """
+
+    bid = np.asarray(paths, dtype=np.float64)
+    ask = bid + spread if spread else bid
+    n_paths = bid.shape[0]
+
+    # The selection of the trades only depends on the number of steps and on the
+    # directions, so it is done once on the first path
+    kept, entry_indexes, directions, _ = entry_points(
+        bid[0],
+        ask[0],
+        starting_indexes,
+        direction,
+    )
+    take_profits = np.asarray(take_profits, dtype=np.float64)[kept]
+    stop_losses = np.asarray(stop_losses, dtype=np.float64)[kept]
+
+    shape = (n_paths, kept.shape[0])
+    entry_prices = np.empty(shape)
+    close_indexes = np.empty(shape, dtype=np.int64)
+    close_prices = np.empty(shape)
+    status = np.empty(shape, dtype=np.int8)
+    results = np.empty(shape, dtype=np.int8)
+
+    buy = Position.list().index(Position.BUY)
+    for trade in range(kept.shape[0]):
+        entry = entry_indexes[trade]
+        entry_prices[:, trade] = (
+            bid[:, entry] if directions[trade] == buy else ask[:, entry]
+        )
+
+        upper = first_passage_paths(
+            bid,
+            entry + 1,
+            entry_prices[:, trade] + take_profits[trade],
+            above=True,
+            max_elements=max_elements,
+        )
+        lower = first_passage_paths(
+            ask,
+            entry + 1,
+            entry_prices[:, trade] - np.abs(stop_losses[trade]),
+            above=False,
+            max_elements=max_elements,
+        )
+
+        (
+            close_indexes[:, trade],
+            status[:, trade],
+            results[:, trade],
+        ) = barrier_outcomes(np.full(n_paths, directions[trade]), upper, lower)
+
+        close_prices[:, trade] = closing_prices(
+            bid,
+            ask,
+            close_indexes[:, trade],
+            lower,
+        )
+
+    return PathsBacktestResult(
+        direction=directions,
+        entry_point_index=entry_indexes,
+        take_profit=take_profits,
+        stop_loss=stop_losses,
+        entry_point=entry_prices,
+        price_close=close_prices,
+        price_close_index=close_indexes,
+        status=status,
+        result=results,
+    )
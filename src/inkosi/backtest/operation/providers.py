@@ -0,0 +1,136 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+import yfinance as yf
+
+from inkosi.backtest.operation.schemas import DataSourceType
+
+QUOTE_COLUMNS: list[str] = ["Open", "High", "Low", "Close"]
+
+
+class QuoteProvider(ABC):
+    """
+    Interface of the sources of historical quotes.
+
+    Attributes:
+        cacheable (bool): True if the quotes are worth keeping in the quote cache,
+            i.e. if they come from the network.
+    """
+
+    cacheable: bool = True
+
+    @abstractmethod
+    def history(
+        self,
+        ticker: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        interval: str,
+    ) -> pd.DataFrame:
+        """
+        Get the historical quotes of a financial instrument.
+
+        Parameters:
+            ticker (str): The symbol of the financial instrument.
+            start (pd.Timestamp): The start of the range.
+            end (pd.Timestamp): The end of the range (excluded).
+            interval (str): The time frame of the quotes.
+
+        Returns:
+            (pd.DataFrame): The Open, High, Low and Close columns, indexed by
+                timezone-naive date.
+        """
+
+
+class YahooFinanceProvider(QuoteProvider):
+    """
+    Quotes downloaded through the Yahoo Finance API.
+    """
+
+    def history(
+        self,
+        ticker: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        interval: str,
+    ) -> pd.DataFrame:
+        h_prices = yf.Ticker(ticker).history(
+            start=start.date(),
+            end=end.date(),
+            interval=interval,
+        )
+        if h_prices.index.tz is not None:
+            h_prices.index = h_prices.index.tz_localize(None)
+
+        return h_prices[QUOTE_COLUMNS]
+
+
+class LocalFileProvider(QuoteProvider):
+    """
+    Quotes read from local Parquet or CSV files, named after the ticker and the
+    interval (e.g. `AAPL_1d.parquet`, with the ticker URL-quoted), whose first
+    column is the date.
+
+    Attributes:
+        directory (Path): The directory of the files.
+    """
+
+    cacheable: bool = False
+
+    def __init__(self, directory: str | Path) -> None:
+        """
+        Initializes a LocalFileProvider instance.
+
+        Parameters:
+            directory (str | Path): The directory of the files.
+        """
+
+        self.directory = Path(directory)
+
+    def history(
+        self,
+        ticker: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        interval: str,
+    ) -> pd.DataFrame:
+        name = f"{quote(ticker, safe='')}_{interval}"
+
+        if (path := self.directory.joinpath(f"{name}.parquet")).exists():
+            h_prices = pd.read_parquet(path)
+        elif (path := self.directory.joinpath(f"{name}.csv")).exists():
+            h_prices = pd.read_csv(path, index_col=0, parse_dates=True)
+        else:
+            raise FileNotFoundError(f"No quotes file for {ticker} in {self.directory}")
+
+        h_prices.index = pd.DatetimeIndex(h_prices.index)
+        if h_prices.index.tz is not None:
+            h_prices.index = h_prices.index.tz_localize(None)
+
+        return h_prices.loc[
+            (h_prices.index >= start) & (h_prices.index < end), QUOTE_COLUMNS
+        ].sort_index()
+
+
+def get_provider(source_type: DataSourceType, **kwargs) -> QuoteProvider | None:
+    """
+    Get the quote provider of a data source type.
+
+    Parameters:
+        source_type (DataSourceType): The data source type.
+        **kwargs: The arguments of the provider, e.g. the directory of the local
+            files.
+
+    Returns:
+        (QuoteProvider | None): The provider or None if the type is unknown.
+    """
+
+    match source_type:
+        case DataSourceType.YAHOO_FINANCE:
+            return YahooFinanceProvider()
+        case DataSourceType.LOCAL_FILE:
+            return LocalFileProvider(**kwargs)
+        case _:
+            return None
@@ -1,10 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date
 from typing import Any
 
 import numpy as np
-import yfinance as yf
+import pandas as pd
+from numpy.typing import NDArray
 
+from inkosi.backtest.operation.cache import get_quote_cache
+from inkosi.backtest.operation.providers import (
+    QUOTE_COLUMNS,
+    QuoteProvider,
+    YahooFinanceProvider,
+)
 from inkosi.log.log import Logger
+from inkosi.utils.settings import get_backtesting_settings
+
+# Start of the range of the "max" period
+EARLIEST_QUOTE: pd.Timestamp = pd.Timestamp("1900-01-01")
+
+
+def period_range(
+    period: str,
+    today: pd.Timestamp | None = None,
+) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    Convert a Yahoo Finance period into a date range.
+
+    Parameters:
+        period (str): The period, e.g. "5d", "3mo", "1y", "ytd" or "max".
+        today (pd.Timestamp, optional, default None): The current date, by default
+            the date of today.
+
+    Returns:
+        (tuple[pd.Timestamp, pd.Timestamp]): The start and the end (excluded) of the
+            range, which ends with today.
+    """
+
+    today = (today or pd.Timestamp.today()).normalize()
+    end = today + pd.Timedelta(days=1)
+
+    match period:
+        case "max":
+            return EARLIEST_QUOTE, end
+        case "ytd":
+            return today.replace(month=1, day=1), end
+        case _ if period.endswith("mo"):
+            return today - pd.DateOffset(months=int(period[:-2])), end
+        case _ if period.endswith("y"):
+            return today - pd.DateOffset(years=int(period[:-1])), end
+        case _ if period.endswith("d"):
+            return today - pd.DateOffset(days=int(period[:-1])), end
+        case _:
+            raise ValueError(f"Unknown period: {period}")
+
+
+@dataclass
+class QuoteBatch:
+    """
+    Data class representing the quotes of several financial instruments, aligned on
+    the union of their dates.
+
+    The price arrays have shape (tickers, dates), with NaN where a ticker has no
+    quote at a date.
+
+    Attributes:
+        tickers (list[str]): The symbols of the financial instruments downloaded.
+        dates (NDArray): The sorted dates, as datetime64.
+        open (NDArray): The open prices.
+        high (NDArray): The high prices.
+        low (NDArray): The low prices.
+        close (NDArray): The close prices.
+        failed (list[str]): The symbols whose quotes could not be downloaded.
+    """
+
+    tickers: list[str]
+    dates: NDArray
+    open: NDArray
+    high: NDArray
+    low: NDArray
+    close: NDArray
+    failed: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return self.dates.shape[0]
+
+    def ticker(self, ticker: str) -> dict[str, NDArray]:
+        """
+        Get the quotes of a single financial instrument.
+
+        Parameters:
+            ticker (str): The symbol of the financial instrument.
+
+        Returns:
+            (dict[str, NDArray]): The dates and the prices, NaN where the instrument
+                has no quote.
+        """
+
+        row = self.tickers.index(ticker)
+
+        return {
+            "Dates": self.dates,
+            "Open": self.open[row],
+            "High": self.high[row],
+            "Low": self.low[row],
+            "Close": self.close[row],
+        }
 
 
 class QuoteMetaclass(type):
@@ -20,11 +121,17 @@ class QuoteMetaclass(type):
 class Quote(metaclass=QuoteMetaclass):
     """
     Singleton class for downloading financial instrument quotes using the Yahoo Finance
-    API.
+    API, or another quote provider.
+
+    The quotes are kept in the on-disk quote cache: a request is served from the
+    cache as far as it overlaps the ranges already downloaded, and only the missing
+    ranges are downloaded.
 
     Attributes:
         period (str): The time period for historical data. Default is "1y" (1 year).
         time_frame (str): The time frame for data intervals. Default is "1d" (1 day).
+        offline (bool): True to serve the quotes from the cache only.
+        provider (QuoteProvider): The source of the quotes.
         logger (Logger): Logger instance for logging messages.
         financial_instruments (dict): A dictionary to store downloaded financial
             instrument quotes.
@@ -34,6 +141,8 @@ class Quote(metaclass=QuoteMetaclass):
         self,
         period="1y",
         time_frame="1d",
+        offline: bool | None = None,
+        provider: QuoteProvider | None = None,
     ):
         """
         Initializes a Quote instance.
@@ -43,60 +152,133 @@ class Quote(metaclass=QuoteMetaclass):
                 Default is "1y" (1 year).
             time_frame (str, default "1d"): The time frame for data intervals.
                 Default is "1d" (1 day).
+            offline (bool, optional, default None): True to never download the quotes
+                and serve them from the cache only, by default the `Offline` setting.
+            provider (QuoteProvider, optional, default None): The source of the
+                quotes, by default Yahoo Finance.
         """
 
         self.period = period
         self.time_frame = time_frame
+        self.offline = (
+            get_backtesting_settings().Offline if offline is None else offline
+        )
+        self.provider = provider or YahooFinanceProvider()
 
         self.logger = Logger("Quote", package_name="backtest.operation")
 
         self.financial_instruments = {}
 
+    def _range(
+        self,
+        start: date | None,
+        end: date | None,
+    ) -> tuple[pd.Timestamp, pd.Timestamp]:
+        if start and end:
+            return pd.Timestamp(start), pd.Timestamp(end)
+
+        return period_range(self.period)
+
+    def _history(
+        self,
+        ticker: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+    ) -> pd.DataFrame | None:
+        """
+        Get the quotes of a range, downloading the parts missing from the cache.
+        """
+
+        if not self.provider.cacheable:
+            try:
+                h_prices = self.provider.history(ticker, start, end, self.time_frame)
+            except Exception:
+                self.logger.error("Unable to find the specififed ticker")
+                return
+        else:
+            cache = get_quote_cache()
+            missing = cache.missing(ticker, self.time_frame, start, end)
+
+            if missing and self.offline:
+                self.logger.warn(
+                    f"{len(missing)} ranges of {ticker} are not cached, serving the"
+                    " cached quotes only"
+                )
+            elif missing:
+                today = pd.Timestamp.today().normalize()
+                try:
+                    for missing_start, missing_end in missing:
+                        downloaded = self.provider.history(
+                            ticker,
+                            missing_start,
+                            missing_end,
+                            self.time_frame,
+                        )
+
+                        # An empty result is what an unknown ticker or a network
+                        # failure gives, so it is not cached and is downloaded again
+                        # by the following requests
+                        if downloaded.empty:
+                            self.logger.warn(
+                                f"No quotes downloaded for {ticker} between"
+                                f" {missing_start} and {missing_end}"
+                            )
+                            continue
+
+                        cache.write(
+                            ticker,
+                            self.time_frame,
+                            downloaded,
+                            missing_start,
+                            min(missing_end, today),
+                        )
+                except Exception:
+                    self.logger.error("Unable to find the specififed ticker")
+                    return
+
+            h_prices = cache.read(ticker, self.time_frame, start, end)
+
+        if h_prices.empty:
+            self.logger.error(f"No quotes available for {ticker}")
+            return
+
+        return h_prices
+
     def download_quote(
         self,
         ticker: str,
         start: date | None = None,
         end: date | None = None,
-    ) -> dict[str, list] | None:
+    ) -> dict[str, NDArray] | None:
         """
         Download financial instrument quotes using the Yahoo Finance API.
 
+        Only the parts of the range not covered by the quote cache are downloaded,
+        nothing when offline. Today is never marked as covered, so that its quotes
+        are refreshed by the following requests.
+
         Parameters:
             ticker (str): The symbol of the financial instrument.
             start (date): The start date for historical data. Default is None.
             end (date): The end date for historical data. Default is None.
 
         Returns:
-            (dict[str, list] or None): A dictionary containing financial instrument
-                quotes (Dates, Open, High, Low, Close, Returns) or None if the download
-                fails.
+            (dict[str, NDArray] or None): A dictionary containing financial
+                instrument quotes (Dates as datetime64, Open, High, Low, Close, Returns
+                as float64) or None if the download fails.
         """
 
-        quote = yf.Ticker(ticker)
-
-        try:
-            if start and end:
-                h_prices = quote.history(
-                    start=start,
-                    end=end,
-                    interval=self.time_frame,
-                )
-            else:
-                h_prices = quote.history(
-                    period=self.period,
-                    interval=self.time_frame,
-                )
-        except Exception:
-            self.logger.error("Unable to find the specififed ticker")
+        h_prices = self._history(ticker, *self._range(start, end))
+        if h_prices is None:
             return
 
-        dates = h_prices.index.astype(str).to_numpy()
-        open_prices = h_prices["Open"].to_numpy()
-        high_prices = h_prices["High"].to_numpy()
-        low_prices = h_prices["Low"].to_numpy()
-        close_prices = h_prices["Close"].to_numpy()
+        dates = h_prices.index.to_numpy(dtype="datetime64[ns]")
+        open_prices = h_prices["Open"].to_numpy(dtype=np.float64)
+        high_prices = h_prices["High"].to_numpy(dtype=np.float64)
+        low_prices = h_prices["Low"].to_numpy(dtype=np.float64)
+        close_prices = h_prices["Close"].to_numpy(dtype=np.float64)
 
-        returns = np.array(close_prices) - np.array(open_prices)
+        returns = close_prices - open_prices
 
         return {
             "Dates": dates,
@@ -104,8 +286,71 @@ class Quote(metaclass=QuoteMetaclass):
             "High": high_prices,
             "Low": low_prices,
             "Close": close_prices,
-            "Returns": list(returns),
+            "Returns": returns,
+        }
+
+    def download_quotes(
+        self,
+        tickers: list[str],
+        start: date | None = None,
+        end: date | None = None,
+        workers: int | None = None,
+    ) -> QuoteBatch:
+        """
+        Download the quotes of several financial instruments concurrently, over a
+        bounded thread pool, and align them on the union of their dates.
+
+        Parameters:
+            tickers (list[str]): The symbols of the financial instruments.
+            start (date): The start date for historical data. Default is None.
+            end (date): The end date for historical data. Default is None.
+            workers (int, optional, default None): The maximum number of concurrent
+                downloads, by default the `DownloadWorkers` setting.
+
+        Returns:
+            (QuoteBatch): The aligned quotes of the financial instruments downloaded.
+        """
+
+        start, end = self._range(start, end)
+        workers = min(
+            workers or get_backtesting_settings().DownloadWorkers,
+            max(len(tickers), 1),
+        )
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            frames = list(
+                executor.map(lambda ticker: self._history(ticker, start, end), tickers)
+            )
+
+        downloaded = {
+            ticker: frame for ticker, frame in zip(tickers, frames) if frame is not None
         }
+        failed = [ticker for ticker in tickers if ticker not in downloaded]
+        if failed:
+            self.logger.warn(f"Unable to download the quotes of {', '.join(failed)}")
+
+        dates = pd.DatetimeIndex([])
+        for frame in downloaded.values():
+            dates = dates.union(frame.index)
+
+        prices = {
+            column: np.full((len(downloaded), dates.shape[0]), np.nan)
+            for column in QUOTE_COLUMNS
+        }
+        for row, frame in enumerate(downloaded.values()):
+            positions = dates.get_indexer(frame.index)
+            for column in QUOTE_COLUMNS:
+                prices[column][row, positions] = frame[column].to_numpy()
+
+        return QuoteBatch(
+            tickers=list(downloaded),
+            dates=dates.to_numpy(),
+            open=prices["Open"],
+            high=prices["High"],
+            low=prices["Low"],
+            close=prices["Close"],
+            failed=failed,
+        )
 
     def __repr__(self) -> str:
         """
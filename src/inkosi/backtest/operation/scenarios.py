@@ -0,0 +1,316 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.schemas import SamplingMethods
+
+DEFAULT_CHUNK_SIZE: int = 10_000
+DEFAULT_BINS: int = 4096
+
+# Maximum number of paths returned as they are, i.e. without quantiles
+MAX_PATHS: int = 10_000
+
+# Margin added on both sides of the range of the first chunk when sizing the bins
+# of the quantile histograms, as a fraction of that range
+HISTOGRAM_MARGIN: float = 0.5
+
+
+@dataclass
+class ScenarioResult:
+    """
+    Data class representing a set of simulated scenarios.
+
+    The simulated paths start from the last value of the history, which is stored
+    once, whatever the number of paths.
+
+    Attributes:
+        history (NDArray): The historical values the scenarios start from.
+        mean (NDArray): The mean path, of shape (steps,).
+        paths (NDArray | None): The simulated paths, of shape (samples, steps), None
+            if they have been reduced to quantile bands.
+        quantiles (NDArray | None): The probabilities of the quantile bands.
+        bands (NDArray | None): The quantile bands, of shape (quantiles, steps).
+    """
+
+    history: NDArray
+    mean: NDArray
+    paths: NDArray | None = None
+    quantiles: NDArray | None = None
+    bands: NDArray | None = None
+
+    @property
+    def steps(self) -> int:
+        return self.mean.shape[0]
+
+    def plotting(self) -> tuple[NDArray, NDArray]:
+        """
+        Get data for plotting: the history followed by either the paths or the
+        quantile bands, each continuing the history from its last value.
+
+        Returns:
+            (tuple[NDArray, NDArray]): The x values and a row per line to plot, NaN
+                where a line is not defined.
+        """
+
+        lines = self.bands if self.paths is None else self.paths
+        length = self.history.shape[0] + self.steps - 1
+
+        rows = np.full((lines.shape[0] + 1, length), np.nan)
+        rows[0, : self.history.shape[0]] = self.history
+        rows[1:, self.history.shape[0] - 1 :] = lines
+
+        return np.arange(length), rows
+
+
+def _increments(
+    generator: np.random.Generator,
+    sampling_method: SamplingMethods,
+    shape: tuple[int, int],
+    scale: float,
+) -> NDArray | None:
+    match sampling_method:
+        case SamplingMethods.NORMAL_DISTRIBUTION:
+            return generator.normal(loc=0, scale=scale, size=shape)
+        case SamplingMethods.LAPLACE_DISTRIBUTION:
+            return generator.laplace(loc=0, scale=scale, size=shape)
+        case SamplingMethods.UNIFORM_DISTRIBUTION:
+            return generator.uniform(low=0, high=scale, size=shape)
+        case _:
+            return None
+
+
+def _sample_chunk(
+    seed: np.random.SeedSequence,
+    sampling_method: SamplingMethods,
+    samples: int,
+    steps: int,
+    start: float,
+    scale: float,
+) -> NDArray:
+    """
+    Simulate a chunk of paths with the stream of random numbers of `seed`.
+    """
+
+    paths = np.empty((samples, steps))
+    paths[:, 0] = start
+    paths[:, 1:] = _increments(
+        np.random.default_rng(seed),
+        sampling_method,
+        (samples, steps - 1),
+        scale,
+    )
+    np.cumsum(paths, axis=1, out=paths)
+
+    return paths
+
+
+def _reduce_chunk(
+    seed: np.random.SeedSequence,
+    sampling_method: SamplingMethods,
+    samples: int,
+    steps: int,
+    start: float,
+    scale: float,
+    low: NDArray,
+    width: NDArray,
+    bins: int,
+) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+    """
+    Simulate a chunk of paths and reduce it to a histogram of each step.
+
+    Returns:
+        (tuple[NDArray, NDArray, NDArray, NDArray]): The counts of each bin, of shape
+            (steps, bins), and the sum, the minimum and the maximum of the paths, of
+            shape (steps,). The values outside the bins are counted in the edge
+            bins.
+    """
+
+    paths = _sample_chunk(seed, sampling_method, samples, steps, start, scale)
+
+    positions = np.clip(
+        np.floor((paths - low) / width),
+        0,
+        bins - 1,
+    ).astype(np.int64)
+    positions += np.arange(steps) * bins
+    counts = np.bincount(positions.ravel(), minlength=steps * bins)
+
+    return (
+        counts.reshape(steps, bins),
+        paths.sum(axis=0),
+        paths.min(axis=0),
+        paths.max(axis=0),
+    )
+
+
+def _histogram_quantiles(
+    counts: NDArray,
+    low: NDArray,
+    width: NDArray,
+    quantiles: NDArray,
+) -> NDArray:
+    """
+    Interpolate the quantiles of each step from its histogram.
+    """
+
+    cumulative = np.cumsum(counts, axis=1)
+    targets = quantiles[:, None] * cumulative[:, -1][None, :]
+
+    bands = np.empty((quantiles.shape[0], counts.shape[0]))
+    for step in range(counts.shape[0]):
+        position = np.searchsorted(cumulative[step], targets[:, step], side="left")
+        position = np.minimum(position, counts.shape[1] - 1)
+        before = np.where(position > 0, cumulative[step][position - 1], 0)
+        inside = np.maximum(counts[step][position], 1)
+        fraction = np.clip((targets[:, step] - before) / inside, 0, 1)
+        bands[:, step] = low[step] + (position + fraction) * width[step]
+
+    return bands
+
+
+def simulate(
+    history: NDArray,
+    sampling_method: SamplingMethods,
+    steps_forward: int,
+    samples: int,
+    scale: float,
+    seed: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    quantiles: list[float] | NDArray | None = None,
+    bins: int = DEFAULT_BINS,
+    workers: int | None = 1,
+) -> ScenarioResult | None:
+    """
+    Simulate random walks continuing a historical series.
+
+    The paths are generated in chunks of `chunk_size`, each drawing from its own
+    stream spawned from the `SeedSequence` of `seed`, so that the scenarios only
+    depend on the seed, whatever the number of workers. Without quantiles, all the
+    paths are returned, hence held in memory.
+
+    When quantiles are requested the chunks are reduced on the fly to a histogram
+    of each step, so that the memory footprint is O(steps * bins) whatever the
+    number of samples. The bins are sized on the range of the first chunk extended
+    by `HISTOGRAM_MARGIN` on both sides; if some paths fall outside of it, e.g. in
+    the tails of Laplace increments, the chunks are reduced again over the exact
+    range of all the paths, drawn again from the same streams. The bands are then
+    accurate to a bin, i.e. a fraction `1 / bins` of the range of the histogram of
+    each step, and bounded by the minimum and the maximum of the paths.
+
+    Parameters:
+        history (NDArray): The historical values, the last of which starts the
+            paths.
+        sampling_method (SamplingMethods): The distribution of the increments.
+        steps_forward (int): The number of steps of each path, including its start.
+        samples (int): The number of paths.
+        scale (float): The scale of the normal and Laplace increments, the upper bound
+            of the uniform ones.
+        seed (int, optional, default None): The seed of the scenarios, random if
+            None.
+        chunk_size (int, default 10_000): The number of paths generated at once.
+        quantiles (list[float] | NDArray | None): The probabilities of the quantile
+            bands to reduce the paths to, None to return the paths.
+        bins (int, default 4096): The number of bins of the histogram of each step.
+        workers (int, optional, default 1): The number of worker processes, the
+            number of CPUs if None.
+
+    Returns:
+        (ScenarioResult | None): The scenarios or None if the sampling method is
+            unknown.
+    """
+
+    if not SamplingMethods.has(sampling_method):
+        return None
+
+    history = np.asarray(history, dtype=np.float64)
+    start = float(history[-1])
+
+    sizes = [
+        min(chunk_size, samples - first) for first in range(0, samples, chunk_size)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = min(workers or os.cpu_count() or 1, len(sizes))
+
+    def run(function, *arguments):
+        iterables = [
+            seeds,
+            [sampling_method] * len(sizes),
+            sizes,
+            [steps_forward] * len(sizes),
+            [start] * len(sizes),
+            [scale] * len(sizes),
+            *[[argument] * len(sizes) for argument in arguments],
+        ]
+        if workers == 1:
+            yield from map(function, *iterables)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(function, *iterables)
+
+    if quantiles is None:
+        paths = np.concatenate(list(run(_sample_chunk)))
+
+        return ScenarioResult(history=history, mean=paths.mean(axis=0), paths=paths)
+
+    # The bins of each step are sized on the first chunk
+    pilot = _sample_chunk(
+        seeds[0],
+        sampling_method,
+        sizes[0],
+        steps_forward,
+        start,
+        scale,
+    )
+    low, high = pilot.min(axis=0), pilot.max(axis=0)
+    margin = np.maximum(
+        (high - low) * HISTOGRAM_MARGIN,
+        1e-9 * np.maximum(np.abs(high), 1.0),
+    )
+    low, high = low - margin, high + margin
+
+    def reduce(low: NDArray, high: NDArray) -> tuple[NDArray, ...]:
+        width = (high - low) / bins
+
+        # The partial histograms are accumulated as soon as they are computed
+        counts = np.zeros((steps_forward, bins), dtype=np.int64)
+        total = np.zeros(steps_forward)
+        minimum = np.full(steps_forward, np.inf)
+        maximum = np.full(steps_forward, -np.inf)
+        for chunk_counts, chunk_total, chunk_minimum, chunk_maximum in run(
+            _reduce_chunk, low, width, bins
+        ):
+            counts += chunk_counts
+            total += chunk_total
+            np.minimum(minimum, chunk_minimum, out=minimum)
+            np.maximum(maximum, chunk_maximum, out=maximum)
+
+        return counts, total, minimum, maximum, width
+
+    counts, total, minimum, maximum, width = reduce(low, high)
+
+    # Paths outside the bins: the histograms are rebuilt over the range of all the
+    # paths, which the same streams reproduce exactly
+    if np.any(minimum < low) or np.any(maximum >= high):
+        margin = 1e-9 * np.maximum(np.abs(maximum), 1.0)
+        low, high = np.minimum(low, minimum), np.maximum(high, maximum + margin)
+        counts, total, minimum, maximum, width = reduce(low, high)
+
+    quantiles = np.asarray(quantiles, dtype=np.float64)
+
+    # The edge bins extend beyond the paths, which bound the quantiles
+    bands = np.clip(
+        _histogram_quantiles(counts, low, width, quantiles),
+        minimum,
+        maximum,
+    )
+
+    return ScenarioResult(
+        history=history,
+        mean=total / samples,
+        quantiles=quantiles,
+        bands=bands,
+    )
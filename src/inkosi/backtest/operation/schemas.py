@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TypeAlias
 
 from inkosi.utils.utils import EnhancedStrEnum
@@ -94,6 +94,21 @@ class Relation(EnhancedStrEnum):
     EQUAL: str = "=="
 
 
+class LogicalOperator(EnhancedStrEnum):
+    """
+    Enumeration class representing logical operators combining filters.
+
+    Attributes:
+        AND (str): All the filters must hold.
+        OR (str): At least one of the filters must hold.
+        NOT (str): The filters must not all hold.
+    """
+
+    AND: str = "and"
+    OR: str = "or"
+    NOT: str = "not"
+
+
 class AvailableTechincalIndicators(EnhancedStrEnum):
     """
     Enumeration class representing available technical indicators in a financial
@@ -110,6 +125,19 @@ class AvailableTechincalIndicators(EnhancedStrEnum):
     EMA: str = "EMA"
 
 
+class IndicatorBackend(EnhancedStrEnum):
+    """
+    Enumeration class representing the backends computing the technical indicators.
+
+    Attributes:
+        NUMPY (str): Native NumPy kernels of `inkosi.backtest.indicators`.
+        PANDAS_TA (str): pandas_ta DataFrame extension.
+    """
+
+    NUMPY: str = "numpy"
+    PANDAS_TA: str = "pandas_ta"
+
+
 class TimeFrames(EnhancedStrEnum):
     """
     Enumeration class representing various time frames in a financial context.
@@ -151,9 +179,11 @@ class DataSourceType(EnhancedStrEnum):
 
     Attributes:
         YAHOO_FINANCE (str): Yahoo Finance as a data source.
+        LOCAL_FILE (str): Local Parquet or CSV files as a data source.
     """
 
     YAHOO_FINANCE: str = "Yahoo Finance"
+    LOCAL_FILE: str = "Local File"
 
 
 class SamplingMethods(EnhancedStrEnum):
@@ -186,3 +216,17 @@ class Filter:
     first_element: ComparisonElement
     second_element: ComparisonElement
     relation: Relation | None
+
+
+@dataclass
+class FilterGroup:
+    """
+    Data class representing a logical combination of filters.
+
+    Attributes:
+        operator (LogicalOperator): The logical operator combining the filters.
+        filters (list[Filter | FilterGroup]): The filters or nested groups to combine.
+    """
+
+    operator: LogicalOperator
+    filters: list["Filter | FilterGroup"] = field(default_factory=list)
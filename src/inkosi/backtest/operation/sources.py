@@ -1,37 +1,120 @@
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
 import pandas as pd
 from numpy.typing import NDArray
 
 from inkosi.backtest.operation.asset import Asset
-from inkosi.backtest.operation.models import SourceType
+from inkosi.backtest.operation.bars import Bars, resample_ticks
+from inkosi.backtest.operation.cache import fingerprint
+from inkosi.backtest.operation.extrema import RangeExtremaIndex
+from inkosi.backtest.operation.models import (
+    TICKS_ASK_INDEX,
+    TICKS_BID_INDEX,
+    TICKS_DATETIME_INDEX,
+    SourceType,
+)
+from inkosi.backtest.operation.schemas import TimeFrames
+from inkosi.backtest.operation.store import TickStore
+from inkosi.backtest.operation.timeindex import TimeIndex
 from inkosi.database.postgresql.database import PostgreSQLInstance
+from inkosi.log.log import Logger
+from inkosi.utils.settings import get_postgresql_settings
+
+logger = Logger(
+    module_name="sources",
+    package_name="backtest",
+    database=False,
+)
+
+
+def _bound(value: datetime | str | None, integer: bool) -> pd.Timestamp | int | None:
+    """
+    Convert a time bound to the type of the datetime column it is compared with:
+    nanoseconds since the epoch for integer columns, a Timestamp otherwise.
+    """
+
+    if value is None:
+        return None
+
+    timestamp = pd.Timestamp(value)
+
+    return timestamp.value if integer else timestamp
+
+
+def _stack(columns: list[NDArray]) -> NDArray:
+    """
+    Stack columns into a two-dimensional array without losing precision: as their
+    type if they all share it, as objects otherwise, since e.g. int64 nanoseconds
+    since the epoch (about 1.6e18) do not fit the 53-bit mantissa of a float64.
+    """
+
+    dtypes = {column.dtype for column in columns}
+    dtype = dtypes.pop() if len(dtypes) == 1 else np.dtype(object)
+
+    return np.column_stack([column.astype(dtype, copy=False) for column in columns])
 
 
 class Dataset:
     """
     A class for loading datasets from various sources.
 
+    The dataset is loaded lazily, on the first access to its records. Only the
+    requested columns and the records between the requested time bounds are loaded:
+    the projection and the time range are pushed down to the source (SQL WHERE
+    clause, Parquet filters, HDF `where` clause, slice of a memory-mapped store),
+    except for CSV files, which are filtered once read.
+
+    SQL tables are streamed through a server-side cursor, by batches of
+    `PostgreSQL.BATCH_SIZE` rows copied into preallocated column buffers, while the
+    typed columns of an asset are wrapped without copying.
+
     Parameters:
         source (str or Asset): The data source, which can be a string representing a SQL
-            table, a file path for CSV, HDF, or Parquet,
-            or an Asset object for custom data.
+            table, a file path for CSV, HDF, or Parquet, the directory of a tick
+            store, or an Asset object for custom data.
         source_type (SourceType): The type of the data source.
+        columns (list[str] | None): The columns to load, in the order of the dataset
+            layout (datetime, bid, ask). All the columns are loaded if None.
+        start (datetime | str | None): The first time of the records to load.
+        end (datetime | str | None): The last time of the records to load.
+        time_column (str | None): The datetime column the time bounds refer to. The
+            first loaded column if None.
+        progress (Callable[[int, int], None] | None): Called with the number of
+            records loaded and the total number of records after each batch of a SQL
+            source.
         **kwargs: Additional keyword arguments passed to the specific data loading
-            function.
+            function. For SQL sources, only `schema` and `columns` are supported.
 
     Attributes:
-        postgres_instance (PostgreSQLInstance): An instance of PostgreSQLInstance used
-            for SQL data loading.
+        postgres_instance (PostgreSQLInstance | None): An instance of
+            PostgreSQLInstance used for SQL data loading, created only for SQL
+            sources.
         dataset (pd.DataFrame): The loaded dataset as a Pandas DataFrame.
         np_dataset (NDArray): The dataset converted to a NumPy array.
+        store (TickStore | None): The memory-mapped tick store, for memmap sources.
 
     Methods:
+        load(): Loads the dataset from its source, if not already loaded.
         get_dataset(): Returns the NumPy array representation of the loaded dataset.
+        get_column(index): Returns a column of the loaded dataset.
+        fingerprint(): Returns the content fingerprint of the bid and ask columns.
+        extrema_index(): Returns the range-extrema index over the bid and ask columns.
+        bars(time_frame): Returns the OHLC bars of the ticks for a time frame.
+        time_index(): Returns the sorted time index of the records.
+        rows_between(start, end): Returns the slice of the records between two times.
     """
 
     def __init__(
         self,
         source: str | Asset,
         source_type: SourceType,
+        columns: list[str] | None = None,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+        time_column: str | None = None,
+        progress: Callable[[int, int], None] | None = None,
         **kwargs,
     ) -> None:
         """
@@ -39,51 +122,354 @@ class Dataset:
 
         Parameters:
             source (str | Asset): The data source, which can be a string representing a
-                SQL table, a file path for CSV, HDF, or Parquet, or an Asset object for
-                custom data.
+                SQL table, a file path for CSV, HDF, or Parquet, the directory of a
+                tick store, or an Asset object for custom data.
             source_type (SourceType): The type of the data source.
+            columns (list[str] | None): The columns to load, in the order of the
+                dataset layout. All the columns are loaded if None.
+            start (datetime | str | None): The first time of the records to load.
+            end (datetime | str | None): The last time of the records to load.
+            time_column (str | None): The datetime column the time bounds refer to.
+                The first loaded column if None.
+            progress (Callable[[int, int], None] | None): Called with the number of
+                records loaded and the total number of records after each batch of a
+                SQL source.
             **kwargs: Additional keyword arguments passed to the specific data loading
-                function.
+                function. For SQL sources, only `schema` and `columns` are
+                supported.
         """
 
-        self.postgres_instance = PostgreSQLInstance()
+        self.source = source
+        self.source_type = source_type
+        self.columns = columns
+        self.start = start
+        self.end = end
+        self.time_column = time_column
+        self.progress = progress
+        self.kwargs = kwargs
 
-        if isinstance(source, str) or isinstance(source, Asset):
-            self.dataset: None = None
+        self.postgres_instance: PostgreSQLInstance | None = None
+        self.dataset: pd.DataFrame | None = None
+        self.np_dataset: NDArray | None = None
+        self.store: TickStore | None = None
 
-        match source_type:
+        self._loaded: bool = False
+        self._columns: list[NDArray] | None = None
+        self._store_columns: list[int] = []
+        self._store_rows: slice = slice(None)
+        self._extrema_index: RangeExtremaIndex | None = None
+        self._bars: dict[TimeFrames, Bars] = {}
+        self._time_index: TimeIndex | None = None
+        self._fingerprint: str | None = None
+
+    def load(
+        self,
+    ) -> None:
+        """
+        Loads the dataset from its source, if not already loaded.
+        """
+
+        if self._loaded:
+            return
+
+        match self.source_type:
             case SourceType.SQL:
-                with self.postgres_instance.engine.connect() as conn, conn.begin():
-                    self.dataset: pd.DataFrame = pd.read_sql_table(
-                        table_name=source,
-                        con=conn,
-                        **kwargs,
-                    )
+                self._columns = self._read_sql()
             case SourceType.CSV:
-                self.dataset: pd.DataFrame = pd.read_csv(
-                    filepath_or_buffer=source,
-                    **kwargs,
-                )
+                self.dataset = self._read_csv()
             case SourceType.HDF:
-                self.dataset: pd.DataFrame = pd.read_hdf(
-                    path_or_buf=source,
-                    **kwargs,
-                )
+                self.dataset = self._read_hdf()
             case SourceType.PARQUET:
-                self.dataset: pd.DataFrame = pd.read_parquet(
-                    path=source,
-                    **kwargs,
-                )
+                self.dataset = self._read_parquet()
             case SourceType.ASSET:
-                self.dataset: pd.DataFrame = pd.DataFrame(
-                    {
-                        0: source.dates(),
-                        1: source.close_prices(),
-                        2: source.open_prices(),
-                    }
-                )
+                self._columns = self._read_asset()
+            case SourceType.MEMMAP:
+                self._open_store()
+
+        if self.dataset is not None:
+            self.np_dataset = self.dataset.to_numpy()
+
+        self._loaded = True
+
+    def _read_sql(
+        self,
+    ) -> list[NDArray]:
+        from sqlalchemy import (
+            DateTime,
+            Float,
+            Integer,
+            Numeric,
+            Table,
+            and_,
+            func,
+            select,
+        )
+
+        # Of the arguments of `pd.read_sql_table`, only the table schema and the
+        # columns apply to the query
+        kwargs = dict(self.kwargs)
+        schema: str | None = kwargs.pop("schema", None)
+        columns: list[str] | None = kwargs.pop("columns", None)
+        if self.columns is not None:
+            columns = self.columns
+        if kwargs:
+            logger.warn(
+                f"Ignoring the unsupported arguments of the SQL source {self.source}:"
+                f" {', '.join(kwargs)}"
+            )
+
+        self.postgres_instance = PostgreSQLInstance()
+        batch_size: int = get_postgresql_settings().BATCH_SIZE
+
+        # The count and the select must see the same records, as the records
+        # appended in between would not fit the buffers: PostgreSQL runs both in a
+        # single snapshot, and the select is bounded for the other databases
+        engine = self.postgres_instance.engine
+        if engine.dialect.name == "postgresql":
+            engine = engine.execution_options(isolation_level="REPEATABLE READ")
+
+        with engine.connect() as conn, conn.begin():
+            table = Table(
+                self.source,
+                self.postgres_instance.metadata,
+                autoload_with=conn,
+                extend_existing=True,
+                schema=schema,
+            )
+            selected = (
+                [table.c[column] for column in columns]
+                if columns is not None
+                else list(table.c)
+            )
+            time_column = (
+                table.c[self.time_column]
+                if self.time_column is not None
+                else selected[TICKS_DATETIME_INDEX]
+            )
+            integer = isinstance(time_column.type, Integer)
+
+            conditions = []
+            if self.start is not None:
+                conditions.append(time_column >= _bound(self.start, integer))
+            if self.end is not None:
+                conditions.append(time_column <= _bound(self.end, integer))
+
+            query = select(*selected)
+            if conditions:
+                query = query.where(and_(*conditions))
+
+            # The buffers are allocated once, at their final length
+            length: int = conn.execute(
+                select(func.count()).select_from(query.subquery())
+            ).scalar_one()
+
+            dtypes = []
+            for column in selected:
+                match column.type:
+                    case Integer():
+                        dtypes.append(np.dtype(np.int64))
+                    case Float() | Numeric():
+                        dtypes.append(np.dtype(np.float64))
+                    case DateTime():
+                        dtypes.append(np.dtype("datetime64[ns]"))
+                    case _:
+                        dtypes.append(np.dtype(object))
+            buffers = [np.empty(length, dtype=dtype) for dtype in dtypes]
+
+            # Server-side cursor: the rows are fetched by batches of `batch_size`
+            # and copied into the buffers, without being accumulated
+            result = conn.execution_options(
+                stream_results=True,
+                max_row_buffer=batch_size,
+            ).execute(query.limit(length))
+
+            offset = 0
+            for rows in result.partitions(batch_size):
+                stop = offset + len(rows)
+                for index, values in enumerate(zip(*rows)):
+                    buffers[index][offset:stop] = values
+                offset = stop
+
+                logger.info(f"Loaded {offset}/{length} records of {self.source}")
+                if self.progress is not None:
+                    self.progress(offset, length)
+
+        return [buffer[:offset] for buffer in buffers]
+
+    def _read_csv(
+        self,
+    ) -> pd.DataFrame:
+        data_frame: pd.DataFrame = pd.read_csv(
+            filepath_or_buffer=self.source,
+            usecols=self.columns,
+            **self.kwargs,
+        )
+        if self.columns is not None:
+            data_frame = data_frame[self.columns]
+
+        if self.start is None and self.end is None:
+            return data_frame
+
+        # CSV files cannot be filtered while read
+        time_column = self.time_column or data_frame.columns[TICKS_DATETIME_INDEX]
+        times = data_frame[time_column]
+        integer = pd.api.types.is_integer_dtype(times)
+        if not integer:
+            times = pd.to_datetime(times)
+
+        # Sorted times bound a slice of the records, found by binary search
+        if times.is_monotonic_increasing:
+            first = (
+                times.searchsorted(_bound(self.start, integer), side="left")
+                if self.start is not None
+                else None
+            )
+            last = (
+                times.searchsorted(_bound(self.end, integer), side="right")
+                if self.end is not None
+                else None
+            )
+
+            return data_frame.iloc[first:last].reset_index(drop=True)
+
+        mask = np.ones(len(data_frame), dtype=bool)
+        if self.start is not None:
+            mask &= (times >= _bound(self.start, integer)).to_numpy()
+        if self.end is not None:
+            mask &= (times <= _bound(self.end, integer)).to_numpy()
+
+        return data_frame[mask].reset_index(drop=True)
+
+    def _read_hdf(
+        self,
+    ) -> pd.DataFrame:
+        kwargs = dict(self.kwargs)
+
+        if self.start is not None or self.end is not None:
+            # The time bounds require the table format, with the time column
+            # written as a data column
+            with pd.HDFStore(self.source, mode="r") as store:
+                key = kwargs.get("key") or store.keys()[0]
+                sample: pd.DataFrame = store.select(key, stop=1)
+
+            time_column = self.time_column or (
+                self.columns[TICKS_DATETIME_INDEX]
+                if self.columns is not None
+                else sample.columns[TICKS_DATETIME_INDEX]
+            )
+            integer = pd.api.types.is_integer_dtype(sample[time_column])
+
+            where = []
+            for relation, value in ((">=", self.start), ("<=", self.end)):
+                value = _bound(value, integer)
+                if value is not None:
+                    value = value if integer else f"'{value.isoformat()}'"
+                    where.append(f"{time_column} {relation} {value}")
+
+            kwargs["key"] = key
+            kwargs["where"] = where
+
+        data_frame: pd.DataFrame = pd.read_hdf(
+            path_or_buf=self.source,
+            columns=self.columns,
+            **kwargs,
+        )
+        if self.columns is not None:
+            data_frame = data_frame[self.columns]
+
+        return data_frame.reset_index(drop=True)
+
+    def _read_parquet(
+        self,
+    ) -> pd.DataFrame:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        kwargs = dict(self.kwargs)
+
+        if self.start is not None or self.end is not None:
+            schema: pa.Schema = pq.read_schema(self.source)
+            time_column = self.time_column or (
+                self.columns[TICKS_DATETIME_INDEX]
+                if self.columns is not None
+                else schema.names[TICKS_DATETIME_INDEX]
+            )
+            integer = pa.types.is_integer(schema.field(time_column).type)
+
+            filters = list(kwargs.pop("filters", None) or [])
+            for relation, value in ((">=", self.start), ("<=", self.end)):
+                value = _bound(value, integer)
+                if value is not None:
+                    filters.append((time_column, relation, value))
+
+            kwargs["filters"] = filters
+
+        data_frame: pd.DataFrame = pd.read_parquet(
+            path=self.source,
+            columns=self.columns,
+            **kwargs,
+        )
+
+        return data_frame.reset_index(drop=True)
+
+    def _read_asset(
+        self,
+    ) -> list[NDArray]:
+        # The columns of the asset are wrapped as they are: the dates are sorted, so
+        # that the time range is a slice, i.e. a view, of each of them
+        columns = [
+            self.source.dates(),
+            self.source.close_prices(),
+            self.source.open_prices(),
+        ]
+
+        times = columns[TICKS_DATETIME_INDEX]
+        first = (
+            np.searchsorted(times, _bound(self.start, False).to_datetime64(), "left")
+            if self.start is not None
+            else None
+        )
+        last = (
+            np.searchsorted(times, _bound(self.end, False).to_datetime64(), "right")
+            if self.end is not None
+            else None
+        )
 
-        self.np_dataset: NDArray = self.dataset.to_numpy()
+        return [column[first:last] for column in columns]
+
+    def _open_store(
+        self,
+    ) -> None:
+        self.store = TickStore(directory=self.source)
+
+        names = {
+            column["name"]: int(index)
+            for index, column in self.store.metadata["columns"].items()
+        }
+        self._store_columns = (
+            [names[column] for column in self.columns]
+            if self.columns is not None
+            else sorted(self.store.columns)
+        )
+
+        # The ticks are sorted by time, so that the time range is a slice of the
+        # mapped columns
+        times = self.store.column(
+            names[self.time_column]
+            if self.time_column is not None
+            else TICKS_DATETIME_INDEX
+        )
+        first = (
+            np.searchsorted(times, _bound(self.start, True), side="left")
+            if self.start is not None
+            else None
+        )
+        last = (
+            np.searchsorted(times, _bound(self.end, True), side="right")
+            if self.end is not None
+            else None
+        )
+        self._store_rows = slice(first, last)
 
     def get_dataset(
         self,
@@ -91,9 +477,165 @@ class Dataset:
         """
         Returns the NumPy array representation of the loaded dataset.
 
+        The columns of a memory-mapped store, of a SQL source and of an asset are
+        stacked as objects when their types differ, e.g. int64 times with float64
+        prices, so that the times are kept exactly. The typed columns are returned by
+        `get_column`.
+
         Returns:
             (NDArray | None): The NumPy array representing the dataset or None if the
                 dataset is not loaded.
         """
 
+        self.load()
+
+        if self.np_dataset is None and self.store is not None:
+            self.np_dataset = _stack(
+                [self.get_column(index) for index in range(len(self._store_columns))]
+            )
+
+        if self.np_dataset is None and self._columns is not None:
+            self.np_dataset = _stack(self._columns)
+
         return self.np_dataset
+
+    def get_column(
+        self,
+        index: int,
+    ) -> NDArray | None:
+        """
+        Returns a column of the loaded dataset. The columns of a memory-mapped store,
+        of a SQL source and of an asset are returned without copying.
+
+        Parameters:
+            index (int): The index of the column (e.g. TICKS_BID_INDEX).
+
+        Returns:
+            (NDArray | None): The column or None if the dataset is not loaded.
+        """
+
+        self.load()
+
+        if self.store is not None:
+            return self.store.column(self._store_columns[index])[self._store_rows]
+
+        if self._columns is not None:
+            return self._columns[index]
+
+        if self.np_dataset is None:
+            return None
+
+        return self.np_dataset[:, index]
+
+    def fingerprint(
+        self,
+    ) -> str | None:
+        """
+        Returns the content fingerprint of the bid and ask columns of the dataset,
+        the ones a backtest depends on. The fingerprint is computed on the first call
+        and kept for the following ones.
+
+        Returns:
+            (str | None): The fingerprint or None if the dataset is not loaded.
+        """
+
+        if self._fingerprint is None:
+            bid = self.get_column(TICKS_BID_INDEX)
+            ask = self.get_column(TICKS_ASK_INDEX)
+            if bid is None or ask is None:
+                return None
+
+            self._fingerprint = fingerprint(
+                np.asarray(bid, dtype=np.float64),
+                np.asarray(ask, dtype=np.float64),
+            )
+
+        return self._fingerprint
+
+    def extrema_index(
+        self,
+    ) -> RangeExtremaIndex:
+        """
+        Returns the range-extrema index over the bid and ask columns of the dataset.
+        The index is built on the first call and kept in memory for the following
+        ones.
+
+        Returns:
+            (RangeExtremaIndex): The range-extrema index of the dataset.
+        """
+
+        if self._extrema_index is None:
+            self._extrema_index = RangeExtremaIndex(
+                bid=np.asarray(self.get_column(TICKS_BID_INDEX), dtype=np.float64),
+                ask=np.asarray(self.get_column(TICKS_ASK_INDEX), dtype=np.float64),
+            )
+
+        return self._extrema_index
+
+    def bars(
+        self,
+        time_frame: TimeFrames,
+    ) -> Bars:
+        """
+        Returns the OHLC bars of the ticks of the dataset for a time frame, with the
+        index of the first tick of each bar, so that the rules can be evaluated on
+        the bars while the trades are backtested on the ticks. The bars of a time
+        frame are built on the first call and kept in memory for the following ones.
+
+        Parameters:
+            time_frame (TimeFrames): The time frame of the bars.
+
+        Returns:
+            (Bars): The bars of the dataset.
+        """
+
+        if time_frame not in self._bars:
+            self._bars[time_frame] = resample_ticks(
+                times=self.time_index().times,
+                bid=self.get_column(TICKS_BID_INDEX),
+                ask=self.get_column(TICKS_ASK_INDEX),
+                time_frame=time_frame,
+            )
+
+        return self._bars[time_frame]
+
+    def time_index(
+        self,
+    ) -> TimeIndex:
+        """
+        Returns the sorted time index of the records of the dataset, mapping
+        timestamps to record indexes and back. The index is built on the first call
+        and kept in memory for the following ones.
+
+        Returns:
+            (TimeIndex): The time index of the dataset.
+
+        Raises:
+            ValueError: If the records are not sorted by time.
+        """
+
+        if self._time_index is None:
+            self._time_index = TimeIndex(self.get_column(TICKS_DATETIME_INDEX))
+
+        return self._time_index
+
+    def rows_between(
+        self,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+    ) -> slice:
+        """
+        Returns the slice of the records of the dataset between two times, found by
+        binary search over the time index.
+
+        Parameters:
+            start (datetime | str | None): The first time of the records, unbounded if
+                None.
+            end (datetime | str | None): The last time of the records, unbounded if
+                None.
+
+        Returns:
+            (slice): The slice of the records between the times, both included.
+        """
+
+        return self.time_index().slice(start, end)
@@ -0,0 +1,205 @@
+import json
+import shutil
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.models import (
+    TICKS_ASK_INDEX,
+    TICKS_BID_INDEX,
+    TICKS_DATETIME_INDEX,
+)
+
+STORE_VERSION: int = 1
+METADATA_FILENAME: str = "metadata.json"
+
+STORE_COLUMNS: dict[int, tuple[str, np.dtype]] = {
+    TICKS_DATETIME_INDEX: ("datetime", np.dtype(np.int64)),
+    TICKS_BID_INDEX: ("bid", np.dtype(np.float64)),
+    TICKS_ASK_INDEX: ("ask", np.dtype(np.float64)),
+}
+
+
+def to_nanoseconds(values: NDArray) -> NDArray:
+    """
+    Convert a datetime column to int64 nanoseconds since the epoch (UTC). Integer
+    columns are taken as nanoseconds already and naive datetimes as UTC. Integer and
+    naive datetime64[ns] columns are converted without copying.
+
+    Parameters:
+        values (NDArray): The datetime column.
+
+    Returns:
+        (NDArray): The int64 nanoseconds since the epoch.
+    """
+
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(np.int64, copy=False)
+
+    if values.dtype == np.dtype("datetime64[ns]"):
+        return values.view(np.int64)
+
+    return pd.to_datetime(values, utc=True).asi8
+
+
+def chunk_column(chunk: NDArray | pd.DataFrame, index: int) -> NDArray:
+    """
+    Get a column of a chunk of tick data.
+
+    Parameters:
+        chunk (NDArray | pd.DataFrame): The chunk, either an array in the dataset
+            layout or a DataFrame whose columns are labelled by their position in the
+            dataset layout (see `streaming.read_chunks`).
+        index (int): The position of the column in the dataset layout.
+
+    Returns:
+        (NDArray): The column, with its own type for DataFrame chunks.
+    """
+
+    if isinstance(chunk, pd.DataFrame):
+        return chunk[index].to_numpy()
+
+    return chunk[:, index]
+
+
+def write_tick_store(
+    chunks: Iterator[NDArray | pd.DataFrame] | NDArray | pd.DataFrame,
+    directory: str | Path,
+) -> Path:
+    """
+    Write tick data as a columnar store of one `.npy` file per column (datetime as
+    int64 nanoseconds, bid and ask as float64) plus a JSON metadata header.
+
+    The data can be provided at once or as an iterator of chunks (e.g. from
+    `streaming.read_chunks`), in which case it is never entirely held in memory. The
+    columns of DataFrames, labelled by their position in the dataset layout, are read
+    as they are typed, without going through an array of a common type.
+
+    Parameters:
+        chunks (Iterator[NDArray | pd.DataFrame] | NDArray | pd.DataFrame): The tick
+            data, with the datetime, bid and ask columns in the dataset layout.
+        directory (str | Path): The directory of the store, created if needed.
+
+    Returns:
+        (Path): The directory of the store.
+    """
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    if isinstance(chunks, (np.ndarray, pd.DataFrame)):
+        chunks = iter([chunks])
+
+    parts = {
+        index: directory.joinpath(f"{name}.part")
+        for index, (name, _) in STORE_COLUMNS.items()
+    }
+    length, first, last = 0, None, None
+
+    files = {index: open(path, "wb") for index, path in parts.items()}
+    try:
+        for chunk in chunks:
+            if not chunk.shape[0]:
+                continue
+
+            for index, (_, dtype) in STORE_COLUMNS.items():
+                values = (
+                    to_nanoseconds(chunk_column(chunk, index))
+                    if index == TICKS_DATETIME_INDEX
+                    else np.asarray(chunk_column(chunk, index), dtype=dtype)
+                )
+                files[index].write(np.ascontiguousarray(values, dtype=dtype).data)
+
+                if index == TICKS_DATETIME_INDEX:
+                    first = int(values[0]) if first is None else first
+                    last = int(values[-1])
+
+            length += chunk.shape[0]
+    finally:
+        for file in files.values():
+            file.close()
+
+    for index, (name, dtype) in STORE_COLUMNS.items():
+        with open(directory.joinpath(f"{name}.npy"), "wb") as file:
+            np.lib.format.write_array_header_1_0(
+                file,
+                {"descr": dtype.str, "fortran_order": False, "shape": (length,)},
+            )
+            with open(parts[index], "rb") as part:
+                shutil.copyfileobj(part, file)
+        parts[index].unlink()
+
+    directory.joinpath(METADATA_FILENAME).write_text(
+        json.dumps(
+            {
+                "version": STORE_VERSION,
+                "length": length,
+                "columns": {
+                    str(index): {"name": name, "dtype": dtype.str}
+                    for index, (name, dtype) in STORE_COLUMNS.items()
+                },
+                "start": first,
+                "end": last,
+            },
+            indent=2,
+        )
+    )
+
+    return directory
+
+
+class TickStore:
+    """
+    Read-only, memory-mapped view of a columnar tick store.
+
+    The columns are mapped without copying, so opening a store costs the same
+    whatever its size and several processes reading the same store share the OS page
+    cache.
+
+    Attributes:
+        directory (Path): The directory of the store.
+        metadata (dict): The metadata header of the store.
+        columns (dict[int, NDArray]): The memory-mapped columns, by their index in the
+            dataset layout.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        """
+        Initializes a TickStore instance.
+
+        Parameters:
+            directory (str | Path): The directory of the store.
+        """
+
+        self.directory = Path(directory)
+        self.metadata: dict = json.loads(
+            self.directory.joinpath(METADATA_FILENAME).read_text()
+        )
+
+        self.columns: dict[int, NDArray] = {
+            int(index): np.load(
+                self.directory.joinpath(f"{column['name']}.npy"),
+                mmap_mode="r",
+            )
+            for index, column in self.metadata["columns"].items()
+        }
+
+    def __len__(self) -> int:
+        return self.metadata["length"]
+
+    def column(self, index: int) -> NDArray:
+        """
+        Get a memory-mapped column.
+
+        Parameters:
+            index (int): The index of the column in the dataset layout.
+
+        Returns:
+            (NDArray): The read-only column.
+        """
+
+        return self.columns[index]
@@ -0,0 +1,228 @@
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.barriers import barrier_outcomes, first_passage
+from inkosi.backtest.operation.models import (
+    TICKS_ASK_INDEX,
+    TICKS_BID_INDEX,
+    BacktestResult,
+    SourceType,
+    encode,
+)
+from inkosi.backtest.operation.store import chunk_column
+from inkosi.database.mongodb.schemas import Position
+from inkosi.log.log import Logger
+
+DEFAULT_CHUNK_SIZE: int = 1_000_000
+
+logger = Logger(
+    module_name="streaming",
+    package_name="backtest",
+    database=False,
+)
+
+
+def read_chunks(
+    source: str,
+    source_type: SourceType,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    columns: list[int] | None = None,
+    **kwargs,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a tick file in chunks, without loading it entirely in memory.
+
+    Parquet files are read by record batches following their row groups, HDF files
+    (written in table format) and CSV files by blocks of `chunk_size` rows. Only the
+    requested columns are read, each keeping its own type, so that the prices are
+    never boxed together with the timestamps.
+
+    Parameters:
+        source (str): The path of the file.
+        source_type (SourceType): The type of the file (csv, hdf or parquet).
+        chunk_size (int, default 1_000_000): The maximum number of rows of a chunk.
+        columns (list[int] | None, default None): The positions of the columns to
+            read in the dataset layout, all the columns if None.
+        **kwargs: Additional keyword arguments passed to the reader, such as the `key`
+            of an HDF file.
+
+    Yields:
+        (pd.DataFrame): The columns of each chunk, labelled by their position in the
+            dataset layout.
+    """
+
+    positions = sorted(columns) if columns is not None else None
+
+    match source_type:
+        case SourceType.PARQUET:
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(source)
+            names = parquet_file.schema_arrow.names
+            positions = positions if positions is not None else range(len(names))
+            for batch in parquet_file.iter_batches(
+                batch_size=chunk_size,
+                columns=[names[position] for position in positions],
+                **kwargs,
+            ):
+                yield pd.DataFrame(
+                    {
+                        position: batch.column(column).to_numpy(zero_copy_only=False)
+                        for column, position in enumerate(positions)
+                    },
+                    copy=False,
+                )
+        case SourceType.HDF:
+            with pd.HDFStore(source, mode="r") as store:
+                key = kwargs.pop("key", None) or store.keys()[0]
+                names = store.select(key, stop=0).columns
+                positions = positions if positions is not None else range(len(names))
+                for chunk in store.select(
+                    key,
+                    columns=[names[position] for position in positions],
+                    chunksize=chunk_size,
+                    **kwargs,
+                ):
+                    yield chunk.set_axis(list(positions), axis=1)
+        case SourceType.CSV:
+            with pd.read_csv(
+                source,
+                chunksize=chunk_size,
+                usecols=positions,
+                **kwargs,
+            ) as reader:
+                for chunk in reader:
+                    yield chunk.set_axis(
+                        positions if positions is not None else range(chunk.shape[1]),
+                        axis=1,
+                    )
+        case _:
+            logger.error(
+                f"Streaming is not supported for the source type {source_type}"
+            )
+
+
+def streaming_backtest(
+    chunks: Iterator[NDArray | pd.DataFrame],
+    starting_indexes: NDArray | list[int],
+    direction: NDArray | list[Position],
+    take_profits: NDArray | list[float],
+    stop_losses: NDArray | list[float],
+) -> BacktestResult:
+    """
+    Backtest a set of trades over a dataset streamed in chunks.
+
+    Each trade is opened when the chunk containing its entry point is read and
+    stays open, carried from one chunk to the next, until one of its barriers is hit.
+    Only the current chunk and the state of the open trades are kept in memory, so
+    the memory footprint does not depend on the length of the dataset. The outcomes
+    are the same as the ones of the vectorised `backtest` engine.
+
+    Parameters:
+        chunks (Iterator[NDArray | pd.DataFrame]): The consecutive chunks of the
+            dataset, e.g. from `read_chunks`, of which only the bid and ask columns
+            are read.
+        starting_indexes (NDArray | list[int]): The starting index of each trade in
+            the whole dataset.
+        direction (NDArray | list[Position]): The direction of each trade.
+        take_profits (NDArray | list[float]): The take-profit level of each trade.
+        stop_losses (NDArray | list[float]): The stop-loss level of each trade.
+
+    Returns:
+        (BacktestResult): The columnar result of the trades.
+    """
+
+    entry_indexes = np.asarray(starting_indexes, dtype=np.int64) + 1
+    directions = encode(direction, Position)
+    take_profits = np.asarray(take_profits, dtype=np.float64)
+    stop_losses = np.asarray(stop_losses, dtype=np.float64)
+    buy = directions == Position.list().index(Position.BUY)
+
+    n_trades = entry_indexes.shape[0]
+    entry_prices = np.full(n_trades, np.nan)
+    upper = np.full(n_trades, -1, dtype=np.int64)
+    lower = np.full(n_trades, -1, dtype=np.int64)
+    close_prices = np.full(n_trades, np.nan)
+
+    opened = np.zeros(n_trades, dtype=bool)
+    resolved = np.zeros(n_trades, dtype=bool)
+
+    offset = 0
+    for chunk in chunks:
+        bid = np.asarray(chunk_column(chunk, TICKS_BID_INDEX), dtype=np.float64)
+        ask = np.asarray(chunk_column(chunk, TICKS_ASK_INDEX), dtype=np.float64)
+        stop = offset + chunk.shape[0]
+
+        # Open the trades whose entry point belongs to the chunk
+        opening = np.nonzero(
+            (entry_indexes >= offset) & (entry_indexes < stop) & (directions >= 0)
+        )[0]
+        local = entry_indexes[opening] - offset
+        entry_prices[opening] = np.where(buy[opening], bid[local], ask[local])
+        opened[opening] = True
+
+        # Look for the barriers of the open trades inside the chunk
+        active = np.nonzero(opened & ~resolved)[0]
+        starts = np.maximum(entry_indexes[active] + 1, offset) - offset
+
+        chunk_upper = first_passage(
+            bid,
+            starts,
+            entry_prices[active] + take_profits[active],
+            above=True,
+        )
+        chunk_lower = first_passage(
+            ask,
+            starts,
+            entry_prices[active] - np.abs(stop_losses[active]),
+            above=False,
+        )
+
+        hit = (chunk_upper >= 0) | (chunk_lower >= 0)
+        closing, chunk_upper, chunk_lower = (
+            active[hit],
+            chunk_upper[hit],
+            chunk_lower[hit],
+        )
+        upper[closing] = np.where(chunk_upper >= 0, chunk_upper + offset, -1)
+        lower[closing] = np.where(chunk_lower >= 0, chunk_lower + offset, -1)
+
+        upper_first = (chunk_upper >= 0) & (
+            (chunk_lower < 0) | (chunk_upper < chunk_lower)
+        )
+        close_prices[closing] = np.where(
+            upper_first,
+            bid[np.maximum(chunk_upper, 0)],
+            ask[np.maximum(chunk_lower, 0)],
+        )
+        resolved[closing] = True
+
+        offset = stop
+
+    kept = np.arange(n_trades)
+    exhausted = np.nonzero(entry_indexes > offset - 1)[0]
+    if exhausted.size:
+        logger.critical("Backtest Interrupted... Dataset records exhausted")
+        kept = kept[: exhausted[0]]
+    kept = kept[opened[kept]]
+
+    close_indexes, status, trade_results = barrier_outcomes(
+        directions[kept],
+        upper[kept],
+        lower[kept],
+    )
+
+    return BacktestResult(
+        direction=directions[kept],
+        entry_point=entry_prices[kept],
+        entry_point_index=entry_indexes[kept],
+        take_profit=take_profits[kept],
+        stop_loss=stop_losses[kept],
+        price_close=close_prices[kept],
+        price_close_index=close_indexes,
+        status=status,
+        result=trade_results,
+    )
@@ -0,0 +1,278 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.barriers import barrier_outcomes, entry_points
+from inkosi.backtest.operation.extrema import RangeExtremaIndex
+from inkosi.backtest.operation.models import TradeResult, TradeStatus
+from inkosi.database.mongodb.schemas import Position
+
+DEFAULT_MAX_ELEMENTS: int = 2**22
+DEFAULT_PARALLEL_THRESHOLD: int = 2**24
+
+_worker_index: RangeExtremaIndex | None = None
+
+
+@dataclass
+class SweepResult:
+    """
+    Data class representing the results cube of a take-profit/stop-loss sweep.
+
+    Every array has shape (take profits, stop losses), with the cell (i, j) holding
+    the outcome of the backtest run with `take_profits[i]` and `stop_losses[j]`.
+
+    Attributes:
+        take_profits (NDArray): The take-profit levels of the grid.
+        stop_losses (NDArray): The stop-loss levels of the grid.
+        profits (NDArray): The number of profitable trades.
+        losses (NDArray): The number of losing trades.
+        pending (NDArray): The number of pending trades.
+        holding_time (NDArray): The mean number of records the closed trades have been
+            held for, NaN if no trade has been closed.
+    """
+
+    take_profits: NDArray
+    stop_losses: NDArray
+    profits: NDArray
+    losses: NDArray
+    pending: NDArray
+    holding_time: NDArray
+
+    def win_rate(self, include_pending: bool = True) -> NDArray:
+        """
+        Compute the ratio of profitable trades of each cell of the grid.
+
+        Parameters:
+            include_pending (bool, default True): True to compute the ratio over all
+                the trades, False to compute it over the closed trades only.
+
+        Returns:
+            (NDArray): The ratio of profitable trades, NaN where there are no trades.
+        """
+
+        trades = self.profits + self.losses
+        if include_pending:
+            trades = trades + self.pending
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(trades > 0, self.profits / trades, np.nan)
+
+    def best(self, include_pending: bool = True) -> tuple[float, float]:
+        """
+        Get the take-profit and stop-loss levels with the highest win rate.
+
+        Parameters:
+            include_pending (bool, default True): True to rank the cells by the win
+                rate over all the trades, False over the closed trades only.
+
+        Returns:
+            (tuple[float, float]): The best take-profit and stop-loss levels.
+        """
+
+        win_rate = self.win_rate(include_pending=include_pending)
+        i, j = np.unravel_index(np.nanargmax(win_rate), win_rate.shape)
+
+        return float(self.take_profits[i]), float(self.stop_losses[j])
+
+
+def _initialize_worker(bid: NDArray, ask: NDArray) -> None:
+    global _worker_index
+    _worker_index = RangeExtremaIndex(bid=bid, ask=ask)
+
+
+def sweep_chunk(
+    entry_indexes: NDArray,
+    directions: NDArray,
+    entry_prices: NDArray,
+    take_profits: NDArray,
+    stop_losses: NDArray,
+    index: RangeExtremaIndex | None = None,
+    max_elements: int = DEFAULT_MAX_ELEMENTS,
+    horizon: int | None = None,
+) -> tuple[NDArray, NDArray, NDArray, NDArray, NDArray]:
+    """
+    Sweep the grid over a chunk of entries.
+
+    The first hit of every take-profit level and of every stop-loss level is queried
+    once per entry, then combined over the whole grid, so that each entry costs
+    T + S first-passage queries instead of T * S backtests. The hits at or after
+    `horizon`, if provided, are ignored, as if the dataset ended there.
+
+    Parameters:
+        entry_indexes (NDArray): The entry index of each trade.
+        directions (NDArray): The direction code of each trade.
+        entry_prices (NDArray): The entry price of each trade.
+        take_profits (NDArray): The take-profit levels of the grid.
+        stop_losses (NDArray): The stop-loss levels of the grid.
+        index (RangeExtremaIndex | None, default None): The range-extrema index of
+            the dataset, the one of the worker process if None.
+        max_elements (int, default 2**22): The maximum number of (entry, take
+            profit, stop loss) combinations resolved at once.
+        horizon (int | None, default None): The record the dataset is taken to end
+            at, its last record if None.
+
+    Returns:
+        (tuple[NDArray, NDArray, NDArray, NDArray, NDArray]): The number of profitable,
+            losing, pending and closed trades and the sum of the holding periods of
+            each cell of the grid.
+    """
+
+    index = index if index is not None else _worker_index
+    shape = (take_profits.shape[0], stop_losses.shape[0])
+    n_entries = entry_indexes.shape[0]
+    starting_indexes = entry_indexes + 1
+
+    upper = index.first_bid_above(
+        np.repeat(starting_indexes, shape[0]),
+        (entry_prices[:, None] + take_profits[None, :]).ravel(),
+    ).reshape(n_entries, shape[0])
+    lower = index.first_ask_below(
+        np.repeat(starting_indexes, shape[1]),
+        (entry_prices[:, None] - np.abs(stop_losses)[None, :]).ravel(),
+    ).reshape(n_entries, shape[1])
+
+    if horizon is not None:
+        upper[upper >= horizon] = -1
+        lower[lower >= horizon] = -1
+
+    profits = np.zeros(shape, dtype=np.int64)
+    losses = np.zeros(shape, dtype=np.int64)
+    pending = np.zeros(shape, dtype=np.int64)
+    closed = np.zeros(shape, dtype=np.int64)
+    holding = np.zeros(shape, dtype=np.float64)
+
+    rows = max(max_elements // (shape[0] * shape[1]), 1)
+    for chunk in range(0, n_entries, rows):
+        entries = slice(chunk, chunk + rows)
+        cube = (min(rows, n_entries - chunk), *shape)
+
+        close_index, status, result = barrier_outcomes(
+            np.broadcast_to(directions[entries, None, None], cube).ravel(),
+            np.broadcast_to(upper[entries, :, None], cube).ravel(),
+            np.broadcast_to(lower[entries, None, :], cube).ravel(),
+        )
+        close_index, status, result = (
+            close_index.reshape(cube),
+            status.reshape(cube),
+            result.reshape(cube),
+        )
+
+        profits += (result == TradeResult.list().index(TradeResult.PROFIT)).sum(0)
+        losses += (result == TradeResult.list().index(TradeResult.LOSS)).sum(0)
+        pending += (status == TradeStatus.list().index(TradeStatus.PENDING)).sum(0)
+
+        is_closed = close_index >= 0
+        closed += is_closed.sum(0)
+        holding += np.where(
+            is_closed,
+            close_index - entry_indexes[entries, None, None],
+            0,
+        ).sum(0)
+
+    return profits, losses, pending, closed, holding
+
+
+def sweep(
+    dataset: Any,
+    starting_indexes: NDArray | list[int],
+    direction: Position | list[Position],
+    take_profits: NDArray | list[float],
+    stop_losses: NDArray | list[float],
+    workers: int | None = None,
+    parallel_threshold: int = DEFAULT_PARALLEL_THRESHOLD,
+) -> SweepResult:
+    """
+    Backtest the same entries over a grid of take-profit and stop-loss levels.
+
+    The entries are located once and the first passages through every level are
+    queried on the range-extrema index of the dataset, which is shared by all the
+    cells of the grid. When the number of (entry, take profit, stop loss) combinations
+    exceeds `parallel_threshold`, the entries are split over a process pool.
+
+    Parameters:
+        dataset (Dataset): The dataset used for backtesting.
+        starting_indexes (NDArray | list[int]): The filtered starting indexes.
+        direction (Position | list[Position]): The trading direction, either shared by
+            all the entries or one per entry.
+        take_profits (NDArray | list[float]): The take-profit levels of the grid.
+        stop_losses (NDArray | list[float]): The stop-loss levels of the grid.
+        workers (int, optional, default None): The number of worker processes, by
+            default the number of CPUs.
+        parallel_threshold (int, default 2**24): The number of combinations above
+            which the sweep is run in a process pool.
+
+    Returns:
+        (SweepResult): The results cube of the sweep.
+    """
+
+    take_profits = np.asarray(take_profits, dtype=np.float64)
+    stop_losses = np.asarray(stop_losses, dtype=np.float64)
+
+    if isinstance(direction, str):
+        direction = [direction] * len(starting_indexes)
+
+    index: RangeExtremaIndex = dataset.extrema_index()
+    _, entry_indexes, directions, entry_prices = entry_points(
+        index.bid,
+        index.ask,
+        starting_indexes,
+        direction,
+    )
+
+    combinations = entry_indexes.shape[0] * take_profits.shape[0] * stop_losses.shape[0]
+    workers = workers or os.cpu_count() or 1
+
+    if combinations <= parallel_threshold or workers == 1:
+        partials = [
+            sweep_chunk(
+                entry_indexes,
+                directions,
+                entry_prices,
+                take_profits,
+                stop_losses,
+                index=index,
+            )
+        ]
+    else:
+        chunks = np.array_split(np.arange(entry_indexes.shape[0]), workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialize_worker,
+            initargs=(index.bid, index.ask),
+        ) as executor:
+            partials = list(
+                executor.map(
+                    sweep_chunk,
+                    *zip(
+                        *[
+                            (
+                                entry_indexes[chunk],
+                                directions[chunk],
+                                entry_prices[chunk],
+                                take_profits,
+                                stop_losses,
+                            )
+                            for chunk in chunks
+                            if chunk.size
+                        ]
+                    ),
+                )
+            )
+
+    profits, losses, pending, closed, holding = (sum(x) for x in zip(*partials))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        holding_time = np.where(closed > 0, holding / closed, np.nan)
+
+    return SweepResult(
+        take_profits=take_profits,
+        stop_losses=stop_losses,
+        profits=profits,
+        losses=losses,
+        pending=pending,
+        holding_time=holding_time,
+    )
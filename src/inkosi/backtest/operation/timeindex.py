@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.store import to_nanoseconds
+
+
+class TimeIndex:
+    """
+    Sorted time index of the records of a dataset, mapping timestamps to record
+    indexes and back through binary searches, so that a lookup costs O(log n) and
+    never scans the dataset.
+
+    Attributes:
+        times (NDArray): The int64 nanoseconds since the epoch of the records,
+            sorted.
+    """
+
+    def __init__(self, times: NDArray) -> None:
+        """
+        Initializes a TimeIndex instance.
+
+        Parameters:
+            times (NDArray): The datetime column of the records, as datetime64 or
+                int64 nanoseconds since the epoch (UTC), taken without copying.
+
+        Raises:
+            ValueError: If the records are not sorted by time.
+        """
+
+        self.times = to_nanoseconds(times)
+
+        if np.any(self.times[1:] < self.times[:-1]):
+            raise ValueError("The records are not sorted by time")
+
+    def __len__(self) -> int:
+        return self.times.shape[0]
+
+    def locate(
+        self,
+        timestamps: NDArray | list | datetime | str,
+        side: str = "left",
+    ) -> NDArray:
+        """
+        Map timestamps to record indexes.
+
+        Parameters:
+            timestamps (NDArray | list | datetime | str): The timestamps, naive ones
+                being taken as UTC.
+            side (str, default "left"): "left" for the index of the first record at or
+                after each timestamp, "right" for the index following the last record
+                at or before it.
+
+        Returns:
+            (NDArray): The int64 index of each timestamp, from 0 to the number of
+                records.
+        """
+
+        return np.searchsorted(
+            self.times,
+            to_nanoseconds(np.atleast_1d(np.asarray(timestamps))),
+            side=side,
+        ).astype(np.int64, copy=False)
+
+    def timestamps(self, indexes: NDArray | list[int]) -> NDArray:
+        """
+        Map record indexes to timestamps.
+
+        Parameters:
+            indexes (NDArray | list[int]): The indexes of the records, -1 for none.
+
+        Returns:
+            (NDArray): The datetime64 (UTC) of each record, NaT for the indexes
+                outside the dataset.
+        """
+
+        indexes = np.asarray(indexes, dtype=np.int64)
+        valid = (indexes >= 0) & (indexes < self.times.shape[0])
+
+        timestamps = np.full(
+            indexes.shape, np.datetime64("NaT"), dtype="datetime64[ns]"
+        )
+        timestamps[valid] = self.times[indexes[valid]].view("datetime64[ns]")
+
+        return timestamps
+
+    def slice(
+        self,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+    ) -> slice:
+        """
+        Get the records between two times.
+
+        Parameters:
+            start (datetime | str | None): The first time of the records, unbounded if
+                None.
+            end (datetime | str | None): The last time of the records, unbounded if
+                None.
+
+        Returns:
+            (slice): The slice of the records between the times, both included.
+        """
+
+        first = (
+            int(np.searchsorted(self.times, pd.Timestamp(start).value, side="left"))
+            if start is not None
+            else None
+        )
+        last = (
+            int(np.searchsorted(self.times, pd.Timestamp(end).value, side="right"))
+            if end is not None
+            else None
+        )
+
+        return slice(first, last)
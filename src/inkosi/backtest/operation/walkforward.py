@@ -0,0 +1,375 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
+
+from inkosi.backtest.operation.backtest import filter_dataset, with_times
+from inkosi.backtest.operation.barriers import (
+    barrier_outcomes,
+    closing_prices,
+    entry_points,
+)
+from inkosi.backtest.operation.extrema import RangeExtremaIndex
+from inkosi.backtest.operation.models import BacktestResult
+from inkosi.backtest.operation.schemas import Filter, FilterGroup
+from inkosi.backtest.operation.sweep import sweep_chunk
+from inkosi.database.mongodb.schemas import Position
+from inkosi.log.log import Logger
+
+logger = Logger(
+    module_name="walkforward",
+    package_name="backtest",
+    database=False,
+)
+
+_worker_index: RangeExtremaIndex | None = None
+_worker_arguments: dict[str, Any] = {}
+
+
+@dataclass
+class WalkForwardWindow:
+    """
+    Data class representing a window of a walk-forward analysis.
+
+    Attributes:
+        in_sample_start (int): The first record of the in-sample period.
+        in_sample_stop (int): The record following the in-sample period, which is the
+            first record of the out-of-sample period.
+        out_of_sample_stop (int): The record following the out-of-sample period.
+        candidate (int | None): The position of the best candidate filters, None if no
+            candidate has produced trades in the in-sample period.
+        take_profit (float | None): The best take-profit level.
+        stop_loss (float | None): The best stop-loss level.
+        in_sample_win_rate (float | None): The win rate of the best parameters in the
+            in-sample period.
+        result (BacktestResult): The out-of-sample trades of the best parameters.
+    """
+
+    in_sample_start: int
+    in_sample_stop: int
+    out_of_sample_stop: int
+    candidate: int | None = None
+    take_profit: float | None = None
+    stop_loss: float | None = None
+    in_sample_win_rate: float | None = None
+    result: BacktestResult = field(default_factory=BacktestResult.empty)
+
+
+@dataclass
+class WalkForwardResult:
+    """
+    Data class representing the result of a walk-forward analysis.
+
+    Attributes:
+        windows (list[WalkForwardWindow]): The windows of the analysis, in
+            chronological order.
+    """
+
+    windows: list[WalkForwardWindow] = field(default_factory=list)
+
+    def stitched(self) -> BacktestResult:
+        """
+        Stitch the out-of-sample trades of all the windows together.
+
+        Returns:
+            (BacktestResult): The out-of-sample trades, in chronological order.
+        """
+
+        return BacktestResult.concatenate([window.result for window in self.windows])
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Summarise the windows in a pandas DataFrame.
+
+        Returns:
+            (pd.DataFrame): A DataFrame with a row per window.
+        """
+
+        return pd.DataFrame(
+            [
+                {
+                    "in_sample_start": window.in_sample_start,
+                    "in_sample_stop": window.in_sample_stop,
+                    "out_of_sample_stop": window.out_of_sample_stop,
+                    "candidate": window.candidate,
+                    "take_profit": window.take_profit,
+                    "stop_loss": window.stop_loss,
+                    "in_sample_win_rate": window.in_sample_win_rate,
+                    "out_of_sample_trades": len(window.result),
+                    "out_of_sample_win_rate": window.result.win_rate(),
+                }
+                for window in self.windows
+            ]
+        )
+
+
+def walk_forward_windows(
+    length: int,
+    in_sample: int,
+    out_of_sample: int,
+    step: int | None = None,
+    anchored: bool = False,
+) -> list[tuple[int, int, int]]:
+    """
+    Split a dataset into consecutive in-sample and out-of-sample periods.
+
+    Parameters:
+        length (int): The number of records of the dataset.
+        in_sample (int): The number of records of the (first) in-sample period.
+        out_of_sample (int): The number of records of each out-of-sample period.
+        step (int, optional, default None): The number of records the windows are
+            rolled by, by default `out_of_sample` so that the out-of-sample periods
+            do not overlap.
+        anchored (bool, default False): True to start all the in-sample periods at
+            the first record, False to roll them.
+
+    Returns:
+        (list[tuple[int, int, int]]): The first in-sample record, the first
+            out-of-sample record and the record following the out-of-sample period
+            of each window.
+    """
+
+    step = step or out_of_sample
+    windows = []
+
+    start, stop = 0, in_sample
+    while stop < length:
+        windows.append(
+            (0 if anchored else start, stop, min(stop + out_of_sample, length))
+        )
+        start, stop = start + step, stop + step
+
+    return windows
+
+
+def _initialize_worker(bid: NDArray, ask: NDArray, arguments: dict[str, Any]) -> None:
+    global _worker_index, _worker_arguments
+    _worker_index = RangeExtremaIndex(bid=bid, ask=ask)
+    _worker_arguments = arguments
+
+
+def _window_backtest(
+    index: RangeExtremaIndex,
+    starting_indexes: NDArray,
+    direction: Position,
+    take_profit: float,
+    stop_loss: float,
+    horizon: int,
+) -> BacktestResult:
+    """
+    Backtest the trades of a window as if the dataset ended at `horizon`.
+    """
+
+    _, entry_indexes, directions, entry_prices = entry_points(
+        index.bid[:horizon],
+        index.ask[:horizon],
+        starting_indexes,
+        [direction] * starting_indexes.shape[0],
+    )
+    take_profits = np.full(entry_indexes.shape[0], take_profit)
+    stop_losses = np.full(entry_indexes.shape[0], stop_loss)
+
+    upper = index.first_bid_above(entry_indexes + 1, entry_prices + take_profits)
+    lower = index.first_ask_below(entry_indexes + 1, entry_prices - np.abs(stop_losses))
+    upper[upper >= horizon] = -1
+    lower[lower >= horizon] = -1
+
+    close_indexes, status, trade_results = barrier_outcomes(directions, upper, lower)
+    close_prices = closing_prices(index.bid, index.ask, close_indexes, lower)
+
+    return BacktestResult(
+        direction=directions,
+        entry_point=entry_prices,
+        entry_point_index=entry_indexes,
+        take_profit=take_profits,
+        stop_loss=stop_losses,
+        price_close=close_prices,
+        price_close_index=close_indexes,
+        status=status,
+        result=trade_results,
+    )
+
+
+def _optimize_window(
+    window: tuple[int, int, int],
+    candidates: list[NDArray],
+    direction: Position,
+    take_profits: NDArray,
+    stop_losses: NDArray,
+    include_pending: bool = True,
+    index: RangeExtremaIndex | None = None,
+) -> WalkForwardWindow:
+    """
+    Select the best candidate and take-profit/stop-loss levels over the in-sample
+    period of a window and backtest them over its out-of-sample period.
+    """
+
+    index = index if index is not None else _worker_index
+    in_sample_start, in_sample_stop, out_of_sample_stop = window
+    result = WalkForwardWindow(
+        in_sample_start=in_sample_start,
+        in_sample_stop=in_sample_stop,
+        out_of_sample_stop=out_of_sample_stop,
+    )
+
+    best = -np.inf
+    for candidate, positions in enumerate(candidates):
+        # Entries are taken on the record following the filtered one
+        starting_indexes = positions[
+            (positions >= in_sample_start) & (positions + 1 < in_sample_stop)
+        ]
+        if not starting_indexes.size:
+            continue
+
+        _, entry_indexes, directions, entry_prices = entry_points(
+            index.bid[:in_sample_stop],
+            index.ask[:in_sample_stop],
+            starting_indexes,
+            [direction] * starting_indexes.shape[0],
+        )
+        profits, losses, pending, _, _ = sweep_chunk(
+            entry_indexes,
+            directions,
+            entry_prices,
+            take_profits,
+            stop_losses,
+            index=index,
+            horizon=in_sample_stop,
+        )
+
+        trades = profits + losses + (pending if include_pending else 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            win_rate = np.where(trades > 0, profits / trades, np.nan)
+        if np.all(np.isnan(win_rate)):
+            continue
+
+        i, j = np.unravel_index(np.nanargmax(win_rate), win_rate.shape)
+        if win_rate[i, j] > best:
+            best = win_rate[i, j]
+            result.candidate = candidate
+            result.take_profit = float(take_profits[i])
+            result.stop_loss = float(stop_losses[j])
+            result.in_sample_win_rate = float(win_rate[i, j])
+
+    if result.candidate is None:
+        return result
+
+    positions = candidates[result.candidate]
+    result.result = _window_backtest(
+        index,
+        positions[(positions >= in_sample_stop) & (positions + 1 < out_of_sample_stop)],
+        direction,
+        result.take_profit,
+        result.stop_loss,
+        horizon=out_of_sample_stop,
+    )
+
+    return result
+
+
+def _optimize_worker_window(window: tuple[int, int, int]) -> WalkForwardWindow:
+    return _optimize_window(window, **_worker_arguments)
+
+
+def walk_forward(
+    data_frame: pd.DataFrame,
+    dataset: Any,
+    candidates: list[list[Filter] | FilterGroup],
+    direction: Position,
+    take_profits: NDArray | list[float],
+    stop_losses: NDArray | list[float],
+    in_sample: int,
+    out_of_sample: int,
+    step: int | None = None,
+    anchored: bool = False,
+    include_pending: bool = True,
+    workers: int | None = None,
+) -> WalkForwardResult:
+    """
+    Run a walk-forward analysis of a set of candidate rules.
+
+    In every window, the candidate filters (e.g. the same rule with different
+    indicator periods) and the take-profit/stop-loss levels with the highest win
+    rate over the in-sample period are selected, then backtested over the following
+    out-of-sample period. The trades of a period are evaluated as if the dataset
+    ended with the period, so that no window looks ahead.
+
+    The filters are evaluated once over the whole data frame, so that the
+    indicators shared by overlapping windows and by the candidates are computed
+    once, and every window queries the same range-extrema index of the dataset. The
+    windows are optimised in parallel over a process pool, to which the prices and
+    the filtered positions are sent once per worker. The out-of-sample trades are
+    mapped to their times when the dataset provides a time index.
+
+    Parameters:
+        data_frame (pd.DataFrame): The data frame of the asset, to filter.
+        dataset (Dataset): The dataset used for backtesting, aligned with the data
+            frame.
+        candidates (list[list[Filter] | FilterGroup]): The candidate filters.
+        direction (Position): The trading direction.
+        take_profits (NDArray | list[float]): The take-profit levels of the grid.
+        stop_losses (NDArray | list[float]): The stop-loss levels of the grid.
+        in_sample (int): The number of records of the (first) in-sample period.
+        out_of_sample (int): The number of records of each out-of-sample period.
+        step (int, optional, default None): The number of records the windows are
+            rolled by, by default `out_of_sample`.
+        anchored (bool, default False): True to start all the in-sample periods at
+            the first record, False to roll them.
+        include_pending (bool, default True): True to rank the parameters by the win
+            rate over all the trades, False over the closed trades only.
+        workers (int, optional, default None): The number of worker processes, by
+            default the number of CPUs.
+
+    Returns:
+        (WalkForwardResult): The per-window and stitched out-of-sample results.
+    """
+
+    take_profits = np.asarray(take_profits, dtype=np.float64)
+    stop_losses = np.asarray(stop_losses, dtype=np.float64)
+
+    positions = [
+        np.asarray(filter_dataset(data_frame, filters=filters), dtype=np.int64)
+        for filters in candidates
+    ]
+    index: RangeExtremaIndex = dataset.extrema_index()
+    windows = walk_forward_windows(
+        length=index.bid.shape[0],
+        in_sample=in_sample,
+        out_of_sample=out_of_sample,
+        step=step,
+        anchored=anchored,
+    )
+    if not windows:
+        logger.warn("The dataset is shorter than the in-sample period")
+        return WalkForwardResult()
+
+    workers = min(workers or os.cpu_count() or 1, len(windows))
+    arguments = {
+        "candidates": positions,
+        "direction": direction,
+        "take_profits": take_profits,
+        "stop_losses": stop_losses,
+        "include_pending": include_pending,
+    }
+
+    if workers == 1:
+        results = [
+            _optimize_window(window, index=index, **arguments) for window in windows
+        ]
+    else:
+        # The arguments shared by the windows are sent once to each worker
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialize_worker,
+            initargs=(index.bid, index.ask, arguments),
+        ) as executor:
+            results = list(executor.map(_optimize_worker_window, windows))
+
+    for window in results:
+        window.result = with_times(window.result, dataset)
+
+    return WalkForwardResult(windows=results)
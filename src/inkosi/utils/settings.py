@@ -6,6 +6,8 @@ from pathlib import Path
 from omegaconf import OmegaConf
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+PROJECT_ROOT: Path = Path(__file__).absolute().parent.parent.parent.parent
+
 
 class EnvSettings(BaseSettings):
     """
@@ -86,6 +88,8 @@ class PostgreSQL:
         DATABASE (str): Name of the PostgreSQL database to connect to.
         SCHEMA (str): Name of the database schema to use.
         PARAMETERS (str): Additional connection parameters as a string.
+        BATCH_SIZE (int): Number of rows fetched at once when streaming a table
+            through a server-side cursor.
 
     Note:
         This class is designed to hold the configuration details required for connecting
@@ -102,6 +106,7 @@ class PostgreSQL:
     DATABASE: str
     SCHEMA: str
     PARAMETERS: str
+    BATCH_SIZE: int = field(default=100000)
 
 
 @dataclass
@@ -219,6 +224,7 @@ class TechnicalIndicators:
     Attributes:
         MovingAveragePeriod (int | float): Period for the moving average.
             This can be an integer or a float value.
+        CacheMaxBytes (int): Maximum number of bytes held by the indicator cache.
 
     Note:
         This class is designed to hold the configuration for technical indicators.
@@ -227,6 +233,7 @@ class TechnicalIndicators:
     """
 
     MovingAveragePeriod: int | float
+    CacheMaxBytes: int = field(default=268435456)
 
 
 @dataclass
@@ -236,9 +243,47 @@ class Backtesting:
 
     Attributes:
         Tickers (list): List of tickers for backtesting.
+        CacheDirectory (str): Directory of the on-disk cache of backtest results,
+            relative to the root of the project unless absolute.
+        CacheMaxBytes (int): Maximum number of bytes held by the cache of backtest
+            results, 0 to disable it.
+        QuoteCacheDirectory (str): Directory of the on-disk cache of quotes, relative
+            to the root of the project unless absolute.
+        Offline (bool): True to serve the quotes from the cache only, without
+            downloading them.
+        DownloadWorkers (int): Maximum number of quotes downloaded concurrently.
+        AppCacheTTL (int): Number of seconds the quotes are kept in the cache of the
+            backtesting app.
+        AppCacheMaxEntries (int): Maximum number of quotes kept in the cache of the
+            backtesting app.
+        AppCacheMaxBytes (int): Maximum number of bytes of the quotes kept in the
+            cache of the backtesting app.
+        JobWorkers (int): Number of worker processes running the backtest jobs of
+            the API.
+        MaxQueuedJobs (int): Maximum number of backtest jobs queued or running at
+            once, beyond which new jobs are rejected.
+        JobRetention (int): Maximum number of finished backtest jobs whose results
+            are kept.
+        DataDirectory (str): Directory of the dataset files and tick stores the
+            backtest jobs of the API can read, relative to the root of the project
+            unless absolute.
+        DatasetTables (list[str]): SQL tables the backtest jobs of the API can read.
     """
 
     Tickers: list[str]
+    CacheDirectory: str = field(default=".cache/backtest")
+    CacheMaxBytes: int = field(default=1073741824)
+    QuoteCacheDirectory: str = field(default=".cache/quotes")
+    Offline: bool = field(default=False)
+    DownloadWorkers: int = field(default=8)
+    AppCacheTTL: int = field(default=3600)
+    AppCacheMaxEntries: int = field(default=64)
+    AppCacheMaxBytes: int = field(default=268435456)
+    JobWorkers: int = field(default=2)
+    MaxQueuedJobs: int = field(default=16)
+    JobRetention: int = field(default=256)
+    DataDirectory: str = field(default="data")
+    DatasetTables: list[str] = field(default_factory=list)
 
 
 @dataclass
@@ -323,6 +368,21 @@ def get_environmental_settings() -> EnvSettings:
     return EnvSettings()
 
 
+def get_project_path(path: str | Path) -> Path:
+    """
+    Resolve a path of the settings against the root of the project, like the
+    configuration file, rather than against the working directory of the process.
+
+    Parameters:
+        path (str | Path): The path, returned as it is if absolute.
+
+    Returns:
+        Path: The absolute path.
+    """
+
+    return PROJECT_ROOT.joinpath(path)
+
+
 @lru_cache
 def get_settings() -> Settings:
     """
@@ -334,9 +394,7 @@ def get_settings() -> Settings:
     """
 
     settings_import = OmegaConf.load(
-        Path(__file__)
-        .absolute()
-        .parent.parent.parent.parent.joinpath(
+        PROJECT_ROOT.joinpath(
             "config.yaml",
         ),
     )